@@ -1,7 +1,9 @@
 from django.contrib import admin, messages
 from django.http import HttpResponse, HttpResponseRedirect
+from django.shortcuts import render
 from django.urls import path, reverse
-from django.core.management import call_command
+from companies.services.edit_requests import approve_edit_requests
+from jobs.registry import enqueue
 from .models import (
     ServiceCategory, ProductCategory, Location,
     Business, PoliticalData, EditRequest, DataSource
@@ -25,13 +27,9 @@ class CategoryImportMixin:
         return super().changelist_view(request, extra_context)
 
     def import_categories_view(self, request):
-        try:
-            call_command('import_categories')
-            self.message_user(request, 'Categories imported successfully!', messages.SUCCESS)
-        except Exception as e:
-            self.message_user(request, f'Error importing categories: {str(e)}', level=messages.ERROR)
-        
-        return HttpResponseRedirect(reverse('admin:companies_productcategory_changelist'))
+        job = enqueue('companies.import_categories', user=request.user, description='Import categories')
+        self.message_user(request, 'Category import queued.', messages.SUCCESS)
+        return HttpResponseRedirect(reverse('jobs:job_status', args=[job.pk]))
 
 # Step 1: Add PoliticalDataInline for editing political data within a business
 class PoliticalDataInline(admin.StackedInline):
@@ -80,6 +78,47 @@ class BusinessAdmin(admin.ModelAdmin):
     prepopulated_fields = {'slug': ('name',)}
     inlines = [PoliticalDataInline, EditRequestInline]  # Added inlines here
 
+    def get_urls(self):
+        urls = super().get_urls()
+        custom_urls = [
+            path(
+                'bulk-import/',
+                self.admin_site.admin_view(self.bulk_import_view),
+                name='companies_business_bulk_import',
+            ),
+        ]
+        return custom_urls + urls
+
+    def bulk_import_view(self, request):
+        if not self.has_add_permission(request):
+            self.message_user(request, 'You do not have permission to import businesses.', level=messages.ERROR)
+            return HttpResponseRedirect(reverse('admin:companies_business_changelist'))
+
+        if request.method == 'POST':
+            upload = request.FILES.get('donations_file')
+            if not upload:
+                self.message_user(request, 'Please choose a CSV or ZIP file.', level=messages.ERROR)
+            else:
+                name = upload.name.lower()
+                if not name.endswith(('.csv', '.zip')):
+                    self.message_user(request, 'Please upload a CSV or ZIP file.', level=messages.ERROR)
+                else:
+                    job = enqueue(
+                        'companies.bulk_import_donations',
+                        payload={'source_url': request.POST.get('source_url', '').strip() or None},
+                        upload=upload,
+                        user=request.user,
+                        description=f'Bulk import {upload.name}',
+                    )
+                    self.message_user(request, 'Bulk import queued.', messages.SUCCESS)
+                    return HttpResponseRedirect(reverse('jobs:job_status', args=[job.pk]))
+
+        return render(request, 'admin/companies/business/bulk_import.html', {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Bulk import donation data',
+        })
+
 
 @admin.register(PoliticalData)
 class PoliticalDataAdmin(admin.ModelAdmin):
@@ -89,6 +128,7 @@ class PoliticalDataAdmin(admin.ModelAdmin):
         'get_direct_liberal_pct',
         'get_pac_conservative_pct',
         'get_pac_liberal_pct',
+        'overall_conservative_percentage',
         'direct_america_pac_donor',
         'direct_save_america_pac_donor',
         'senior_employee_trump_donor',
@@ -96,6 +136,7 @@ class PoliticalDataAdmin(admin.ModelAdmin):
     )
     search_fields = ('business__name', 'data_source')
     list_filter = (
+        'any_flagged_pac_donor',
         'direct_america_pac_donor',
         'direct_save_america_pac_donor',
         'affiliated_pac_america_pac_donor',
@@ -129,6 +170,7 @@ class EditRequestAdmin(admin.ModelAdmin):
     list_filter = ('status',)
     filter_horizontal = ('services_to_add', 'services_to_remove', 'products_to_add', 'products_to_remove')
     readonly_fields = ('created_at', 'reviewed_at')
+    actions = ['approve_selected']
 
     fieldsets = (
         ('Basic Information', {
@@ -170,6 +212,19 @@ class EditRequestAdmin(admin.ModelAdmin):
         }),
     )
 
+    @admin.action(description='Approve selected edit requests', permissions=['review'])
+    def approve_selected(self, request, queryset):
+        report = approve_edit_requests(queryset.values_list('pk', flat=True), request.user)
+        self.message_user(request, f'Edit requests: {report}.', messages.SUCCESS)
+        for edit_request, reason in report.conflicts:
+            self.message_user(
+                request, f'Edit request #{edit_request.pk} for {edit_request.business.name} left pending: {reason}.',
+                messages.WARNING
+            )
+
+    def has_review_permission(self, request):
+        return request.user.has_perm('companies.can_review_edits')
+
 
 # Step 4: Register DataSource model
 @admin.register(DataSource)
@@ -1,23 +1,118 @@
 from rest_framework import serializers
-from ..models import EditRequest, Business
+from ..models import EditRequest, Business, Location, PoliticalData, ProductCategory, ServiceCategory
+from ..services.edit_requests import POLITICAL_FIELDS
+from ..services.political_data import resolve_political_data
+
+POLITICAL_OUTPUT_FIELDS = ('political_data', 'inherited_from')
+
+def requested_fields(request, available):
+    """
+    The field names listed in ?fields=a,b (comma separated), or None when all
+    fields are wanted. Unknown names are a validation error (400).
+    """
+    value = request.query_params.get('fields') if request is not None else None
+    if not value:
+        return None
+    requested = {name.strip() for name in value.split(',') if name.strip()}
+    unknown = requested - set(available)
+    if unknown:
+        raise serializers.ValidationError({'fields': f"Unknown fields: {', '.join(sorted(unknown))}"})
+    return requested
+
+class SparseFieldsMixin:
+    """Drop the fields not listed in the request's ?fields= parameter"""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = requested_fields(self.context.get('request'), self.fields)
+        if requested is not None:
+            for name in set(self.fields) - requested:
+                self.fields.pop(name)
+
+class PoliticalDataSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PoliticalData
+        fields = [
+            'overall_conservative_percentage', 'overall_liberal_percentage',
+            'conservative_percentage_without_employees', 'liberal_percentage_without_employees',
+            'any_flagged_pac_donor', 'senior_employee_trump_donor', 'last_updated'
+        ]
+
+class BusinessListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        # Resolve inherited political data for the whole list in a bounded number of queries
+        businesses = list(data.all() if hasattr(data, 'all') else data)
+        if any(name in self.child.fields for name in POLITICAL_OUTPUT_FIELDS):
+            resolved = self.context.setdefault('political_data', {})
+            missing = [business for business in businesses if business.pk not in resolved]
+            resolved.update(resolve_political_data(missing))
+        return super().to_representation(businesses)
 
 class BusinessSerializer(serializers.ModelSerializer):
+    political_data = serializers.SerializerMethodField()
+    inherited_from = serializers.SerializerMethodField()
+
     class Meta:
         model = Business
-        fields = ['id', 'name', 'slug', 'website', 'description']
+        fields = ['id', 'name', 'slug', 'website', 'description', 'political_data', 'inherited_from']
+        list_serializer_class = BusinessListSerializer
+
+    def _resolved(self, business):
+        resolved = self.context.get('political_data')
+        if resolved is None or business.pk not in resolved:
+            resolved = resolve_political_data([business])
+            self.context['political_data'] = resolved
+        return resolved[business.pk]
+
+    def get_political_data(self, business):
+        political_data, _ = self._resolved(business)
+        if political_data is None:
+            return None
+        return PoliticalDataSummarySerializer(political_data).data
+
+    def get_inherited_from(self, business):
+        _, inherited_from = self._resolved(business)
+        return inherited_from.slug if inherited_from else None
+
+class CategorySerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    name = serializers.CharField()
+    slug = serializers.CharField()
+    parent_id = serializers.IntegerField()
+
+class LocationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Location
+        fields = ['city', 'state', 'zip_code', 'latitude', 'longitude']
+
+class BusinessDatasetSerializer(SparseFieldsMixin, BusinessSerializer):
+    """Everything the directory knows about a business, for the read-only business API"""
+    parent_company = serializers.SlugRelatedField(slug_field='slug', read_only=True)
+    products = CategorySerializer(many=True, read_only=True)
+    services = CategorySerializer(many=True, read_only=True)
+    locations = LocationSerializer(many=True, read_only=True)
+
+    class Meta(BusinessSerializer.Meta):
+        fields = BusinessSerializer.Meta.fields + [
+            'parent_company', 'provides_products', 'products', 'provides_services', 'services',
+            'locations', 'created_at', 'updated_at',
+        ]
 
 class EditRequestSerializer(serializers.ModelSerializer):
     submitted_by = serializers.ReadOnlyField(source='submitted_by.username')
+    services_to_add = serializers.PrimaryKeyRelatedField(many=True, required=False, queryset=ServiceCategory.objects.all())
+    services_to_remove = serializers.PrimaryKeyRelatedField(many=True, required=False, queryset=ServiceCategory.objects.all())
+    products_to_add = serializers.PrimaryKeyRelatedField(many=True, required=False, queryset=ProductCategory.objects.all())
+    products_to_remove = serializers.PrimaryKeyRelatedField(many=True, required=False, queryset=ProductCategory.objects.all())
     
     class Meta:
         model = EditRequest
         fields = [
             'id', 'business', 'submitted_by', 'status',
-            'name', 'description', 'republican_percentage',
-            'democrat_percentage', 'trump_donor',
-            'america_pac_donor', 'total_donations',
-            'data_source', 'justification', 'supporting_links',
+            'name', 'description', *POLITICAL_FIELDS, 'data_source',
+            'provides_services', 'services_to_add', 'services_to_remove',
+            'provides_products', 'products_to_add', 'products_to_remove',
+            'justification', 'supporting_links',
             'created_at', 'reviewed_at', 'reviewed_by',
             'review_notes'
         ]
-        read_only_fields = ['status', 'reviewed_at', 'reviewed_by', 'review_notes']
\ No newline at end of file
+        read_only_fields = ['status', 'reviewed_at', 'reviewed_by', 'review_notes']
@@ -3,6 +3,7 @@ from django.urls import path, include
 from . import views
 
 router = DefaultRouter()
+router.register(r'businesses', views.BusinessViewSet, basename='business')
 router.register(r'edit-requests', views.EditRequestViewSet)
 
 urlpatterns = [
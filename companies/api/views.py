@@ -1,9 +1,106 @@
+from decimal import Decimal, InvalidOperation
+from django.conf import settings
+from django.db.models import Prefetch
+from django.utils import timezone
 from rest_framework import viewsets, permissions
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
 from rest_framework.response import Response
-from django.shortcuts import get_object_or_404
-from ..models import EditRequest, Business
-from .serializers import EditRequestSerializer, BusinessSerializer
+from ..models import EditRequest, Business, ProductCategory, ServiceCategory
+from ..services.category_tree import CATEGORY_MODELS
+from ..services.edit_requests import approve_edit_requests
+from .serializers import EditRequestSerializer, BusinessDatasetSerializer, POLITICAL_OUTPUT_FIELDS, requested_fields
+
+LEANINGS = ('liberal', 'conservative')
+
+class BusinessCursorPagination(CursorPagination):
+    # Served by the (name, id) index, so every page is a bounded index read
+    ordering = ('name', 'id')
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+    def get_page_size(self, request):
+        self.page_size = getattr(settings, 'BUSINESS_API_PAGE_SIZE', 100)
+        return super().get_page_size(request)
+
+class BusinessViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Read-only business dataset for partner apps.
+
+    Filters: ?category=<slug>&category_type=products|services (the category and
+    all of its subcategories), ?leaning=liberal|conservative,
+    ?min_conservative_percentage= / ?max_conservative_percentage= and
+    ?flagged_pac_donor=true|false. Political filters match the political_data
+    field, so a business without data of its own is filtered on what it inherits
+    from its nearest parent company. ?fields=a,b limits the output (and the
+    queries) to the listed fields.
+    """
+    serializer_class = BusinessDatasetSerializer
+    pagination_class = BusinessCursorPagination
+    permission_classes = [permissions.AllowAny]
+    lookup_field = 'slug'
+
+    def get_queryset(self):
+        fields = requested_fields(self.request, BusinessDatasetSerializer.Meta.fields)
+
+        def wanted(*names):
+            return fields is None or any(name in fields for name in names)
+
+        # Only load what the requested fields need, each relation in one query per page
+        businesses = Business.objects.all()
+        if wanted('parent_company'):
+            businesses = businesses.select_related('parent_company')
+        if wanted(*POLITICAL_OUTPUT_FIELDS):
+            businesses = businesses.select_related('politicaldata').with_ancestors()
+        if wanted('products'):
+            businesses = businesses.prefetch_related(Prefetch('products', ProductCategory.objects.order_by('name')))
+        if wanted('services'):
+            businesses = businesses.prefetch_related(Prefetch('services', ServiceCategory.objects.order_by('name')))
+        if wanted('locations'):
+            businesses = businesses.prefetch_related('locations')
+        return self.filter_businesses(businesses)
+
+    def filter_businesses(self, businesses):
+        params = self.request.query_params
+
+        slug = params.get('category')
+        if slug:
+            model = CATEGORY_MODELS.get(params.get('category_type'))
+            if model is None:
+                raise ValidationError({'category_type': 'Must be products or services'})
+            category = model.objects.filter(slug=slug).first()
+            if category is None:
+                raise ValidationError({'category': f'Unknown category: {slug}'})
+            businesses = businesses.in_category(category)
+
+        # Lookups on the resolved political data, applied together below
+        political = {}
+        leaning = params.get('leaning')
+        if leaning:
+            if leaning not in LEANINGS:
+                raise ValidationError({'leaning': 'Must be liberal or conservative'})
+            if leaning == 'liberal':
+                political['overall_conservative_percentage__lt'] = 50
+            else:
+                political['overall_conservative_percentage__gt'] = 50
+
+        for param, lookup in (('min_conservative_percentage', 'gte'), ('max_conservative_percentage', 'lte')):
+            if params.get(param):
+                try:
+                    value = Decimal(params[param])
+                except InvalidOperation:
+                    raise ValidationError({param: 'Must be a number'})
+                political[f'overall_conservative_percentage__{lookup}'] = value
+
+        flagged = params.get('flagged_pac_donor')
+        if flagged:
+            if flagged not in ('true', 'false'):
+                raise ValidationError({'flagged_pac_donor': 'Must be true or false'})
+            political['any_flagged_pac_donor'] = flagged == 'true'
+        if political:
+            businesses = businesses.with_resolved_political_data(**political)
+        return businesses
 
 class EditRequestViewSet(viewsets.ModelViewSet):
     queryset = EditRequest.objects.all()
@@ -18,6 +115,8 @@ class EditRequestViewSet(viewsets.ModelViewSet):
         # Admins can see all
         if self.request.user.is_staff:
             return EditRequest.objects.all()
+        if not self.request.user.is_authenticated:
+            return EditRequest.objects.none()
         return EditRequest.objects.filter(submitted_by=self.request.user)
 
     @action(detail=True, methods=['post'], permission_classes=[permissions.IsAdminUser])
@@ -28,32 +127,19 @@ class EditRequestViewSet(viewsets.ModelViewSet):
         
         if status not in ['approved', 'rejected']:
             return Response({'error': 'Invalid status'}, status=400)
-            
-        edit_request.status = status
-        edit_request.reviewed_by = request.user
-        edit_request.review_notes = notes
-        edit_request.save()
-        
+
         if status == 'approved':
-            # Apply the changes to the business
-            self._apply_changes(edit_request)
+            # Applies the changes to the business, like the review pages
+            report = approve_edit_requests([edit_request.pk], request.user, notes)
+            problems = report.skipped + report.conflicts
+            if problems:
+                return Response({'error': f'Edit request not approved: {problems[0][1]}'}, status=400)
+            edit_request.refresh_from_db()
+        else:
+            edit_request.status = status
+            edit_request.reviewed_by = request.user
+            edit_request.reviewed_at = timezone.now()
+            edit_request.review_notes = notes
+            edit_request.save()
             
         return Response(EditRequestSerializer(edit_request).data)
-    
-    def _apply_changes(self, edit_request):
-        business = edit_request.business
-        # Update the business with the approved changes
-        for field in ['name', 'description']:
-            if getattr(edit_request, field):
-                setattr(business, field, getattr(edit_request, field))
-                
-        # Update political data
-        political_data = business.politicaldata
-        for field in ['republican_percentage', 'democrat_percentage', 
-                     'trump_donor', 'america_pac_donor', 
-                     'total_donations', 'data_source']:
-            if getattr(edit_request, field) is not None:
-                setattr(political_data, field, getattr(edit_request, field))
-        
-        business.save()
-        political_data.save()
\ No newline at end of file
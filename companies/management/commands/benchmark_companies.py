@@ -0,0 +1,169 @@
+import random
+import statistics
+import time
+from decimal import Decimal
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from companies.models import Business, PoliticalData, ProductCategory, ServiceCategory
+from companies.services.alternatives import compute_alternatives, rebuild_alternatives
+from companies.services.search import SEARCH_BACKENDS, search_businesses
+from companies.views import business_detail
+
+class Command(BaseCommand):
+    help = 'Benchmark business directory hot paths against a synthetic catalog (rolled back afterwards)'
+
+    targets = ['detail', 'scoring', 'search']
+
+    syllables = ['ba', 'co', 'den', 'fi', 'gar', 'ho', 'lu', 'mer', 'no', 'pra', 'ri', 'sol', 'ta', 'ven', 'wil', 'zo']
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--target',
+            choices=self.targets,
+            default='detail',
+            help='Code path to benchmark',
+        )
+        parser.add_argument(
+            '--sizes',
+            default='100,1000,10000,100000',
+            help='Comma separated catalog sizes to benchmark',
+        )
+        parser.add_argument(
+            '--runs',
+            type=int,
+            default=20,
+            help='Timed runs per catalog size',
+        )
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',')]
+        benchmark = getattr(self, f"benchmark_{options['target']}")
+        self.random = random.Random(42)
+        self.words = sorted({
+            ''.join(self.random.choice(self.syllables) for _ in range(3))
+            for _ in range(3000)
+        })
+        self.factory = RequestFactory()
+
+        for size in sizes:
+            with transaction.atomic():
+                self.seed_catalog(size)
+                benchmark(size, options['runs'])
+                # Never keep the synthetic catalog
+                transaction.set_rollback(True)
+
+    def seed_catalog(self, size, batch_size=5000):
+        """Create `size` businesses sharing a small pool of products and services"""
+        products = ProductCategory.objects.bulk_create([
+            ProductCategory(name=f'Benchmark Product {i}', slug=f'benchmark-product-{i}')
+            for i in range(20)
+        ])
+        services = ServiceCategory.objects.bulk_create([
+            ServiceCategory(name=f'Benchmark Service {i}', slug=f'benchmark-service-{i}')
+            for i in range(10)
+        ])
+
+        businesses = Business.objects.bulk_create([
+            Business(
+                name=f'{self.random_words(2).title()} {i:07d}',
+                slug=f'benchmark-business-{i:07d}',
+                description=f'Synthetic business selling {self.random_words(6)}',
+                provides_products=True,
+                provides_services=True,
+            )
+            for i in range(size)
+        ], batch_size=batch_size)
+
+        political_data = []
+        product_links = []
+        service_links = []
+        for business in businesses:
+            conservative = Decimal(self.random.randint(0, 100000))
+            liberal = Decimal(self.random.randint(0, 100000))
+            political_data.append(PoliticalData(
+                business=business,
+                direct_conservative_total_donations=conservative,
+                direct_liberal_total_donations=liberal,
+                direct_total_donations=conservative + liberal,
+            ))
+            for product in self.random.sample(products, 2):
+                product_links.append(Business.products.through(business=business, productcategory=product))
+            service_links.append(Business.services.through(business=business, servicecategory=self.random.choice(services)))
+
+        PoliticalData.objects.bulk_create(political_data, batch_size=batch_size)
+        Business.products.through.objects.bulk_create(product_links, batch_size=batch_size)
+        Business.services.through.objects.bulk_create(service_links, batch_size=batch_size)
+
+        # Planner statistics would otherwise still describe the tables before seeding
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        return businesses
+
+    def random_words(self, count):
+        return ' '.join(self.random.choice(self.words) for _ in range(count))
+
+    def measure(self, func, runs):
+        """Return (query count, p50 ms, p95 ms) for func"""
+        with CaptureQueriesContext(connection) as queries:
+            func()
+
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+
+        p95 = statistics.quantiles(timings, n=20)[18] if len(timings) > 1 else timings[0]
+        return len(queries), statistics.median(timings), p95
+
+    def report(self, size, queries, p50, p95, extra=''):
+        self.stdout.write(
+            f'{size:>8} businesses  {queries:>4} queries  p50 {p50:8.2f}ms  p95 {p95:8.2f}ms  {extra}'
+        )
+
+    def benchmark_detail(self, size, runs):
+        business = Business.objects.order_by('id').first()
+
+        start = time.perf_counter()
+        rebuild_alternatives([business.id])
+        refresh_ms = (time.perf_counter() - start) * 1000
+
+        def render_detail():
+            request = self.factory.get(f'/business/{business.slug}/')
+            request.user = AnonymousUser()
+            return business_detail(request, slug=business.slug)
+
+        queries, p50, p95 = self.measure(render_detail, runs)
+        self.report(size, queries, p50, p95, f'(index refresh {refresh_ms:.1f}ms)')
+
+    def benchmark_scoring(self, size, runs):
+        business = Business.objects.order_by('id').first()
+        results = {}
+        for engine in ('python', 'sql'):
+            results[engine] = [
+                (entry.alternative_id, entry.overlap_count)
+                for entry in compute_alternatives(business.id, engine=engine)
+            ]
+            queries, p50, p95 = self.measure(lambda: compute_alternatives(business.id, engine=engine), runs)
+            self.report(size, queries, p50, p95, f'({engine} engine)')
+
+        if results['python'] != results['sql']:
+            self.stdout.write(self.style.WARNING(f'{size:>8} businesses  engines disagree on the top alternatives'))
+
+    def benchmark_search(self, size, runs):
+        business = Business.objects.order_by('id').first()
+        queries = {
+            'exact name': business.name,
+            'name word': business.name.split()[0],
+            'description word': business.description.split()[-1],
+            'word prefix': business.description.split()[-1][:4],
+        }
+        for label, query in queries.items():
+            for backend in SEARCH_BACKENDS:
+                search = lambda: list(search_businesses(query, backend=backend).values_list('id', flat=True))
+                matches = len(search())
+                query_count, p50, p95 = self.measure(search, runs)
+                self.report(size, query_count, p50, p95, f'({backend} backend, {label} {query!r}, {matches} matches)')
@@ -0,0 +1,91 @@
+import csv
+import os
+import random
+import tempfile
+import time
+from collections import defaultdict
+from django.core.management.base import BaseCommand
+from companies.services.donations import SOURCES, DonationAggregator, DonationTotals
+
+class Command(BaseCommand):
+    help = 'Benchmark donation CSV aggregation throughput on a synthetic export'
+
+    recipients = [
+        'America PAC (Texas)', 'Save America', 'Make America Great Again Inc', 'Trump Victory',
+        'DNC Services Corp', 'ActBlue', 'NRCC', 'DSCC',
+    ]
+    views = ['Democrat', 'Republican', 'Liberal', 'Conservative', 'Other']
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=1_000_000,
+            help='Number of CSV rows to generate',
+        )
+        parser.add_argument(
+            '--companies',
+            type=int,
+            default=1000,
+            help='Distinct values of the Company column (0 for a single-company file)',
+        )
+        parser.add_argument(
+            '--compare',
+            action='store_true',
+            help='Also time the row-at-a-time DictReader aggregation and check both agree',
+        )
+
+    def handle(self, *args, **options):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', newline='', delete=False) as file:
+            self.write_csv(file, options['rows'], options['companies'])
+        try:
+            size = os.path.getsize(file.name) / 1024 / 1024
+            self.stdout.write(f"{options['rows']:,} rows, {size:.1f} MB, {options['companies']} companies")
+
+            key_column = 'Company' if options['companies'] else None
+            aggregated = self.run_timed('columnar', options['rows'], lambda: self.aggregate(file.name, key_column))
+            if options['compare']:
+                reference = self.run_timed('row-at-a-time', options['rows'], lambda: self.aggregate_rows(file.name, key_column))
+                if self.fields(aggregated) == self.fields(reference):
+                    self.stdout.write(self.style.SUCCESS('Both aggregations agree'))
+                else:
+                    self.stdout.write(self.style.WARNING('Aggregations differ'))
+        finally:
+            os.remove(file.name)
+
+    def write_csv(self, file, rows, companies):
+        rng = random.Random(42)
+        # Committees are mostly repeat recipients with a long tail of one-offs
+        recipients = self.recipients + [f'Committee {i}' for i in range(5000)]
+        amounts = ['$0', '$0', '$0', '', '$250', '$1,000', '$2,900.00', '$5,000']
+        writer = csv.writer(file)
+        writer.writerow((['Company'] if companies else []) + ['Recipient', 'View', *SOURCES])
+        for i in range(rows):
+            writer.writerow(
+                ([f'Company {i % companies}'] if companies else [])
+                + [rng.choice(recipients), rng.choice(self.views)]
+                + [rng.choice(amounts) for _ in SOURCES]
+            )
+
+    def run_timed(self, label, rows, func):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        self.stdout.write(f'{label:>14}: {elapsed:.2f}s, {rows / elapsed:,.0f} rows/s')
+        return result
+
+    def aggregate(self, path, key_column):
+        aggregator = DonationAggregator(key_column=key_column)
+        with open(path, newline='') as file:
+            aggregator.read(file)
+        return aggregator.totals
+
+    def aggregate_rows(self, path, key_column):
+        totals = defaultdict(DonationTotals)
+        with open(path, newline='') as file:
+            for row in csv.DictReader(file):
+                totals[row[key_column] if key_column else None].add_row(row)
+        return totals
+
+    def fields(self, totals):
+        return {key: company.political_data_fields() for key, company in totals.items()}
@@ -0,0 +1,128 @@
+import statistics
+import time
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from companies.models import Business, EditRequest
+from companies.services.edit_requests import invalidate_status_counts, review_page, review_queue, status_counts
+from companies.views import review_edit_requests
+
+class Command(BaseCommand):
+    help = 'Benchmark the edit request review queue against synthetic history (rolled back afterwards)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            default='10000,100000,1000000',
+            help='Comma separated numbers of historical edit requests to benchmark',
+        )
+        parser.add_argument(
+            '--businesses',
+            type=int,
+            default=5000,
+            help='Businesses the edit requests are spread over',
+        )
+        parser.add_argument(
+            '--runs',
+            type=int,
+            default=20,
+            help='Timed runs per size',
+        )
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',')]
+        self.factory = RequestFactory()
+
+        for size in sizes:
+            with transaction.atomic():
+                start = time.perf_counter()
+                self.seed_history(size, options['businesses'])
+                self.stdout.write(f'Seeded {size} edit requests in {time.perf_counter() - start:.1f}s')
+                self.benchmark(size, options['runs'])
+                # Never keep the synthetic history
+                transaction.set_rollback(True)
+        invalidate_status_counts()
+
+    def seed_history(self, size, business_count):
+        """Create `size` edit requests, one minute apart, 2% of them still pending"""
+        Business.objects.bulk_create([
+            Business(
+                name=f'Review Benchmark {i:06d}',
+                slug=f'review-benchmark-{i:06d}',
+                description='Synthetic business with a long edit history',
+            )
+            for i in range(business_count)
+        ], batch_size=5000)
+
+        # Generated in the database: a million ORM objects would dominate the run
+        with connection.cursor() as cursor:
+            cursor.execute(f'''
+                INSERT INTO {EditRequest._meta.db_table}
+                    (business_id, status, name, description, data_source, justification,
+                     supporting_links, review_notes, created_at)
+                SELECT
+                    businesses.ids[1 + series.n %% businesses.total],
+                    CASE WHEN series.n %% 50 = 0 THEN 'pending'
+                         WHEN series.n %% 3 = 0 THEN 'rejected'
+                         ELSE 'approved' END,
+                    '', '', '', 'Benchmark history', '', '',
+                    NOW() - series.n * INTERVAL '1 minute'
+                FROM generate_series(1, %s) AS series(n),
+                     (SELECT array_agg(id) AS ids, count(*) AS total
+                      FROM {Business._meta.db_table} WHERE slug LIKE 'review-benchmark-%%') AS businesses
+            ''', [size])
+            # Planner statistics would otherwise still describe the tables before seeding
+            cursor.execute('ANALYZE')
+
+    def measure(self, func, runs):
+        """Return (query count, p50 ms, p95 ms) for func"""
+        with CaptureQueriesContext(connection) as queries:
+            func()
+
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+
+        p95 = statistics.quantiles(timings, n=20)[18] if len(timings) > 1 else timings[0]
+        return len(queries), statistics.median(timings), p95
+
+    def report(self, size, label, queries, p50, p95):
+        self.stdout.write(
+            f'{size:>8} requests  {label:<22} {queries:>4} queries  p50 {p50:8.2f}ms  p95 {p95:8.2f}ms'
+        )
+
+    def benchmark(self, size, runs):
+        reviewer = get_user_model().objects.create_user(
+            'review-benchmark', 'review-benchmark@example.com', email_verified=True
+        )
+        reviewer.user_permissions.add(Permission.objects.get(codename='can_review_edits'))
+
+        _, cursor = review_page(review_queue('approved'))
+        for _ in range(9):
+            _, cursor = review_page(review_queue('approved'), cursor)
+
+        def uncached_counts():
+            invalidate_status_counts()
+            return status_counts()
+
+        def render_queue():
+            request = self.factory.get('/review/', {'status': 'pending'})
+            request.user = reviewer
+            request._messages = []
+            return review_edit_requests(request)
+
+        cases = [
+            ('pending, first page', lambda: review_page(review_queue('pending'))),
+            ('approved, page 11', lambda: review_page(review_queue('approved'), cursor)),
+            ('all, business filter', lambda: review_page(review_queue('', 'benchmark 0001'))),
+            ('status counts', uncached_counts),
+            ('status counts, cached', status_counts),
+            ('review page', render_queue),
+        ]
+        for label, func in cases:
+            self.report(size, label, *self.measure(func, runs))
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+from companies.services.bulk_import import BulkDonationImporter
+
+class Command(BaseCommand):
+    help = 'Import donation data for many businesses from a multi-company CSV or a ZIP of per-company CSVs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV file with a Company column, or ZIP of per-company CSVs')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of companies written per transaction',
+        )
+        parser.add_argument(
+            '--source-url',
+            help='Data source URL recorded for companies without a Source URL column value',
+        )
+        parser.add_argument(
+            '--show-errors',
+            type=int,
+            default=20,
+            help='Number of row errors to print',
+        )
+
+    def handle(self, *args, **options):
+        importer = BulkDonationImporter(batch_size=options['batch_size'], source_url=options['source_url'])
+        try:
+            with open(options['path'], 'rb') as file:
+                report = importer.run(file, options['path'])
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        for error in report.errors[:options['show_errors']]:
+            location = f'{error.source}:{error.line}' if error.line else error.source
+            self.stdout.write(self.style.WARNING(f'{location}: {error.message}'))
+        if len(report.errors) > options['show_errors']:
+            self.stdout.write(self.style.WARNING(f'... and {len(report.errors) - options["show_errors"]} more errors'))
+
+        self.stdout.write(self.style.SUCCESS(f'Imported {report}'))
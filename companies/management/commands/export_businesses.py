@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+from companies.services.export import EXPORT_FORMATS, export_lines, parse_since
+
+class Command(BaseCommand):
+    help = 'Stream every business with its political data and data sources as NDJSON or CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format',
+            choices=EXPORT_FORMATS,
+            default='ndjson',
+            help='Output format',
+        )
+        parser.add_argument(
+            '--since',
+            help='Only businesses changed after this ISO 8601 date or datetime',
+        )
+        parser.add_argument(
+            '--output',
+            help='File to write (default: standard output)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Businesses fetched from the database cursor at a time',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            since = parse_since(options['since']) if options['since'] else None
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        lines = export_lines(options['format'], since, options['chunk_size'])
+        count = -1 if options['format'] == 'csv' else 0  # Not counting the CSV header
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8', newline='') as file:
+                for line in lines:
+                    file.write(line)
+                    count += 1
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
+                count += 1
+
+        # Progress goes to stderr, so it never mixes with an export on stdout
+        self.stderr.write(self.style.SUCCESS(f'Exported {count} businesses'))
@@ -1,94 +1,67 @@
-
 import json
 import os
-from django.core.management.base import BaseCommand
-from django.utils.text import slugify
+import time
 from django.conf import settings
-from companies.models import ProductCategory, ServiceCategory
+from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
+from companies.models import ProductCategory, ServiceCategory
+from companies.services.category_import import CategoryTreeDiff, CategoryTreeError
 
 class Command(BaseCommand):
     help = 'Import product and service categories from JSON files'
 
-    def handle(self, *args, **options):
-        products_file = os.path.join(settings.BASE_DIR, 'data', 'product_categories.json')
-        services_file = os.path.join(settings.BASE_DIR, 'data', 'service_categories.json')
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--products',
+            default=os.path.join(settings.BASE_DIR, 'data', 'product_categories.json'),
+            help='Product categories JSON file',
+        )
+        parser.add_argument(
+            '--services',
+            default=os.path.join(settings.BASE_DIR, 'data', 'service_categories.json'),
+            help='Service categories JSON file',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show the changes without writing them',
+        )
 
-        # Verify files exist
-        if not os.path.exists(products_file):
-            self.stdout.write(self.style.ERROR(f'Products JSON file not found at: {products_file}'))
-            return
-        if not os.path.exists(services_file):
-            self.stdout.write(self.style.ERROR(f'Services JSON file not found at: {services_file}'))
-            return
+    def handle(self, *args, **options):
+        start = time.monotonic()
+        trees = []
+        for path, model in ((options['products'], ProductCategory), (options['services'], ServiceCategory)):
+            if not os.path.exists(path):
+                raise CommandError(f'{model._meta.verbose_name_plural} JSON file not found at: {path}')
+            try:
+                with open(path, 'r', encoding='utf-8') as file:
+                    trees.append((model, json.load(file)['categories']))
+            except (json.JSONDecodeError, KeyError) as e:
+                raise CommandError(f'Error parsing JSON file {path}: {str(e)}')
 
         try:
-            # Import product categories
-            with transaction.atomic():
-                self.stdout.write('Importing product categories...')
-                with open(products_file, 'r', encoding='utf-8') as file:
-                    products_data = json.load(file)
-                    self._import_categories(products_data['categories'], ProductCategory)
-
-            # Import service categories
             with transaction.atomic():
-                self.stdout.write('Importing service categories...')
-                with open(services_file, 'r', encoding='utf-8') as file:
-                    services_data = json.load(file)
-                    self._import_categories(services_data['categories'], ServiceCategory)
-
-            self.stdout.write(self.style.SUCCESS('Import completed successfully!'))
-
-        except json.JSONDecodeError as e:
-            self.stdout.write(self.style.ERROR(f'Error parsing JSON file: {str(e)}'))
-        except Exception as e:
-            self.stdout.write(self.style.ERROR(f'Error during import: {str(e)}'))
-            raise
-
-    def _import_categories(self, categories, CategoryModel, parent=None):
-        """
-        Recursively import categories and their children
-        
-        Args:
-            categories (list): List of category dictionaries from JSON
-            CategoryModel: Either ProductCategory or ServiceCategory model class
-            parent: Parent category instance (None for top-level categories)
-        """
-        for category_data in categories:
-            name = category_data.get('name', '').strip()
-            
-            if not name:
-                self.stdout.write(self.style.WARNING(f"Skipping category with missing name"))
-                continue
-
-            try:
-                # Create or update the category
-                category, created = CategoryModel.objects.get_or_create(
-                    name=name,
-                    defaults={
-                        'slug': slugify(name),
-                        'parent': parent
-                    }
-                )
-
-                # If category exists but parent is different, update it
-                if not created and category.parent != parent:
-                    category.parent = parent
-                    category.save()
-
-                action = 'Created' if created else 'Updated'
-                self.stdout.write(
-                    self.style.SUCCESS(f'{action} category: {name}') if created 
-                    else self.style.WARNING(f'{action} category: {name}')
-                )
+                diffs = [CategoryTreeDiff(model, categories) for model, categories in trees]
+                for diff in diffs:
+                    self._report(diff, verbose=options['dry_run'] or options['verbosity'] > 1)
+                written = 0 if options['dry_run'] else sum(diff.apply() for diff in diffs)
+        except CategoryTreeError as e:
+            raise CommandError(str(e))
 
-                # Process children recursively
-                children = category_data.get('children', [])
-                if children:
-                    self._import_categories(children, CategoryModel, parent=category)
+        elapsed = time.monotonic() - start
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f'Dry run: nothing written ({elapsed:.2f}s)'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Import completed successfully! {written} rows written in {elapsed:.2f}s'))
 
-            except Exception as e:
-                self.stdout.write(
-                    self.style.ERROR(f'Error processing category {name}: {str(e)}')
-                )
-                continue
\ No newline at end of file
+    def _report(self, diff, verbose):
+        label = diff.model._meta.verbose_name_plural
+        if verbose:
+            for line in diff.lines():
+                self.stdout.write(line)
+        self.stdout.write(
+            f'{label}: {len(diff.creates)} new, {len(diff.moves)} moved, {len(diff.slug_fixes)} slugs fixed, '
+            f'{diff.unchanged} unchanged, {diff.untouched} not in file'
+        )
+        if diff.skipped:
+            self.stdout.write(self.style.WARNING(f'{label}: skipped {diff.skipped} categories with missing name'))
@@ -0,0 +1,35 @@
+import time
+from django.core.management.base import BaseCommand
+from companies.models import Business
+from companies.services.alternatives import SCORING_ENGINES, rebuild_alternatives
+
+class Command(BaseCommand):
+    help = 'Rebuild the precomputed alternatives index for every business'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of businesses rebuilt per transaction',
+        )
+        parser.add_argument(
+            '--engine',
+            choices=SCORING_ENGINES,
+            help='Scoring engine to use (defaults to ALTERNATIVES_SCORING_ENGINE)',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        business_ids = list(Business.objects.order_by('id').values_list('id', flat=True))
+        start = time.monotonic()
+
+        for offset in range(0, len(business_ids), batch_size):
+            batch = business_ids[offset:offset + batch_size]
+            rebuild_alternatives(batch, engine=options['engine'])
+            self.stdout.write(f'Rebuilt {offset + len(batch)}/{len(business_ids)} businesses')
+
+        elapsed = time.monotonic() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'Alternatives index rebuilt for {len(business_ids)} businesses in {elapsed:.1f}s'
+        ))
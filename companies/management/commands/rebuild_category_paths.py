@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from companies.models import ProductCategory, ServiceCategory
+from companies.services.search_cache import invalidate_search_cache
+
+class Command(BaseCommand):
+    help = 'Rebuild the materialized paths of the product and service category trees from parent'
+
+    def handle(self, *args, **options):
+        for model in (ProductCategory, ServiceCategory):
+            with transaction.atomic():
+                cycles = model.objects.rebuild()
+                # Bulk writes skip save(); search pages filtered by category may be stale
+                invalidate_search_cache()
+
+            self.stdout.write(self.style.SUCCESS(
+                f'Rebuilt {model._meta.verbose_name.lower()} paths: {model.objects.count()} categories'
+            ))
+            for category in model.objects.filter(id__in=cycles):
+                self.stdout.write(self.style.WARNING(
+                    f'Parent chain of {category.name} (id {category.id}) loops back on itself'
+                ))
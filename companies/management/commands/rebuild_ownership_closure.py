@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from companies.models import Business, OwnershipClosure
+from companies.services.search_cache import invalidate_search_cache
+
+class Command(BaseCommand):
+    help = 'Rebuild the parent/subsidiary ownership closure table from parent_company'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            cycles = OwnershipClosure.objects.rebuild()
+            # Bulk writes skip the signals that normally retire cached search pages
+            invalidate_search_cache()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt ownership closure: {OwnershipClosure.objects.count()} paths'
+        ))
+        for business in Business.objects.filter(id__in=cycles):
+            self.stdout.write(self.style.WARNING(
+                f'Parent chain of {business.name} (id {business.id}) loops back on itself'
+            ))
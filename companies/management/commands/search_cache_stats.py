@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from companies.services.search_cache import reset_search_cache_stats, search_cache_stats
+
+class Command(BaseCommand):
+    help = 'Show hit/miss counters of the business search cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Reset the counters after printing them',
+        )
+
+    def handle(self, *args, **options):
+        stats = search_cache_stats()
+        self.stdout.write(
+            f"hits {stats['hits']}  misses {stats['misses']}  "
+            f"hit rate {stats['hit_rate']:.1%}  generation {stats['generation']}"
+        )
+        if options['reset']:
+            reset_search_cache_stats()
+            self.stdout.write(self.style.SUCCESS('Counters reset'))
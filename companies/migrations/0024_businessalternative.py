@@ -0,0 +1,28 @@
+# Generated by Django 5.1.3 on 2026-10-18 18:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0023_politicaldata_affiliated_pac_maga_inc_donor_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BusinessAlternative',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('overlap_count', models.PositiveIntegerField()),
+                ('alternative', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='companies.business')),
+                ('business', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='alternative_entries', to='companies.business')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['business', '-score'], name='companies_b_busines_7f6e65_idx')],
+                'constraints': [models.UniqueConstraint(fields=('business', 'alternative'), name='unique_business_alternative')],
+            },
+        ),
+    ]
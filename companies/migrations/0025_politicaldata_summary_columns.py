@@ -0,0 +1,90 @@
+# Generated by Django 5.1.3 on 2026-10-18 18:26
+
+from decimal import Decimal
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+FLAGGED_PAC_DONOR_FIELDS = [
+    f'{source}_{pac}_donor'
+    for source in ('direct', 'affiliated_pac', 'senior_employee')
+    for pac in ('america_pac', 'save_america_pac', 'maga_inc')
+]
+
+
+def summary_percentage(political_data, sources, side):
+    total = sum(Decimal(str(getattr(political_data, f'{source}_total_donations') or 0)) for source in sources)
+    if not total:
+        return None
+    side_total = sum(
+        Decimal(str(getattr(political_data, f'{source}_{side}_total_donations') or 0)) for source in sources
+    )
+    return round(side_total / total * 100, 2)
+
+
+def update_summary(political_data):
+    """PoliticalData.update_summary as of this migration; historical models have no methods"""
+    all_sources = ['direct', 'affiliated_pac', 'senior_employee']
+    organization_sources = ['direct', 'affiliated_pac']
+    political_data.overall_conservative_percentage = summary_percentage(political_data, all_sources, 'conservative')
+    political_data.overall_liberal_percentage = summary_percentage(political_data, all_sources, 'liberal')
+    political_data.conservative_percentage_without_employees = summary_percentage(
+        political_data, organization_sources, 'conservative'
+    )
+    political_data.liberal_percentage_without_employees = summary_percentage(
+        political_data, organization_sources, 'liberal'
+    )
+    political_data.any_flagged_pac_donor = any(getattr(political_data, field) for field in FLAGGED_PAC_DONOR_FIELDS)
+
+
+def backfill_summaries(apps, schema_editor):
+    PoliticalData = apps.get_model('companies', 'PoliticalData')
+    fields = [
+        'overall_conservative_percentage', 'overall_liberal_percentage',
+        'conservative_percentage_without_employees', 'liberal_percentage_without_employees',
+        'any_flagged_pac_donor',
+    ]
+    batch = []
+    for political_data in PoliticalData.objects.order_by('id').iterator(chunk_size=BATCH_SIZE):
+        update_summary(political_data)
+        batch.append(political_data)
+        if len(batch) >= BATCH_SIZE:
+            PoliticalData.objects.bulk_update(batch, fields)
+            batch = []
+    PoliticalData.objects.bulk_update(batch, fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0024_businessalternative'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='politicaldata',
+            name='any_flagged_pac_donor',
+            field=models.BooleanField(db_index=True, default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name='politicaldata',
+            name='conservative_percentage_without_employees',
+            field=models.DecimalField(blank=True, db_index=True, decimal_places=2, editable=False, max_digits=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='politicaldata',
+            name='liberal_percentage_without_employees',
+            field=models.DecimalField(blank=True, db_index=True, decimal_places=2, editable=False, max_digits=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='politicaldata',
+            name='overall_conservative_percentage',
+            field=models.DecimalField(blank=True, db_index=True, decimal_places=2, editable=False, max_digits=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='politicaldata',
+            name='overall_liberal_percentage',
+            field=models.DecimalField(blank=True, db_index=True, decimal_places=2, editable=False, max_digits=12, null=True),
+        ),
+        migrations.RunPython(backfill_summaries, migrations.RunPython.noop),
+    ]
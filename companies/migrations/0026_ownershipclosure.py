@@ -0,0 +1,36 @@
+# Generated by Django 5.1.3 on 2026-10-18 18:28
+
+import companies.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def build_closure(apps, schema_editor):
+    apps.get_model('companies', 'OwnershipClosure').objects.rebuild()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0025_politicaldata_summary_columns'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OwnershipClosure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depth', models.PositiveIntegerField()),
+                ('ancestor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='descendant_links', to='companies.business')),
+                ('descendant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ancestor_links', to='companies.business')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['descendant', 'depth'], name='companies_o_descend_a00fff_idx')],
+                'constraints': [models.UniqueConstraint(fields=('ancestor', 'descendant'), name='unique_ownership_path')],
+            },
+            managers=[
+                ('objects', companies.models.OwnershipClosureManager()),
+            ],
+        ),
+        migrations.RunPython(build_closure, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.1.3 on 2026-10-18 18:32
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+# Trigram indexes for infix name matches (icontains) and typo tolerance.
+# pg_trgm ships with contrib and is not installed everywhere, so they are optional;
+# companies.services.search checks for the extension at runtime.
+TRIGRAM_INDEXES = {
+    'business_name_trgm_idx': 'name gin_trgm_ops',
+    'business_name_upper_trgm_idx': '(UPPER(name::text)) gin_trgm_ops',
+}
+
+
+def create_trigram_indexes(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            return
+        cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for name, expression in TRIGRAM_INDEXES.items():
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS {name} ON companies_business USING gin ({expression})')
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        for name in TRIGRAM_INDEXES:
+            cursor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0026_ownershipclosure'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='business',
+            name='search_vector',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector('name', config='english', weight='A'), '||', django.contrib.postgres.search.SearchVector('description', config='english', weight='B'), django.contrib.postgres.search.SearchConfig('english')), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.AddIndex(
+            model_name='business',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='business_search_vector_idx'),
+        ),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
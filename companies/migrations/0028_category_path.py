@@ -0,0 +1,50 @@
+# Generated by Django 5.1.3 on 2026-10-18 19:10
+
+import companies.models
+from django.db import migrations, models
+
+
+def build_paths(apps, schema_editor):
+    for model_name in ('ProductCategory', 'ServiceCategory'):
+        apps.get_model('companies', model_name).objects.rebuild()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0027_business_search_vector'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='productcategory',
+            managers=[
+                ('objects', companies.models.CategoryManager()),
+            ],
+        ),
+        migrations.AlterModelManagers(
+            name='servicecategory',
+            managers=[
+                ('objects', companies.models.CategoryManager()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='productcategory',
+            name='path',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='servicecategory',
+            name='path',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='productcategory',
+            index=models.Index(fields=['path'], name='product_cat_path_idx', opclasses=['text_pattern_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='servicecategory',
+            index=models.Index(fields=['path'], name='service_cat_path_idx', opclasses=['text_pattern_ops']),
+        ),
+        migrations.RunPython(build_paths, migrations.RunPython.noop),
+    ]
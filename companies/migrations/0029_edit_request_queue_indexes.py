@@ -0,0 +1,23 @@
+# Generated by Django 5.1.3 on 2026-10-18 19:14
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0028_category_path'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='editrequest',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='edit_request_queue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='editrequest',
+            index=models.Index(fields=['-created_at', '-id'], name='edit_request_recent_idx'),
+        ),
+    ]
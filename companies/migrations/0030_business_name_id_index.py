@@ -0,0 +1,17 @@
+# Generated by Django 5.1.3 on 2026-10-18 19:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0029_edit_request_queue_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='business',
+            index=models.Index(fields=['name', 'id'], name='business_name_id_idx'),
+        ),
+    ]
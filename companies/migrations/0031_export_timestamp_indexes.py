@@ -0,0 +1,23 @@
+# Generated by Django 5.1.3 on 2026-10-18 19:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0030_business_name_id_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='business',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='politicaldata',
+            name='last_updated',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.1.3 on 2026-10-18 21:02
+
+import heapq
+from collections import Counter, defaultdict
+from django.conf import settings
+from django.db import migrations
+
+BATCH_SIZE = 1000
+
+
+def build_index(apps, schema_editor):
+    """
+    Fill BusinessAlternative, created empty by 0024, scoring as
+    companies.services.alternatives does as of this migration; historical
+    models have no alternatives_to. An index rebuilt by hand since is kept.
+    """
+    Business = apps.get_model('companies', 'Business')
+    BusinessAlternative = apps.get_model('companies', 'BusinessAlternative')
+    PoliticalData = apps.get_model('companies', 'PoliticalData')
+    if BusinessAlternative.objects.exists():
+        return
+
+    # Offerings of every business, and the businesses providing each offering
+    offerings = defaultdict(set)
+    providers = defaultdict(set)
+    for through, column in [(Business.products.through, 'productcategory_id'),
+                            (Business.services.through, 'servicecategory_id')]:
+        for business_id, category_id in through.objects.values_list('business_id', column).iterator():
+            offering = (column, category_id)
+            offerings[business_id].add(offering)
+            providers[offering].add(business_id)
+
+    # Political score from 0 to 1, higher for more liberal businesses; 0.5 without data
+    political = {
+        business_id: (100 - float(percentage or 0)) / 100
+        for business_id, percentage in PoliticalData.objects.values_list(
+            'business_id', 'overall_conservative_percentage'
+        ).iterator()
+    }
+    names = dict(Business.objects.values_list('id', 'name').iterator())
+    size = getattr(settings, 'ALTERNATIVES_INDEX_SIZE', 10)
+
+    batch = []
+    for business_id, offered in offerings.items():
+        overlaps = Counter(
+            candidate_id for offering in offered for candidate_id in providers[offering] if candidate_id != business_id
+        )
+        scores = {
+            candidate_id: overlap / len(offered) * 0.5 + political.get(candidate_id, 0.5) * 0.5
+            for candidate_id, overlap in overlaps.items()
+        }
+        # Ties are broken alphabetically, matching the order the detail page reads them in
+        best = heapq.nsmallest(size, scores, key=lambda candidate_id: (-scores[candidate_id], names[candidate_id]))
+        for candidate_id in best:
+            batch.append(BusinessAlternative(
+                business_id=business_id,
+                alternative_id=candidate_id,
+                score=scores[candidate_id],
+                overlap_count=overlaps[candidate_id],
+            ))
+        if len(batch) >= BATCH_SIZE:
+            BusinessAlternative.objects.bulk_create(batch)
+            batch = []
+    BusinessAlternative.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0031_export_timestamp_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(build_index, migrations.RunPython.noop),
+    ]
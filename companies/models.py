@@ -1,6 +1,12 @@
-from django.db import models
+from decimal import Decimal
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import Case, Count, F, FloatField, OuterRef, Prefetch, Q, Subquery, Value, When
+from django.db.models.functions import Cast, Coalesce, Concat, NullIf, Substr
 from django.conf import settings
 from django.contrib.auth.models import Permission, User
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.contrib.contenttypes.models import ContentType
 from django.utils import timezone
 from django.utils.text import slugify
@@ -16,6 +22,95 @@ def create_csv_import_permission():
     )
     return permission
 
+def _as_decimal(value):
+    """Donation amounts may still be floats or None on unsaved instances"""
+    if value is None:
+        return Decimal('0')
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+# Querysets
+class BusinessQuerySet(models.QuerySet):
+    def with_ancestors(self):
+        """Prefetch every parent company (and its political data) in one extra query"""
+        return self.prefetch_related(
+            Prefetch('ancestor_links', queryset=OwnershipClosure.objects.ancestry())
+        )
+
+    def with_resolved_political_data(self, **lookups):
+        """
+        Businesses whose resolved political data (their own, or failing that the
+        nearest parent company's, as resolve_political_data picks it) matches
+        ``lookups`` on PoliticalData, e.g. overall_conservative_percentage__gt=50
+        """
+        nearest = OwnershipClosure.objects.filter(
+            PoliticalData.meaningful('ancestor__politicaldata__'), descendant_id=OuterRef('pk')
+        ).order_by('depth').values('ancestor__politicaldata__id')[:1]
+        return self.annotate(
+            resolved_political_data_id=Coalesce(Subquery(nearest), F('politicaldata__id'))
+        ).filter(resolved_political_data_id__in=PoliticalData.objects.filter(**lookups).values('id'))
+
+    def in_category(self, category):
+        """
+        Businesses offering ``category`` or any of its subcategories (a ProductCategory
+        or ServiceCategory), found with one indexed range scan over category paths
+        """
+        if isinstance(category, ProductCategory):
+            through, column = Business.products.through, 'productcategory'
+        else:
+            through, column = Business.services.through, 'servicecategory'
+        return self.filter(
+            id__in=through.objects.filter(**{f'{column}__path__startswith': category.path}).values('business_id')
+        )
+
+    def alternatives_to(self, business_id):
+        """
+        Businesses sharing at least one product or service with ``business_id``,
+        annotated with ``overlap_count``, ``conservative_percentage`` and ``score``
+        and ordered by score. The scoring runs entirely in the database, so
+        slicing the result fetches the top alternatives in one query.
+        """
+        ProductThrough = Business.products.through
+        ServiceThrough = Business.services.through
+        my_products = ProductThrough.objects.filter(business_id=business_id).values('productcategory_id')
+        my_services = ServiceThrough.objects.filter(business_id=business_id).values('servicecategory_id')
+
+        def count(queryset):
+            return Coalesce(
+                Subquery(queryset.order_by().values('business_id').annotate(total=Count('*')).values('total')),
+                0
+            )
+
+        total_offerings = (
+            count(ProductThrough.objects.filter(business_id=business_id)) +
+            count(ServiceThrough.objects.filter(business_id=business_id))
+        )
+        overlap_count = (
+            count(ProductThrough.objects.filter(business_id=OuterRef('pk'), productcategory_id__in=my_products)) +
+            count(ServiceThrough.objects.filter(business_id=OuterRef('pk'), servicecategory_id__in=my_services))
+        )
+
+        candidates = (
+            Q(id__in=ProductThrough.objects.filter(productcategory_id__in=my_products).values('business_id')) |
+            Q(id__in=ServiceThrough.objects.filter(servicecategory_id__in=my_services).values('business_id'))
+        )
+
+        return self.filter(candidates).exclude(id=business_id).annotate(
+            overlap_count=overlap_count,
+            conservative_percentage=F('politicaldata__overall_conservative_percentage'),
+        ).annotate(
+            # Political score from 0 to 1, higher for more liberal businesses
+            political_score=Case(
+                When(politicaldata__isnull=True, then=Value(0.5)),
+                default=(Value(100.0) - Cast(Coalesce(F('conservative_percentage'), Value(Decimal('0'))), FloatField())) / Value(100.0),
+                output_field=FloatField(),
+            ),
+            # Weight offering similarity and political score equally
+            score=(
+                Cast(F('overlap_count'), FloatField()) / Cast(NullIf(total_offerings, 0), FloatField()) * Value(0.5) +
+                F('political_score') * Value(0.5)
+            ),
+        ).order_by('-score', 'name')
+
 # Models
 class Business(models.Model):
     name = models.CharField(max_length=200)
@@ -53,11 +148,29 @@ class Business(models.Model):
     
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    # Indexed for incremental exports (companies.services.export)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    # Full-text search document, kept up to date by the database (see companies.services.search)
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector('name', weight='A', config='english') +
+            SearchVector('description', weight='B', config='english')
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    objects = BusinessQuerySet.as_manager()
     
     class Meta:
         verbose_name_plural = "Businesses"
         ordering = ['name']
+        indexes = [
+            GinIndex(fields=['search_vector'], name='business_search_vector_idx'),
+            # Name order with a unique tiebreak, for cursor paging through the business API
+            models.Index(fields=['name', 'id'], name='business_name_id_idx'),
+        ]
         permissions = [
             ("can_import_business_csv", "Can import business data via CSV"),
         ]
@@ -65,77 +178,90 @@ class Business(models.Model):
     def __str__(self):
         return self.name
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored parent so save() can tell when the ownership tree changes
+        if 'parent_company_id' in field_names:
+            instance._loaded_parent_company_id = instance.parent_company_id
+        return instance
+
+    def clean(self):
+        super().clean()
+        if OwnershipClosure.objects.would_create_cycle(self, self.parent_company_id):
+            raise ValidationError({
+                'parent_company': 'A company cannot be owned by itself or one of its subsidiaries.'
+            })
+
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.name)
-        super().save(*args, **kwargs)
+
+        adding = self._state.adding
+        parent_changed = not adding and self._parent_company_changed(kwargs.get('update_fields'))
+        if parent_changed and OwnershipClosure.objects.would_create_cycle(self, self.parent_company_id):
+            raise ValidationError('A company cannot be owned by itself or one of its subsidiaries.')
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if adding:
+                OwnershipClosure.objects.add_business(self)
+            elif parent_changed:
+                OwnershipClosure.objects.move_subtree(self)
+        self._loaded_parent_company_id = self.parent_company_id
+
+    def _parent_company_changed(self, update_fields=None):
+        if update_fields is not None and 'parent_company' not in update_fields:
+            return False
+        if hasattr(self, '_loaded_parent_company_id'):
+            return self._loaded_parent_company_id != self.parent_company_id
+        stored_parent_id = Business.objects.filter(pk=self.pk).values_list('parent_company_id', flat=True).first()
+        return stored_parent_id != self.parent_company_id
+
+    def _parent_chain(self):
+        """Parent companies nearest first, read from the ownership closure in at most one query"""
+        if 'ancestor_links' in getattr(self, '_prefetched_objects_cache', {}):
+            links = sorted(self.ancestor_links.all(), key=lambda link: link.depth)
+        else:
+            links = OwnershipClosure.objects.ancestry().filter(descendant=self)
+        return [link.ancestor for link in links if link.depth > 0]
     
     @property
     def all_subsidiaries(self):
         """Returns all subsidiaries (recursive)"""
-        subs = list(self.subsidiaries.all())
-        for sub in self.subsidiaries.all():
-            subs.extend(sub.all_subsidiaries)
-        return subs
+        return list(
+            Business.objects.filter(
+                ancestor_links__ancestor=self,
+                ancestor_links__depth__gt=0
+            ).order_by('ancestor_links__depth', 'name')
+        )
     
     @property
     def ultimate_parent(self):
         """Returns the topmost parent company"""
-        if not self.parent_company:
-            return self
-        return self.parent_company.ultimate_parent
+        parents = self._parent_chain()
+        return parents[-1] if parents else self
     
-    def has_meaningful_political_data(self, political_data):
+    @staticmethod
+    def has_meaningful_political_data(political_data):
         """Check if political data instance has any non-zero values"""
         if not political_data:
             return False
             
         # Check for any non-zero donation amounts
-        meaningful_fields = [
-            political_data.direct_conservative_total_donations,
-            political_data.direct_liberal_total_donations,
-            political_data.affiliated_pac_conservative_total_donations,
-            political_data.affiliated_pac_liberal_total_donations,
-            political_data.senior_employee_conservative_total_donations,
-            political_data.senior_employee_liberal_total_donations
-        ]
-        
-        # Check for any non-zero/non-None donation amounts
-        has_donations = any(field for field in meaningful_fields if field not in [None, 0, 0.0])
+        has_donations = any(
+            getattr(political_data, field) not in [None, 0, 0.0] for field in PoliticalData.MEANINGFUL_DONATION_FIELDS
+        )
         
         # Check for any True boolean flags
-        boolean_fields = [
-            political_data.direct_america_pac_donor,
-            political_data.direct_save_america_pac_donor,
-            political_data.direct_maga_inc_donor,
-            political_data.affiliated_pac_america_pac_donor,
-            political_data.affiliated_pac_save_america_pac_donor,
-            political_data.affiliated_pac_maga_inc_donor,
-            political_data.senior_employee_trump_donor,
-            political_data.senior_employee_america_pac_donor,
-            political_data.senior_employee_save_america_pac_donor,
-            political_data.senior_employee_maga_inc_donor
-        ]
-        
-        has_flags = any(boolean_fields)
+        has_flags = any(getattr(political_data, field) for field in PoliticalData.MEANINGFUL_FLAG_FIELDS)
         
         return has_donations or has_flags
 
     def get_political_data(self):
         """Returns own political data or inherited data from parent companies"""
-        # Check own political data first
-        if hasattr(self, 'politicaldata') and self.has_meaningful_political_data(self.politicaldata):
-            return self.politicaldata, None
-        
-        # Look up through parent companies
-        current = self.parent_company
-        while current:
-            if hasattr(current, 'politicaldata') and self.has_meaningful_political_data(current.politicaldata):
-                return current.politicaldata, current
-            current = current.parent_company
-        
-        # If no meaningful data found anywhere, return own empty data
-        return self.politicaldata if hasattr(self, 'politicaldata') else None, None
+        from companies.services.political_data import resolve_political_data
+        return resolve_political_data([self])[self.pk]
 
     @property
     def has_political_data(self):
@@ -149,63 +275,169 @@ class Business(models.Model):
         _, inherited_from = self.get_political_data()
         return inherited_from
     
-    def get_alternative_businesses(self, limit=10):
+    def get_alternative_businesses(self, limit=10, category=None):
         """
         Find alternative businesses based on product/service similarity and political leanings.
+        Reads the precomputed alternatives index (see companies.services.alternatives),
+        so the lookup is a single indexed query however large the catalog grows.
+        With a product or service ``category``, alternatives are limited to businesses
+        in that category's subtree and scored live, since the index only keeps the overall top few.
         Returns businesses ordered by a weighted score.
         """
-        # Get all products and services of this business
-        my_products = set(self.products.values_list('id', flat=True))
-        my_services = set(self.services.values_list('id', flat=True))
-        total_offerings = len(my_products) + len(my_services)
-
-        if total_offerings == 0:
-            return Business.objects.none()
-
-        # Get other businesses that share at least one product or service
-        alternatives = Business.objects.exclude(id=self.id).filter(
-            models.Q(products__in=my_products) | 
-            models.Q(services__in=my_services)
-        ).distinct()
-
-        # Calculate similarity scores
-        similarity_scores = []
-        my_political_data = self.politicaldata
-
-        for business in alternatives:
-            # Calculate offering overlap
-            their_products = set(business.products.values_list('id', flat=True))
-            their_services = set(business.services.values_list('id', flat=True))
-            
-            product_overlap = len(my_products & their_products)
-            service_overlap = len(my_services & their_services)
-            total_overlap = product_overlap + service_overlap
+        if category is not None:
+            alternatives = Business.objects.alternatives_to(self.pk).in_category(category).select_related(
+                'politicaldata'
+            ).with_ancestors()[:limit]
+            return [
+                {
+                    'business': alternative,
+                    'score': alternative.score,
+                    'overlap_count': alternative.overlap_count,
+                    'conservative_percentage': alternative.conservative_percentage,
+                }
+                for alternative in alternatives
+            ]
+
+        entries = self.alternative_entries.select_related(
+            'alternative__politicaldata'
+        ).prefetch_related(
+            Prefetch('alternative__ancestor_links', queryset=OwnershipClosure.objects.ancestry())
+        ).order_by('-score', 'alternative__name')[:limit]
+
+        return [
+            {
+                'business': entry.alternative,
+                'score': entry.score,
+                'overlap_count': entry.overlap_count,
+                'conservative_percentage': entry.alternative.politicaldata.overall_conservative_percentage if hasattr(entry.alternative, 'politicaldata') else None
+            }
+            for entry in entries
+        ]
 
-            # Calculate offering similarity score (0 to 1)
-            offering_score = total_overlap / total_offerings
+class OwnershipClosureManager(models.Manager):
+    use_in_migrations = True
 
-            # Calculate political score (0 to 1, higher for more liberal businesses)
-            try:
-                conservative_pct = float(business.politicaldata.overall_conservative_percentage or 0)
-                political_score = (100 - conservative_pct) / 100
-            except (AttributeError, ZeroDivisionError):
-                political_score = 0.5  # Default if no political data
+    def ancestry(self):
+        """Links to parent companies, nearest first, with their political data"""
+        return self.filter(depth__gt=0).select_related('ancestor__politicaldata').order_by('depth')
 
-            # Calculate weighted score
-            # Weight offering similarity and political score equally
-            weighted_score = (offering_score * 0.5) + (political_score * 0.5)
+    def would_create_cycle(self, business, parent_id):
+        """True if ``parent_id`` is ``business`` itself or one of its subsidiaries"""
+        if business.pk is None or parent_id is None:
+            return False
+        return self.filter(ancestor_id=business.pk, descendant_id=parent_id).exists()
+
+    def add_business(self, business):
+        """Link a newly created business into the ownership tree"""
+        self.create(ancestor_id=business.pk, descendant_id=business.pk, depth=0)
+        if business.parent_company_id:
+            self.move_subtree(business)
+
+    def move_subtree(self, business):
+        """Re-link ``business`` and everything it owns under its current parent company"""
+        subtree = list(self.filter(ancestor_id=business.pk).values_list('descendant_id', 'depth'))
+        subtree_ids = [descendant_id for descendant_id, _ in subtree]
+
+        # Drop the paths from the old parent companies into the subtree
+        self.filter(descendant_id__in=subtree_ids).exclude(ancestor_id__in=subtree_ids).delete()
+
+        if business.parent_company_id:
+            ancestors = self.filter(descendant_id=business.parent_company_id).values_list('ancestor_id', 'depth')
+            self.bulk_create([
+                self.model(
+                    ancestor_id=ancestor_id,
+                    descendant_id=descendant_id,
+                    depth=ancestor_depth + 1 + descendant_depth
+                )
+                for ancestor_id, ancestor_depth in ancestors
+                for descendant_id, descendant_depth in subtree
+            ])
+
+    def detach_subtrees(self, business):
+        """Cut the companies owned by ``business`` loose from its parents before it is deleted"""
+        self.filter(
+            ancestor_id__in=self.filter(descendant_id=business.pk, depth__gt=0).values('ancestor_id'),
+            descendant_id__in=self.filter(ancestor_id=business.pk, depth__gt=0).values('descendant_id'),
+        ).delete()
+
+    def rebuild(self, batch_size=5000):
+        """
+        Rebuild the whole table from parent_company.
+        Returns the ids of businesses whose parent chain loops back on itself;
+        those are linked to themselves only until the loop is fixed.
+        """
+        Business = self.model._meta.get_field('descendant').related_model
+        parents = dict(Business._default_manager.values_list('id', 'parent_company_id'))
+
+        rows, cycles = [], []
+        for business_id in parents:
+            chain = []
+            seen = {business_id}
+            current = parents[business_id]
+            while current is not None and current not in seen:
+                seen.add(current)
+                chain.append(current)
+                current = parents.get(current)
+
+            rows.append(self.model(ancestor_id=business_id, descendant_id=business_id, depth=0))
+            if current is not None:
+                cycles.append(business_id)
+                continue
+            rows.extend(
+                self.model(ancestor_id=ancestor_id, descendant_id=business_id, depth=depth)
+                for depth, ancestor_id in enumerate(chain, start=1)
+            )
+
+        self.all().delete()
+        self.bulk_create(rows, batch_size=batch_size)
+        return cycles
+
+class OwnershipClosure(models.Model):
+    """
+    Every (ancestor, descendant) pair in the parent_company tree, including each
+    business paired with itself at depth 0. Maintained by Business.save() so the
+    whole ancestry or subtree of a business is one indexed query.
+    """
+    ancestor = models.ForeignKey(Business, on_delete=models.CASCADE, related_name='descendant_links')
+    descendant = models.ForeignKey(Business, on_delete=models.CASCADE, related_name='ancestor_links')
+    depth = models.PositiveIntegerField()
+
+    objects = OwnershipClosureManager()
 
-            similarity_scores.append({
-                'business': business,
-                'score': weighted_score,
-                'overlap_count': total_overlap,
-                'conservative_percentage': business.politicaldata.overall_conservative_percentage if hasattr(business, 'politicaldata') else None
-            })
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['ancestor', 'descendant'],
+                name='unique_ownership_path'
+            )
+        ]
+        indexes = [
+            models.Index(fields=['descendant', 'depth'])
+        ]
 
-        # Sort by weighted score
-        similarity_scores.sort(key=lambda x: x['score'], reverse=True)
-        
-        return similarity_scores[:limit]
+    def __str__(self):
+        return f"{self.ancestor.name} owns {self.descendant.name}"
+
+class BusinessAlternative(models.Model):
+    """Precomputed top alternatives for a business, maintained by companies.services.alternatives"""
+    business = models.ForeignKey(Business, on_delete=models.CASCADE, related_name='alternative_entries')
+    alternative = models.ForeignKey(Business, on_delete=models.CASCADE, related_name='+')
+    score = models.FloatField()
+    overlap_count = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['business', 'alternative'],
+                name='unique_business_alternative'
+            )
+        ]
+        indexes = [
+            models.Index(fields=['business', '-score'])
+        ]
+
+    def __str__(self):
+        return f"{self.alternative.name} as an alternative to {self.business.name}"
 
 class CSVImportRateLimit(models.Model):
     """Track CSV import attempts for rate limiting"""
@@ -343,6 +575,11 @@ class EditRequest(models.Model):
         permissions = [
             ("can_review_edits", "Can review edit requests"),
         ]
+        indexes = [
+            # Review queue: newest first within a status, paged by (created_at, id)
+            models.Index(fields=['status', '-created_at', '-id'], name='edit_request_queue_idx'),
+            models.Index(fields=['-created_at', '-id'], name='edit_request_recent_idx'),
+        ]
 
     @property
     def direct_conservative_percentage(self):
@@ -379,7 +616,119 @@ class Location(models.Model):
     latitude = models.DecimalField(max_digits=9, decimal_places=6)
     longitude = models.DecimalField(max_digits=9, decimal_places=6)
 
-class ServiceCategory(models.Model):
+def category_path_segment(category_id):
+    """Fixed-width path segment, so a subtree's paths share its root's path as a prefix"""
+    return f'{category_id:010d}/'
+
+class CategoryManager(models.Manager):
+    use_in_migrations = True
+
+    def descendants_of(self, category, include_self=True):
+        """Every category below ``category``, at any depth, in one indexed range query on ``path``"""
+        categories = self.filter(path__startswith=category.path)
+        if not include_self:
+            categories = categories.exclude(pk=category.pk)
+        return categories
+
+    def would_create_cycle(self, category, parent_id):
+        """True if ``parent_id`` is ``category`` itself or one of its subcategories"""
+        if category.pk is None or parent_id is None:
+            return False
+        path = self.filter(pk=category.pk).values_list('path', flat=True).first()
+        return bool(path) and self.filter(pk=parent_id, path__startswith=path).exists()
+
+    def move_subtree(self, category):
+        """Re-root the paths of ``category`` and everything under it below its current parent"""
+        old_path = self.filter(pk=category.pk).values_list('path', flat=True).get()
+        parent_path = ''
+        if category.parent_id:
+            parent_path = self.filter(pk=category.parent_id).values_list('path', flat=True).get()
+        new_path = parent_path + category_path_segment(category.pk)
+        if not old_path:
+            self.filter(pk=category.pk).update(path=new_path)
+        elif new_path != old_path:
+            self.filter(path__startswith=old_path).update(
+                path=Concat(Value(new_path), Substr('path', len(old_path) + 1))
+            )
+        category.path = new_path
+
+    def rebuild(self, batch_size=5000):
+        """
+        Recompute every path from ``parent``.
+        Returns the ids of categories where a parent chain loops back on itself;
+        each is treated as a root category until the loop is fixed.
+        """
+        rows = list(self.values_list('id', 'parent_id', 'path'))
+        parents = {category_id: parent_id for category_id, parent_id, _ in rows}
+        paths = {}
+        cycles = []
+        for category_id in parents:
+            if category_id in paths:
+                continue
+            chain = [category_id]
+            seen = {category_id}
+            current = parents[category_id]
+            while current is not None and current not in paths and current not in seen:
+                seen.add(current)
+                chain.append(current)
+                current = parents.get(current)
+            if current is not None and current not in paths:
+                cycles.append(category_id)
+                paths[category_id] = category_path_segment(category_id)
+                continue
+            # Down from the nearest ancestor with a known path
+            prefix = paths.get(current, '')
+            for ancestor_id in reversed(chain):
+                prefix += category_path_segment(ancestor_id)
+                paths[ancestor_id] = prefix
+
+        stale = [
+            self.model(id=category_id, path=paths[category_id])
+            for category_id, _, path in rows
+            if paths[category_id] != path
+        ]
+        self.bulk_update(stale, ['path'], batch_size=batch_size)
+        return cycles
+
+class CategoryTreeMixin:
+    """
+    Keeps ``path`` in sync with ``parent``: the zero-padded ids from the root
+    category down to this one, so a whole subtree is one ``path__startswith``
+    range scan (see CategoryManager.descendants_of).
+    """
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored parent so save() can tell when the tree changes
+        if 'parent_id' in field_names:
+            instance._loaded_parent_id = instance.parent_id
+        return instance
+
+    def clean(self):
+        super().clean()
+        if type(self).objects.would_create_cycle(self, self.parent_id):
+            raise ValidationError({'parent': 'A category cannot be placed under itself or one of its subcategories.'})
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        parent_changed = not adding and self._parent_changed(kwargs.get('update_fields'))
+        if parent_changed and type(self).objects.would_create_cycle(self, self.parent_id):
+            raise ValidationError('A category cannot be placed under itself or one of its subcategories.')
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if adding or parent_changed:
+                type(self).objects.move_subtree(self)
+        self._loaded_parent_id = self.parent_id
+
+    def _parent_changed(self, update_fields=None):
+        if update_fields is not None and 'parent' not in update_fields:
+            return False
+        if hasattr(self, '_loaded_parent_id'):
+            return self._loaded_parent_id != self.parent_id
+        return type(self).objects.filter(pk=self.pk).values_list('parent_id', flat=True).first() != self.parent_id
+
+class ServiceCategory(CategoryTreeMixin, models.Model):
     name = models.CharField(max_length=100)
     parent = models.ForeignKey(
         'self',
@@ -389,10 +738,18 @@ class ServiceCategory(models.Model):
         related_name='children'
     )
     slug = models.SlugField(unique=True)
+    # Ids from the root category down to this one; maintained by save() and CategoryManager
+    path = models.TextField(default='', editable=False)
+
+    objects = CategoryManager()
     
     class Meta:
         verbose_name_plural = "Service Categories"
         ordering = ['name']
+        indexes = [
+            # Pattern ops let path__startswith use the index whatever the database collation
+            models.Index(fields=['path'], name='service_cat_path_idx', opclasses=['text_pattern_ops'])
+        ]
     
     def __str__(self):
         return self.name
@@ -430,8 +787,58 @@ class PoliticalData(models.Model):
     senior_employee_save_america_pac_donor = models.BooleanField(default=False)
     senior_employee_maga_inc_donor = models.BooleanField(default=False)
     
+    # Summary data, derived from the fields above by update_summary()
+    overall_conservative_percentage = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True, editable=False, db_index=True)
+    overall_liberal_percentage = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True, editable=False, db_index=True)
+    conservative_percentage_without_employees = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True, editable=False, db_index=True)
+    liberal_percentage_without_employees = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True, editable=False, db_index=True)
+    any_flagged_pac_donor = models.BooleanField(default=False, editable=False, db_index=True)
+    
     # Metadata
-    last_updated = models.DateTimeField(auto_now=True)
+    last_updated = models.DateTimeField(auto_now=True, db_index=True)
+
+    SUMMARY_FIELDS = [
+        'overall_conservative_percentage',
+        'overall_liberal_percentage',
+        'conservative_percentage_without_employees',
+        'liberal_percentage_without_employees',
+        'any_flagged_pac_donor',
+    ]
+
+    # What Business.has_meaningful_political_data looks at
+    MEANINGFUL_DONATION_FIELDS = [
+        'direct_conservative_total_donations',
+        'direct_liberal_total_donations',
+        'affiliated_pac_conservative_total_donations',
+        'affiliated_pac_liberal_total_donations',
+        'senior_employee_conservative_total_donations',
+        'senior_employee_liberal_total_donations',
+    ]
+
+    MEANINGFUL_FLAG_FIELDS = [
+        'direct_america_pac_donor',
+        'direct_save_america_pac_donor',
+        'direct_maga_inc_donor',
+        'affiliated_pac_america_pac_donor',
+        'affiliated_pac_save_america_pac_donor',
+        'affiliated_pac_maga_inc_donor',
+        'senior_employee_trump_donor',
+        'senior_employee_america_pac_donor',
+        'senior_employee_save_america_pac_donor',
+        'senior_employee_maga_inc_donor',
+    ]
+
+    FLAGGED_PAC_DONOR_FIELDS = [
+        'direct_america_pac_donor',
+        'direct_save_america_pac_donor',
+        'direct_maga_inc_donor',
+        'affiliated_pac_america_pac_donor',
+        'affiliated_pac_save_america_pac_donor',
+        'affiliated_pac_maga_inc_donor',
+        'senior_employee_america_pac_donor',
+        'senior_employee_save_america_pac_donor',
+        'senior_employee_maga_inc_donor',
+    ]
 
     class Meta:
         verbose_name_plural = "Political Data"
@@ -439,6 +846,16 @@ class PoliticalData(models.Model):
     def __str__(self):
         return f"Political data for {self.business.name}"
 
+    @classmethod
+    def meaningful(cls, prefix=''):
+        """Q matching the records Business.has_meaningful_political_data accepts, through ``prefix``"""
+        condition = Q()
+        for field in cls.MEANINGFUL_DONATION_FIELDS:
+            condition |= Q(**{f'{prefix}{field}__gt': 0}) | Q(**{f'{prefix}{field}__lt': 0})
+        for field in cls.MEANINGFUL_FLAG_FIELDS:
+            condition |= Q(**{f'{prefix}{field}': True})
+        return condition
+
     @property
     def direct_conservative_percentage(self):
         """Calculate percentage of direct conservative donations"""
@@ -481,43 +898,41 @@ class PoliticalData(models.Model):
             return None
         return round((self.senior_employee_liberal_total_donations or 0) / self.senior_employee_total_donations * 100, 2)
 
-    @property
-    def overall_conservative_percentage(self):
-        """Calculate overall percentage of conservative donations across direct and PAC"""
-        total = (self.direct_total_donations or 0) + (self.affiliated_pac_total_donations or 0) + (self.senior_employee_total_donations or 0)
-        if not total:
-            return None
-        conservative_total = (self.direct_conservative_total_donations or 0) + (self.affiliated_pac_conservative_total_donations or 0) + (self.senior_employee_conservative_total_donations or 0)
-        return round(conservative_total / total * 100, 2)
+    def save(self, *args, **kwargs):
+        self.update_summary()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | set(self.SUMMARY_FIELDS)
+        super().save(*args, **kwargs)
 
-    @property
-    def overall_liberal_percentage(self):
-        """Calculate overall percentage of liberal donations across direct and PAC"""
-        total = (self.direct_total_donations or 0) + (self.affiliated_pac_total_donations or 0) + (self.senior_employee_total_donations or 0)
-        if not total:
-            return None
-        liberal_total = (self.direct_liberal_total_donations or 0) + (self.affiliated_pac_liberal_total_donations or 0) + (self.senior_employee_liberal_total_donations or 0)
-        return round(liberal_total / total * 100, 2)
-    
-    @property
-    def conservative_percentage_without_employees(self):
-        """Calculate overall percentage of conservative donations excluding employee data"""
-        total = (self.direct_total_donations or 0) + (self.affiliated_pac_total_donations or 0)
+    def _summary_percentage(self, sources, side):
+        """Percentage of `side` donations across the given donation sources"""
+        total = sum(_as_decimal(getattr(self, f'{source}_total_donations')) for source in sources)
         if not total:
             return None
-        conservative_total = (self.direct_conservative_total_donations or 0) + (self.affiliated_pac_conservative_total_donations or 0)
-        return round(conservative_total / total * 100, 2)
+        side_total = sum(_as_decimal(getattr(self, f'{source}_{side}_total_donations')) for source in sources)
+        return round(side_total / total * 100, 2)
 
-    @property
-    def liberal_percentage_without_employees(self):
-        """Calculate overall percentage of liberal donations excluding employee data"""
-        total = (self.direct_total_donations or 0) + (self.affiliated_pac_total_donations or 0)
-        if not total:
-            return None
-        liberal_total = (self.direct_liberal_total_donations or 0) + (self.affiliated_pac_liberal_total_donations or 0)
-        return round(liberal_total / total * 100, 2)
+    def update_summary(self):
+        """
+        Recompute the stored summary columns from the donation fields.
+        Called on save; bulk_create/bulk_update callers must call it themselves
+        and include SUMMARY_FIELDS.
+        """
+        all_sources = ['direct', 'affiliated_pac', 'senior_employee']
+        organization_sources = ['direct', 'affiliated_pac']
+
+        # Overall percentages across direct, PAC and employee donations
+        self.overall_conservative_percentage = self._summary_percentage(all_sources, 'conservative')
+        self.overall_liberal_percentage = self._summary_percentage(all_sources, 'liberal')
 
-class ProductCategory(models.Model):
+        # Overall percentages excluding employee data
+        self.conservative_percentage_without_employees = self._summary_percentage(organization_sources, 'conservative')
+        self.liberal_percentage_without_employees = self._summary_percentage(organization_sources, 'liberal')
+
+        self.any_flagged_pac_donor = any(getattr(self, field) for field in self.FLAGGED_PAC_DONOR_FIELDS)
+
+class ProductCategory(CategoryTreeMixin, models.Model):
     name = models.CharField(max_length=100)
     parent = models.ForeignKey(
         'self',
@@ -527,10 +942,18 @@ class ProductCategory(models.Model):
         related_name='children'
     )
     slug = models.SlugField(unique=True)
+    # Ids from the root category down to this one; maintained by save() and CategoryManager
+    path = models.TextField(default='', editable=False)
+
+    objects = CategoryManager()
     
     class Meta:
         verbose_name_plural = "Product Categories"
         ordering = ['name']
+        indexes = [
+            # Pattern ops let path__startswith use the index whatever the database collation
+            models.Index(fields=['path'], name='product_cat_path_idx', opclasses=['text_pattern_ops'])
+        ]
     
     def __str__(self):
         return self.name
@@ -0,0 +1,248 @@
+"""
+Alternatives index for the business directory.
+
+Each business keeps its top ALTERNATIVES_INDEX_SIZE alternatives in
+BusinessAlternative, so the detail page can read them with a single indexed
+query. The signal handlers in companies.signals keep the index up to date
+when products/services or political data change, and
+``python manage.py rebuild_alternatives`` rebuilds it from scratch.
+
+Scores are computed in the database by Business.objects.alternatives_to.
+Setting ALTERNATIVES_SCORING_ENGINE = 'python' falls back to scoring in
+Python, which is kept for comparison.
+"""
+import heapq
+from collections import Counter, defaultdict
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from companies.models import Business, BusinessAlternative, PoliticalData
+
+ProductThrough = Business.products.through
+ServiceThrough = Business.services.through
+
+SCORING_ENGINES = ('sql', 'python')
+
+
+def get_index_size():
+    """Number of alternatives stored per business"""
+    return getattr(settings, 'ALTERNATIVES_INDEX_SIZE', 10)
+
+
+def get_scoring_engine():
+    return getattr(settings, 'ALTERNATIVES_SCORING_ENGINE', 'sql')
+
+
+def political_score(conservative_percentage, has_political_data=True):
+    """Political score from 0 to 1, higher for more liberal businesses"""
+    if not has_political_data:
+        return 0.5  # Default if no political data
+    conservative_pct = float(conservative_percentage or 0)
+    return (100 - conservative_pct) / 100
+
+
+def weighted_score(overlap_count, total_offerings, political):
+    """Weight offering similarity and political score equally"""
+    offering_score = overlap_count / total_offerings
+    return (offering_score * 0.5) + (political * 0.5)
+
+
+def _offerings(business_id):
+    products = set(
+        ProductThrough.objects.filter(business_id=business_id).values_list('productcategory_id', flat=True)
+    )
+    services = set(
+        ServiceThrough.objects.filter(business_id=business_id).values_list('servicecategory_id', flat=True)
+    )
+    return products, services
+
+
+def _overlap_counts(business_id, products, services):
+    """Number of shared products/services for every other business sharing at least one"""
+    overlaps = Counter()
+    if products:
+        overlaps.update(
+            ProductThrough.objects.filter(productcategory_id__in=products)
+            .exclude(business_id=business_id)
+            .values_list('business_id', flat=True)
+        )
+    if services:
+        overlaps.update(
+            ServiceThrough.objects.filter(servicecategory_id__in=services)
+            .exclude(business_id=business_id)
+            .values_list('business_id', flat=True)
+        )
+    return overlaps
+
+
+def _offering_totals(business_ids):
+    """Total number of products plus services for each business"""
+    totals = Counter()
+    for through in (ProductThrough, ServiceThrough):
+        totals.update(dict(
+            through.objects.filter(business_id__in=business_ids)
+            .values('business_id')
+            .annotate(total=Count('id'))
+            .values_list('business_id', 'total')
+        ))
+    return totals
+
+
+def _political_scores(business_ids):
+    scores = dict.fromkeys(business_ids, political_score(None, has_political_data=False))
+    for business_id, conservative_percentage in PoliticalData.objects.filter(
+        business_id__in=business_ids
+    ).values_list('business_id', 'overall_conservative_percentage'):
+        scores[business_id] = political_score(conservative_percentage)
+    return scores
+
+
+def compute_alternatives(business_id, limit=None, engine=None):
+    """
+    Score every business sharing a product or service with ``business_id`` and
+    return the best ``limit`` as unsaved BusinessAlternative rows.
+    """
+    limit = limit or get_index_size()
+    engine = engine or get_scoring_engine()
+    if engine not in SCORING_ENGINES:
+        raise ValueError(f"Unknown alternatives scoring engine: {engine}")
+
+    if engine == 'python':
+        return _score_in_python(business_id, limit)
+
+    return [
+        BusinessAlternative(
+            business_id=business_id,
+            alternative_id=candidate_id,
+            score=score,
+            overlap_count=overlap_count,
+        )
+        for candidate_id, score, overlap_count in Business.objects.alternatives_to(business_id)
+        .values_list('id', 'score', 'overlap_count')[:limit]
+    ]
+
+
+def _score_in_python(business_id, limit):
+    products, services = _offerings(business_id)
+    total_offerings = len(products) + len(services)
+    if total_offerings == 0:
+        return []
+
+    overlaps = _overlap_counts(business_id, products, services)
+    if not overlaps:
+        return []
+
+    political = _political_scores(overlaps.keys())
+    names = dict(Business.objects.filter(id__in=overlaps.keys()).values_list('id', 'name'))
+    scores = {
+        candidate_id: weighted_score(overlap, total_offerings, political[candidate_id])
+        for candidate_id, overlap in overlaps.items()
+    }
+
+    # Ties are broken alphabetically, matching the order the detail page reads them in
+    best = heapq.nsmallest(limit, scores, key=lambda candidate_id: (-scores[candidate_id], names[candidate_id]))
+    return [
+        BusinessAlternative(
+            business_id=business_id,
+            alternative_id=candidate_id,
+            score=scores[candidate_id],
+            overlap_count=overlaps[candidate_id],
+        )
+        for candidate_id in best
+    ]
+
+
+def rebuild_alternatives(business_ids, engine=None):
+    """Recompute the stored alternatives of each business from scratch"""
+    with transaction.atomic():
+        for business_id in business_ids:
+            entries = compute_alternatives(business_id, engine=engine)
+            BusinessAlternative.objects.filter(business_id=business_id).delete()
+            BusinessAlternative.objects.bulk_create(entries)
+
+
+def reindex_alternative(alternative_id):
+    """
+    Re-score ``alternative_id`` in the stored alternatives of every business that
+    shares an offering with it or currently lists it.
+
+    Lists are patched in place where possible; a full rebuild is only needed for
+    businesses whose list ``alternative_id`` dropped out of or moved down in,
+    since another candidate may now outrank it.
+    """
+    size = get_index_size()
+    products, services = _offerings(alternative_id)
+    overlaps = _overlap_counts(alternative_id, products, services)
+    listed = {
+        entry.business_id: entry
+        for entry in BusinessAlternative.objects.filter(alternative_id=alternative_id)
+    }
+    neighbours = set(overlaps) | set(listed)
+    if not neighbours:
+        return
+
+    totals = _offering_totals(neighbours)
+    political = _political_scores([alternative_id])[alternative_id]
+
+    # Other stored alternatives per neighbour, lowest score first
+    others = defaultdict(list)
+    for entry_id, business_id, score in (
+        BusinessAlternative.objects.filter(business_id__in=neighbours)
+        .exclude(alternative_id=alternative_id)
+        .order_by('score')
+        .values_list('id', 'business_id', 'score')
+    ):
+        others[business_id].append((entry_id, score))
+
+    to_rebuild, to_create, to_update, to_delete = [], [], [], []
+    for business_id in neighbours:
+        overlap = overlaps.get(business_id, 0)
+        entry = listed.get(business_id)
+
+        if not overlap or not totals.get(business_id):
+            if entry:
+                to_rebuild.append(business_id)
+            continue
+
+        score = weighted_score(overlap, totals[business_id], political)
+        if entry:
+            if score >= entry.score:
+                entry.score = score
+                entry.overlap_count = overlap
+                to_update.append(entry)
+            else:
+                to_rebuild.append(business_id)
+            continue
+
+        current = others[business_id]
+        if len(current) < size or score > current[0][1]:
+            to_create.append(BusinessAlternative(
+                business_id=business_id,
+                alternative_id=alternative_id,
+                score=score,
+                overlap_count=overlap,
+            ))
+            if len(current) >= size:
+                to_delete.append(current[0][0])
+
+    with transaction.atomic():
+        BusinessAlternative.objects.filter(id__in=to_delete).delete()
+        BusinessAlternative.objects.bulk_update(to_update, ['score', 'overlap_count'])
+        BusinessAlternative.objects.bulk_create(to_create)
+        rebuild_alternatives(to_rebuild)
+
+
+def offerings_changed(business_id):
+    """Products or services of a business changed"""
+    rebuild_alternatives([business_id])
+    reindex_alternative(business_id)
+
+
+def political_data_changed(business_id):
+    """Political data of a business changed, which only affects its score as an alternative"""
+    reindex_alternative(business_id)
+
+
+def alternative_removed(business_id):
+    """A business lost one of its stored alternatives and needs a replacement"""
+    rebuild_alternatives([business_id])
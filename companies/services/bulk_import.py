@@ -0,0 +1,212 @@
+"""
+Bulk import of donation data for many businesses at once.
+
+Two upload formats are accepted:
+
+- a CSV with a ``Company`` column next to the usual donation columns
+  (``Recipient``, ``View``, ``From Organization``, ``From PACs``,
+  ``From Individuals``). A company's rows need not be adjacent. Optional
+  ``Website``, ``Description`` and ``Source URL`` columns fill in new
+  businesses and their data sources.
+- a ZIP of donation CSVs in the single-business import format, one per
+  company, each named after its company (``Acme Corp.csv``).
+
+Rows are streamed through one DonationAggregator, so only the running totals
+of each company are held in memory. Businesses are matched by the slug of their name. New businesses,
+PoliticalData and DataSource rows are written with bulk queries, in
+transactions of ``batch_size`` companies. A row that cannot be parsed is
+reported and skipped, and a batch that fails to save is reported without
+undoing the batches before it.
+"""
+import io
+import logging
+import time
+import zipfile
+from collections import namedtuple
+from pathlib import PurePath
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+from django.utils.text import slugify
+from companies.models import Business, DataSource, OwnershipClosure, PoliticalData
+from companies.services import alternatives, suggest
+from companies.services.donations import FLAG_FIELDS, TOTAL_FIELDS, DonationAggregator
+from companies.services.search_cache import invalidate_search_cache
+
+logger = logging.getLogger(__name__)
+
+COMPANY_COLUMN = 'Company'
+NAME_LENGTH = Business._meta.get_field('name').max_length
+SLUG_LENGTH = Business._meta.get_field('slug').max_length
+
+RowError = namedtuple('RowError', ['source', 'line', 'message'])
+
+
+class ImportReport:
+    def __init__(self):
+        self.rows = 0
+        self.companies_created = 0
+        self.companies_updated = 0
+        self.errors = []
+        self.elapsed = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self):
+        return (
+            f'{self.rows} rows, {self.companies_created} businesses created, '
+            f'{self.companies_updated} updated, {len(self.errors)} errors '
+            f'in {self.elapsed:.1f}s ({self.rows_per_second:,.0f} rows/s)'
+        )
+
+
+EXTRA_COLUMNS = ('Website', 'Description', 'Source URL')
+
+
+class CompanyData:
+    def __init__(self, name, totals, extras, default_source_url=None):
+        self.name = name
+        self.totals = totals
+        self.website = next(filter(None, extras['Website']), '')
+        self.description = next(filter(None, extras['Description']), '')
+        self.source_urls = {url or default_source_url for url in extras['Source URL'] or ['']} - {None}
+
+
+def _reindex_alternatives(business_ids):
+    for business_id in business_ids:
+        alternatives.political_data_changed(business_id)
+
+
+class BulkDonationImporter:
+    def __init__(self, batch_size=500, source_url=None, progress=None):
+        self.batch_size = batch_size
+        self.source_url = source_url
+        # Called with (companies written, companies in total) after each batch
+        self.progress = progress
+        self.report = ImportReport()
+        self.names = {}
+        self.aggregator = DonationAggregator(
+            key_column=COMPANY_COLUMN, key=self._company_slug, extra_columns=EXTRA_COLUMNS
+        )
+
+    def run(self, file, filename):
+        """Import an open binary file (CSV or ZIP) and return the ImportReport"""
+        start = time.monotonic()
+        if filename.lower().endswith('.zip'):
+            self._read_zip(file)
+        elif filename.lower().endswith('.csv'):
+            self._read_csv(file, filename)
+        else:
+            raise ValueError('Please upload a CSV or ZIP file.')
+
+        self.report.rows = self.aggregator.rows
+        self._write()
+        self.report.elapsed = time.monotonic() - start
+        logger.info(f'Bulk donation import of {filename}: {self.report}')
+        return self.report
+
+    def _error(self, source, line, message):
+        self.report.errors.append(RowError(source, line, message))
+
+    def _read_zip(self, file):
+        with zipfile.ZipFile(file) as archive:
+            for member in archive.infolist():
+                path = PurePath(member.filename)
+                if member.is_dir() or path.suffix.lower() != '.csv' or path.name.startswith('.'):
+                    continue
+                with archive.open(member) as csv_file:
+                    self._read_csv(csv_file, member.filename, company=path.stem)
+
+    def _read_csv(self, file, source, company=None):
+        """Aggregate one CSV into the per-company totals; ``company`` is set for single-company files"""
+        try:
+            errors = self.aggregator.read(io.TextIOWrapper(file, encoding='utf-8-sig', newline=''), company)
+        except ValueError as e:
+            self._error(source, 1, str(e))
+            return
+        for line, message in errors:
+            self._error(source, line, message)
+
+    def _company_slug(self, value):
+        """Group rows by the slug of their company name, keeping the first spelling seen"""
+        name = (value or '').strip()
+        slug = slugify(name)[:SLUG_LENGTH]
+        if not slug:
+            raise ValueError('Missing company name')
+        if len(name) > NAME_LENGTH:
+            raise ValueError(f'Company name longer than {NAME_LENGTH} characters')
+        self.names.setdefault(slug, name)
+        return slug
+
+    def _write(self):
+        companies = [
+            (slug, CompanyData(self.names[slug], totals, self.aggregator.extras[slug], self.source_url))
+            for slug, totals in self.aggregator.totals.items()
+        ]
+        try:
+            for offset in range(0, len(companies), self.batch_size):
+                batch = companies[offset:offset + self.batch_size]
+                try:
+                    self._write_batch(batch)
+                except DatabaseError as e:
+                    names = ', '.join(data.name for _, data in batch[:5])
+                    self._error('database', None, f'Batch of {len(batch)} companies ({names}, ...) not saved: {e}')
+                if self.progress:
+                    self.progress(offset + len(batch), len(companies))
+        finally:
+            # Bulk writes skip the signals that keep search results and suggestions fresh
+            invalidate_search_cache()
+            suggest.invalidate_index()
+
+    @transaction.atomic
+    def _write_batch(self, batch):
+        existing = Business.objects.in_bulk([slug for slug, _ in batch], field_name='slug')
+        new = Business.objects.bulk_create([
+            Business(
+                name=data.name,
+                slug=slug,
+                website=data.website or None,
+                description=data.description,
+            )
+            for slug, data in batch if slug not in existing
+        ])
+        OwnershipClosure.objects.bulk_create([
+            OwnershipClosure(ancestor=business, descendant=business, depth=0) for business in new
+        ])
+        businesses = {**existing, **{business.slug: business for business in new}}
+
+        political_data = PoliticalData.objects.in_bulk(
+            [business.pk for business in businesses.values()], field_name='business_id'
+        )
+        to_create, to_update = [], []
+        now = timezone.now()
+        for slug, data in batch:
+            business = businesses[slug]
+            record = political_data.get(business.pk)
+            if record is None:
+                record = PoliticalData(business=business)
+                to_create.append(record)
+            else:
+                to_update.append(record)
+            for field, value in data.totals.political_data_fields().items():
+                setattr(record, field, value)
+            record.last_updated = now
+            record.update_summary()
+
+        fields = TOTAL_FIELDS + FLAG_FIELDS + PoliticalData.SUMMARY_FIELDS + ['last_updated']
+        PoliticalData.objects.bulk_create(to_create)
+        PoliticalData.objects.bulk_update(to_update, fields)
+
+        DataSource.objects.bulk_create([
+            DataSource(business=businesses[slug], url=url, reason='import', is_approved=True)
+            for slug, data in batch
+            for url in sorted(data.source_urls)
+        ], ignore_conflicts=True)
+
+        # Political data feeds the alternatives scores of existing businesses
+        changed = [business.pk for business in existing.values()]
+        transaction.on_commit(lambda: _reindex_alternatives(changed))
+
+        self.report.companies_created += len(new)
+        self.report.companies_updated += len(existing)
@@ -0,0 +1,82 @@
+"""
+Conditional GET validators for the business detail page.
+
+The page shows a business, its parent companies and subsidiaries, the
+political data it has or inherits, its products, services, approved data
+sources and precomputed alternatives. ``page_etag`` reads the newest
+timestamp of each of those, plus row counts and sums for the parts that have
+no timestamp of their own (category links, data source approvals, alternative
+scores), in one query of indexed correlated subqueries. Their hash is the
+page's ETag, so a client or proxy holding a current copy gets a 304 without
+the page being built.
+
+No Last-Modified is sent: removing a category link, a data source or a
+subsidiary, or rescoring alternatives, leaves every timestamp as it was, so
+If-Modified-Since would answer 304 for a page that changed.
+
+Renaming a category or editing its description touches no business, so the
+pages listing it keep their ETag until something else about them changes.
+"""
+import hashlib
+from django.conf import settings
+from django.db.models import Count, Max, OuterRef, Subquery, Sum
+from companies.models import Business, BusinessAlternative, DataSource, OwnershipClosure
+
+def get_max_age():
+    """Seconds browsers may reuse an anonymous detail page before revalidating"""
+    return getattr(settings, 'BUSINESS_DETAIL_MAX_AGE', 60)
+
+
+def get_shared_max_age():
+    """Seconds a CDN or reverse proxy may serve an anonymous detail page"""
+    return getattr(settings, 'BUSINESS_DETAIL_SHARED_MAX_AGE', 300)
+
+
+def _aggregate(queryset, key, aggregate):
+    """One aggregate over the rows of ``queryset`` whose ``key`` is the outer business"""
+    return Subquery(
+        queryset.filter(**{key: OuterRef('pk')}).order_by().values(key).annotate(value=aggregate).values('value')
+    )
+
+
+# Every part of the page that can change, keyed by annotation name
+PAGE_STATE = {
+    # The business and its parent companies (names, inherited_from)
+    'family_updated_at': (OwnershipClosure.objects.all(), 'descendant', Max('ancestor__updated_at')),
+    'political_updated_at': (
+        OwnershipClosure.objects.all(), 'descendant', Max('ancestor__politicaldata__last_updated')
+    ),
+    'political_count': (OwnershipClosure.objects.all(), 'descendant', Count('ancestor__politicaldata')),
+    'subsidiaries_updated_at': (Business.objects.all(), 'parent_company', Max('updated_at')),
+    'subsidiaries_count': (Business.objects.all(), 'parent_company', Count('id')),
+    'sources_created_at': (DataSource.objects.filter(is_approved=True), 'business', Max('created_at')),
+    'sources_count': (DataSource.objects.filter(is_approved=True), 'business', Count('id')),
+    'products_count': (Business.products.through.objects.all(), 'business', Count('id')),
+    'products_sum': (Business.products.through.objects.all(), 'business', Sum('productcategory_id')),
+    'services_count': (Business.services.through.objects.all(), 'business', Count('id')),
+    'services_sum': (Business.services.through.objects.all(), 'business', Sum('servicecategory_id')),
+    'alternatives_count': (BusinessAlternative.objects.all(), 'business', Count('id')),
+    'alternatives_score': (BusinessAlternative.objects.all(), 'business', Sum('score')),
+    'alternatives_updated_at': (BusinessAlternative.objects.all(), 'business', Max('alternative__updated_at')),
+    'alternatives_political_updated_at': (
+        BusinessAlternative.objects.all(), 'business', Max('alternative__politicaldata__last_updated')
+    ),
+}
+
+def page_state(slug):
+    """Everything the detail page of ``slug`` depends on, as a dict, or None if there is no such business"""
+    return Business.objects.filter(slug=slug).annotate(**{
+        name: _aggregate(*parts) for name, parts in PAGE_STATE.items()
+    }).values('pk', *PAGE_STATE).first()
+
+
+def page_etag(slug, variant=''):
+    """
+    ETag of the detail page of ``slug``, or None if there is no such business.
+    ``variant`` tells apart pages built from the same data for different viewers.
+    """
+    state = page_state(slug)
+    if state is None:
+        return None
+    fingerprint = '\x1f'.join(f'{name}={state[name]}' for name in sorted(state))
+    return '"{}"'.format(hashlib.md5(f'{fingerprint}\x1e{variant}'.encode()).hexdigest())
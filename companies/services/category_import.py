@@ -0,0 +1,177 @@
+"""
+Bulk import of the product and service category trees.
+
+The JSON files hold nested ``{"name": ..., "children": [...]}`` nodes.
+Categories are matched to existing rows by name, as the per-node importer
+did: a name listed twice ends up under the parent of its last occurrence.
+Each tree is flattened in memory and diffed against the existing rows (one
+query per model), then new categories, parent changes and slug fixes are
+written with bulk_create/bulk_update, followed by one rebuild of the
+category paths. Unchanged data writes nothing.
+Existing categories missing from the file are left alone.
+"""
+from django.db import transaction
+from django.utils.text import slugify
+from companies.services.category_tree import invalidate_category_tree
+from companies.services.search_cache import invalidate_search_cache
+
+
+class CategoryTreeError(ValueError):
+    pass
+
+
+def flatten_tree(categories):
+    """
+    Return ({name: parent name or None}, skipped) for a nested category list,
+    in depth-first order. ``skipped`` counts nodes without a name; their
+    children are skipped with them.
+    """
+    parents = {}
+    skipped = 0
+    stack = [(node, None) for node in reversed(categories)]
+    while stack:
+        node, parent = stack.pop()
+        name = (node.get('name') or '').strip()
+        if not name:
+            skipped += 1
+            continue
+        # Re-inserting moves a repeated name to its last position, like a later save() would
+        parents.pop(name, None)
+        parents[name] = parent
+        stack.extend((child, name) for child in reversed(node.get('children') or []))
+    return parents, skipped
+
+
+def _check_cycles(parents):
+    for name in parents:
+        seen = {name}
+        parent = parents[name]
+        while parent is not None:
+            if parent in seen:
+                raise CategoryTreeError(f'Category "{name}" would become its own ancestor')
+            seen.add(parent)
+            parent = parents.get(parent)
+
+
+class CategoryTreeDiff:
+    """Changes needed to bring one category model's rows in line with a nested category list"""
+    def __init__(self, model, categories):
+        self.model = model
+        self.parents, self.skipped = flatten_tree(categories)
+        self.slug_length = model._meta.get_field('slug').max_length
+        self.creates = []
+        self.moves = []
+        self.slug_fixes = []
+        self.unchanged = 0
+        self.untouched = 0
+        self.duplicates = []
+        self._diff()
+
+    @property
+    def has_changes(self):
+        return bool(self.creates or self.moves or self.slug_fixes)
+
+    def _diff(self):
+        _check_cycles(self.parents)
+
+        by_name = {}
+        names_by_id = {}
+        slugs = set()
+        for category in self.model.objects.only('id', 'name', 'slug', 'parent_id').order_by('id'):
+            names_by_id[category.pk] = category.name
+            slugs.add(category.slug)
+            if category.name in by_name:
+                # Same name stored twice: the oldest row is the one kept in sync
+                self.duplicates.append(category)
+            else:
+                by_name[category.name] = category
+        self.untouched = sum(1 for name in by_name if name not in self.parents)
+
+        for name, parent_name in self.parents.items():
+            category = by_name.get(name)
+            if category is None:
+                category = self.model(name=name, slug=self._unique_slug(name, slugs))
+                self.creates.append(category)
+                by_name[name] = category
+                continue
+
+            changed = False
+            current_parent = names_by_id.get(category.parent_id)
+            if current_parent != parent_name:
+                self.moves.append((category, current_parent, parent_name))
+                changed = True
+            expected = slugify(name)[:self.slug_length]
+            # Only move to a free slug; the old one stays reserved until the next run
+            if category.slug != expected and expected and expected not in slugs:
+                slugs.add(expected)
+                self.slug_fixes.append((category, category.slug, expected))
+                category.slug = expected
+                changed = True
+            if not changed:
+                self.unchanged += 1
+
+        self._by_name = by_name
+
+    def _unique_slug(self, name, slugs):
+        base = slugify(name)[:self.slug_length] or 'category'
+        slug, suffix = base, 2
+        while slug in slugs:
+            tail = f'-{suffix}'
+            slug = f'{base[:self.slug_length - len(tail)]}{tail}'
+            suffix += 1
+        slugs.add(slug)
+        return slug
+
+    def lines(self):
+        """Human readable description of every change"""
+        label = self.model._meta.verbose_name
+        for category in self.creates:
+            parent = self.parents[category.name]
+            yield f'+ {label} "{category.name}"' + (f' under "{parent}"' if parent else '')
+        for category, old, new in self.moves:
+            yield f'~ {label} "{category.name}": parent "{old or "-"}" -> "{new or "-"}"'
+        for category, old, new in self.slug_fixes:
+            yield f'~ {label} "{category.name}": slug "{old}" -> "{new}"'
+        for category in self.duplicates:
+            yield f'! {label} "{category.name}" (id {category.pk}) duplicates an older row and is ignored'
+
+    def apply(self):
+        """Write the changes in one transaction; returns the number of rows written"""
+        if not self.has_changes:
+            return 0
+        with transaction.atomic():
+            # Bulk writes skip the signals that retire cached category trees and search pages
+            transaction.on_commit(invalidate_category_tree)
+            invalidate_search_cache()
+            return self._apply()
+
+    def _apply(self):
+        by_name = self._by_name
+
+        # New categories are inserted a level at a time, so each one's parent already has an id
+        levels = {}
+        for category in self.creates:
+            levels.setdefault(self._depth(category.name), []).append(category)
+        for depth in sorted(levels):
+            for category in levels[depth]:
+                category.parent = by_name.get(self.parents[category.name])
+            self.model.objects.bulk_create(levels[depth])
+
+        to_update = {}
+        for category, _, parent_name in self.moves:
+            category.parent = by_name.get(parent_name)
+            to_update[category.pk] = category
+        for category, _, _ in self.slug_fixes:
+            to_update[category.pk] = category
+        if to_update:
+            self.model.objects.bulk_update(list(to_update.values()), ['parent', 'slug'])
+        # bulk_create/bulk_update skip save(), which keeps the materialized paths in sync
+        self.model.objects.rebuild()
+        return len(self.creates) + len(to_update)
+
+    def _depth(self, name):
+        depth = 0
+        while self.parents.get(name) is not None:
+            name = self.parents[name]
+            depth += 1
+        return depth
@@ -0,0 +1,124 @@
+"""
+In-process cache of the product and service category forests.
+
+Each worker keeps every category's name and parent, the children of each
+category and a lowercase name index, per category model. The category filter
+of the add/import business pages is answered from it without touching the
+database: matching categories are expanded with all of their ancestors and
+descendants, at any depth.
+
+The signal handlers in companies.signals (and the bulk category importer)
+bump a shared version (config.shared_version) once category changes commit.
+Workers compare it with the version their forest was built from at most
+every CATEGORY_TREE_VERSION_CHECK_INTERVAL seconds and rebuild when it moved.
+Every forest also has a digest of its rows, which the view uses as an ETag.
+"""
+import hashlib
+import logging
+import threading
+import time
+from collections import defaultdict
+from companies.models import ProductCategory, ServiceCategory
+from config.shared_version import SharedVersion
+
+logger = logging.getLogger(__name__)
+
+shared_version = SharedVersion('category_tree:version', 'CATEGORY_TREE_VERSION_CHECK_INTERVAL')
+
+CATEGORY_MODELS = {
+    'products': ProductCategory,
+    'services': ServiceCategory,
+}
+
+
+class CategoryForest:
+    def __init__(self, rows, version=None):
+        self.version = version
+        self.checked_at = time.monotonic()
+        self.names = {}
+        self.parents = {}
+        self.children = defaultdict(list)
+        digest = hashlib.md5()
+        for category_id, name, parent_id in sorted(rows, key=lambda row: (row[1], row[0])):
+            self.names[category_id] = name
+            self.parents[category_id] = parent_id
+            digest.update(f'{category_id}\x1f{name}\x1f{parent_id}\x1e'.encode())
+        for category_id, parent_id in self.parents.items():
+            if parent_id is not None:
+                self.children[parent_id].append(category_id)
+        # In result order: by name, then id
+        self.order = {category_id: position for position, category_id in enumerate(self.names)}
+        self.lower_names = [(name.lower(), category_id) for category_id, name in self.names.items()]
+        self.digest = digest.hexdigest()
+
+    def __len__(self):
+        return len(self.names)
+
+    def filter(self, query):
+        """
+        Ids of the categories whose name contains ``query`` (case-insensitive),
+        plus all of their ancestors and descendants, in name order. An empty
+        query matches every category.
+        """
+        query = query.strip().lower()
+        if not query:
+            return list(self.names)
+
+        matches = [category_id for lower_name, category_id in self.lower_names if query in lower_name]
+        # Walks stop at categories already reached, so each is visited once
+        ids = set()
+        for category_id in matches:
+            parent_id = self.parents[category_id]
+            while parent_id is not None and parent_id not in ids and parent_id in self.names:
+                ids.add(parent_id)
+                parent_id = self.parents[parent_id]
+        below = set(matches)
+        stack = list(matches)
+        while stack:
+            for child_id in self.children.get(stack.pop(), ()):
+                if child_id not in below:
+                    below.add(child_id)
+                    stack.append(child_id)
+        ids |= below
+        return sorted(ids, key=self.order.__getitem__)
+
+    def as_dicts(self, ids):
+        return [
+            {
+                'id': category_id,
+                'name': self.names[category_id],
+                'parent_id': self.parents[category_id],
+                'parent_name': self.names.get(self.parents[category_id]),
+            }
+            for category_id in ids
+        ]
+
+
+_forests = {}
+_lock = threading.Lock()
+
+
+def build_forest(category_type):
+    """(Re)build this process's forest of one category type from the database"""
+    version = shared_version.get()
+    model = CATEGORY_MODELS[category_type]
+    forest = CategoryForest(model.objects.values_list('id', 'name', 'parent_id'), version)
+    with _lock:
+        _forests[category_type] = forest
+    logger.info(f'{model._meta.verbose_name} tree cached with {len(forest)} categories')
+    return forest
+
+
+def get_forest(category_type):
+    """The process-wide forest, rebuilt if categories changed since it was built"""
+    forest = _forests.get(category_type)
+    if forest is None or not shared_version.is_current(forest):
+        return build_forest(category_type)
+    return forest
+
+
+def invalidate_category_tree():
+    """Categories changed: this worker rebuilds now, the others after their next version check"""
+    shared_version.bump()
+    with _lock:
+        _forests.clear()
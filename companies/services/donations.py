@@ -0,0 +1,291 @@
+"""
+Donation CSV aggregation.
+
+Donation exports have one row per recipient with a ``View`` (the recipient's
+leaning) and up to three amount columns: money from the organization itself,
+from its affiliated PACs and from its senior employees. DonationAggregator
+folds a whole CSV into the totals and donor flags stored on PoliticalData,
+either for one company or for every value of a company column.
+
+The aggregation is columnar: the header is resolved to column positions once,
+each distinct amount, view and recipient string is parsed or matched once and
+memoized, and totals are kept as integer cents until the end. Exports repeat
+the same few amounts and committees on most rows, so the per-row work is a
+handful of dictionary lookups.
+"""
+import csv
+import re
+from decimal import Decimal, InvalidOperation
+
+REQUIRED_COLUMNS = {'Recipient', 'View'}
+
+# Amount column and PoliticalData field prefix of each donation source
+SOURCES = {
+    'From Organization': 'direct',
+    'From PACs': 'affiliated_pac',
+    'From Individuals': 'senior_employee',
+}
+
+# Totals kept for each source, in the order of DonationTotals.cents
+SIDES = ('conservative_total', 'liberal_total', 'total')
+CONSERVATIVE, LIBERAL, TOTAL = range(len(SIDES))
+
+# Recipient substrings checked in order; only the first match counts.
+# A Trump PAC has no flag of its own, but still stops the checks below it.
+RECIPIENT_FLAGS = {
+    'direct': [
+        ('america pac (texas)', 'direct_america_pac_donor'),
+        ('save america', 'direct_save_america_pac_donor'),
+        ('make america great again inc', 'direct_maga_inc_donor'),
+    ],
+    'affiliated_pac': [
+        ('trump', None),
+        ('america pac (texas)', 'affiliated_pac_america_pac_donor'),
+        ('save america', 'affiliated_pac_save_america_pac_donor'),
+        ('make america great again inc', 'affiliated_pac_maga_inc_donor'),
+    ],
+    'senior_employee': [
+        ('trump', 'senior_employee_trump_donor'),
+        ('america pac (texas)', 'senior_employee_america_pac_donor'),
+        ('save america', 'senior_employee_save_america_pac_donor'),
+        ('make america great again inc', 'senior_employee_maga_inc_donor'),
+    ],
+}
+
+FLAG_FIELDS = [field for matchers in RECIPIENT_FLAGS.values() for _, field in matchers if field]
+TOTAL_FIELDS = [f'{prefix}_{side}_donations' for prefix in SOURCES.values() for side in SIDES]
+
+# Upper bound on the distinct strings memoized per aggregation
+MEMO_SIZE = 100_000
+
+_AMOUNT_NOISE = str.maketrans('', '', '$,')
+
+
+def validate_columns(fieldnames):
+    """Raise ValueError unless a CSV header has the columns needed for aggregation"""
+    fieldnames = set(fieldnames or [])
+    if not REQUIRED_COLUMNS.issubset(fieldnames):
+        raise ValueError('CSV file missing required columns')
+    if not fieldnames & SOURCES.keys():
+        raise ValueError('CSV must contain at least one of "From Organization","From Individuals", or "From PACs" columns')
+
+
+def parse_cents(value):
+    """Amount in cents from a value like "$1,234.50"; blank means zero"""
+    cleaned = value.translate(_AMOUNT_NOISE).strip() if value else ''
+    if not cleaned:
+        return 0
+    whole, _, fraction = cleaned.partition('.')
+    if whole.isascii() and whole.isdigit() and len(fraction) <= 2 and (not fraction or fraction.isdigit()):
+        return int(whole) * 100 + int(fraction.ljust(2, '0'))
+    # Signs, exponents and sub-cent amounts take the exact Decimal route
+    try:
+        cents = Decimal(cleaned) * 100
+    except InvalidOperation:
+        cents = None
+    if cents is None or not cents.is_finite():
+        raise ValueError(f'Invalid amount: {value!r}')
+    return cents
+
+
+def parse_amount(value):
+    """Decimal from an amount like "$1,234.50"; blank means zero"""
+    return Decimal(parse_cents(value)).scaleb(-2)
+
+
+def view_side(view):
+    """Index into SIDES of the leaning a View value counts towards, or None"""
+    view = (view or '').lower()
+    if 'democrat' in view or 'liberal' in view:
+        return LIBERAL
+    if 'republican' in view or 'conservative' in view:
+        return CONSERVATIVE
+    return None
+
+
+class RecipientMatcher:
+    """
+    Donor flags of a recipient for every source at once.
+
+    All needles are compiled into one regex alternation, so a recipient that
+    matches none of them (most of them) is rejected in a single scan. The
+    rest go through the ordered first-match lists. Results are memoized by
+    recipient string.
+    """
+    def __init__(self, prefixes=tuple(SOURCES.values())):
+        self.lists = [RECIPIENT_FLAGS[prefix] for prefix in prefixes]
+        needles = sorted({needle for matchers in self.lists for needle, _ in matchers}, key=len, reverse=True)
+        self.pattern = re.compile('|'.join(map(re.escape, needles)))
+        self.no_flags = (None,) * len(self.lists)
+        self.memo = {}
+
+    def __call__(self, recipient):
+        flags = self.memo.get(recipient)
+        if flags is None:
+            flags = self.match(recipient)
+            if len(self.memo) < MEMO_SIZE:
+                self.memo[recipient] = flags
+        return flags
+
+    def match(self, recipient):
+        recipient = (recipient or '').lower()
+        if not self.pattern.search(recipient):
+            return self.no_flags
+        return tuple(
+            next((field for needle, field in matchers if needle in recipient), None)
+            for matchers in self.lists
+        )
+
+
+class DonationTotals:
+    """Totals in cents and donor flags of one company"""
+    def __init__(self):
+        self.cents = [0] * len(TOTAL_FIELDS)
+        self.flags = set()
+
+    def add(self, side, flags, amounts):
+        """Add one row's cents per source (in SOURCES order), with its view side and recipient flags"""
+        cents = self.cents
+        for source, amount in enumerate(amounts):
+            if amount > 0:
+                base = source * len(SIDES)
+                if side is not None:
+                    cents[base + side] += amount
+                cents[base + TOTAL] += amount
+                if flags[source]:
+                    self.flags.add(flags[source])
+
+    def add_row(self, row):
+        """
+        Add one CSV row as a dict. Amounts are parsed before anything is added,
+        so a row with an invalid amount raises ValueError and leaves the totals
+        untouched.
+        """
+        amounts = [parse_cents(row.get(column)) for column in SOURCES]
+        self.add(view_side(row.get('View')), _matcher(row.get('Recipient')), amounts)
+
+    def political_data_fields(self):
+        """Field values for PoliticalData"""
+        return {
+            **{field: Decimal(cents).scaleb(-2) for field, cents in zip(TOTAL_FIELDS, self.cents)},
+            **{field: field in self.flags for field in FLAG_FIELDS},
+        }
+
+
+_matcher = RecipientMatcher()
+
+
+class DonationAggregator:
+    """
+    Aggregate donation CSVs into DonationTotals per company.
+
+    ``key`` maps a raw company value to the key totals are grouped under and
+    raises ValueError for values that cannot be used; it runs once per
+    distinct value. ``extra_columns`` are collected per company as the
+    distinct stripped values seen, in order (blank included).
+    """
+    def __init__(self, key_column=None, key=None, extra_columns=()):
+        self.key_column = key_column
+        self.key = key or (lambda value: value)
+        self.extra_columns = extra_columns
+        self.totals = {}
+        self.extras = {}
+        self.rows = 0
+        self.matcher = RecipientMatcher()
+        self._keys = {}
+        self._invalid_keys = {}
+        self._amounts = {'': 0}
+        self._views = {}
+
+    def read(self, file, company=None):
+        """
+        Aggregate a text CSV file and return its row errors as (line, message)
+        pairs. Rows are grouped by ``company`` if given, else by the key
+        column. Raises ValueError if the header lacks required columns.
+        """
+        reader = csv.reader(file)
+        header = next(reader, [])
+        if header and header[0].startswith('\ufeff'):
+            header[0] = header[0][1:]
+        validate_columns(header)
+        if company is None and self.key_column and self.key_column not in header:
+            raise ValueError(f'CSV file missing required column "{self.key_column}"')
+
+        columns = {name: position for position, name in enumerate(header)}
+        width = len(header)
+        recipient_index = columns['Recipient']
+        view_index = columns['View']
+        key_index = columns.get(self.key_column)
+        # Sources without a column get a constant blank cell past the row end
+        amount_indices = [columns.get(column, width) for column in SOURCES]
+        extra_indices = [(column, columns[column]) for column in self.extra_columns if column in columns]
+        padding = [''] * (width + 1)
+
+        errors = []
+        keys, amounts_memo, views = self._keys, self._amounts, self._views
+        totals_by_key, matcher = self.totals, self.matcher
+        rows = 0
+        for row in reader:
+            rows += 1
+            row += padding[len(row):]
+            raw = company if company is not None else row[key_index] if key_index is not None else None
+            try:
+                key = keys[raw] if raw in keys else self._resolve_key(raw)
+                amounts = [
+                    amounts_memo[cell] if cell in amounts_memo else self._parse_amount(cell)
+                    for cell in map(row.__getitem__, amount_indices)
+                ]
+            except ValueError as e:
+                errors.append((reader.line_num, str(e)))
+                continue
+
+            totals = totals_by_key.get(key)
+            if totals is None:
+                totals = totals_by_key[key] = DonationTotals()
+                self.extras[key] = {column: {} for column in self.extra_columns}
+            if max(amounts) > 0:
+                view = row[view_index]
+                side = views[view] if view in views else self._view_side(view)
+                totals.add(side, matcher(row[recipient_index]), amounts)
+            if extra_indices:
+                extras = self.extras[key]
+                for column, index in extra_indices:
+                    extras[column].setdefault(row[index].strip(), None)
+
+        self.rows += rows
+        return errors
+
+    def _resolve_key(self, raw):
+        if raw in self._invalid_keys:
+            raise ValueError(self._invalid_keys[raw])
+        try:
+            key = self.key(raw)
+        except ValueError as e:
+            self._invalid_keys[raw] = str(e)
+            raise
+        if len(self._keys) < MEMO_SIZE:
+            self._keys[raw] = key
+        return key
+
+    def _parse_amount(self, cell):
+        cents = parse_cents(cell)
+        if len(self._amounts) < MEMO_SIZE:
+            self._amounts[cell] = cents
+        return cents
+
+    def _view_side(self, view):
+        side = self._views[view] = view_side(view)
+        return side
+
+
+def aggregate_csv(file):
+    """
+    DonationTotals of a single-company text CSV file. Raises ValueError for a
+    bad header or the first row with an invalid amount.
+    """
+    aggregator = DonationAggregator()
+    errors = aggregator.read(file)
+    if errors:
+        line, message = errors[0]
+        raise ValueError(f'Line {line}: {message}')
+    return aggregator.totals.get(None) or DonationTotals()
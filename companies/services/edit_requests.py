@@ -0,0 +1,356 @@
+"""
+Approval of user-submitted edit requests, one at a time or in bulk.
+
+approve_edit_requests() applies any number of pending requests in one
+transaction with a fixed number of queries: one bulk_update for the
+businesses, one bulk_update (plus a bulk_create for businesses without any)
+for their PoliticalData, one update for the data sources, and bulk inserts
+and deletes on the product/service through tables.
+
+Requests in the same batch for the same business are merged when they agree.
+When they disagree (different values for a field, or one adds a category
+another removes), none of that business's requests are applied; they are
+reported as conflicts and stay pending for individual review.
+
+Bulk writes skip the model signals, so the search cache, suggestions and
+alternatives index are refreshed here once the transaction commits.
+
+The moderators' review queue is read newest first, one status at a time,
+through the (status, created_at, id) index, and paged with a keyset cursor
+so every page is a bounded index read however much history piles up. The
+per-status counts shown above it are one GROUP BY over the same index,
+cached in the ``search`` cache until an edit request changes.
+"""
+import base64
+import json
+from collections import defaultdict
+from datetime import datetime
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+from companies.models import Business, DataSource, EditRequest, PoliticalData
+from companies.services import alternatives, suggest
+from companies.services.search_cache import invalidate_search_cache
+
+BUSINESS_FIELDS = ('name', 'description', 'provides_services', 'provides_products')
+
+# Donation totals and flags the edit request shares with PoliticalData
+POLITICAL_FIELDS = tuple(
+    field.name for field in EditRequest._meta.concrete_fields
+    if field.name.startswith(('direct_', 'affiliated_pac_', 'senior_employee_'))
+    and field.name in {f.name for f in PoliticalData._meta.concrete_fields}
+)
+
+# (kind, edit request field adding, field removing, business through table, category column)
+OFFERINGS = (
+    ('services', 'services_to_add', 'services_to_remove', Business.services.through, 'servicecategory_id'),
+    ('products', 'products_to_add', 'products_to_remove', Business.products.through, 'productcategory_id'),
+)
+
+
+STATUS_COUNTS_KEY = 'edit_requests:status_counts'
+
+
+def get_review_page_size():
+    return getattr(settings, 'EDIT_REQUEST_REVIEW_PAGE_SIZE', 50)
+
+
+def get_status_counts_timeout():
+    return getattr(settings, 'EDIT_REQUEST_STATUS_COUNTS_TIMEOUT', 300)
+
+
+def _cache():
+    return caches[getattr(settings, 'BUSINESS_SEARCH_CACHE_ALIAS', 'search')]
+
+
+def review_queue(status=None, business_filter=''):
+    """Edit requests with ``status`` (all if empty), newest first, optionally for businesses matching a name"""
+    edit_requests = EditRequest.objects.select_related('business', 'submitted_by').order_by('-created_at', '-id')
+    if status:
+        edit_requests = edit_requests.filter(status=status)
+    if business_filter:
+        # Matching names are found first, through the trigram index on UPPER(name) when pg_trgm is installed
+        edit_requests = edit_requests.filter(
+            business_id__in=Business.objects.filter(name__icontains=business_filter).values('id')
+        )
+    return edit_requests
+
+
+def encode_cursor(edit_request):
+    """Opaque cursor pointing just after ``edit_request`` in review queue order"""
+    position = [edit_request.created_at.isoformat(), edit_request.pk]
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+
+def decode_cursor(cursor):
+    """(created_at, id) from a cursor; ValueError if it was tampered with"""
+    try:
+        created_at, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        created_at = datetime.fromisoformat(created_at)
+    except (TypeError, ValueError, UnicodeError) as e:
+        raise ValueError('Invalid page cursor') from e
+    if not isinstance(pk, int) or created_at.tzinfo is None:
+        raise ValueError('Invalid page cursor')
+    return created_at, pk
+
+
+def review_page(edit_requests, cursor=None, page_size=None):
+    """
+    One page of ``review_queue`` results starting after ``cursor``.
+    Returns (edit_requests, next_cursor); next_cursor is None on the last page.
+    """
+    page_size = page_size or get_review_page_size()
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        edit_requests = edit_requests.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+        )
+
+    # One extra row tells whether there is a next page
+    page = list(edit_requests[:page_size + 1])
+    if len(page) <= page_size:
+        return page, None
+    page = page[:page_size]
+    return page, encode_cursor(page[-1])
+
+
+def status_counts():
+    """{status: number of edit requests} for every status, read through the cache"""
+    cache = _cache()
+    counts = cache.get(STATUS_COUNTS_KEY)
+    if counts is None:
+        counts = dict.fromkeys((status for status, _ in EditRequest.STATUS_CHOICES), 0)
+        counts.update(
+            EditRequest.objects.order_by().values('status').annotate(total=Count('*')).values_list('status', 'total')
+        )
+        cache.set(STATUS_COUNTS_KEY, counts, get_status_counts_timeout())
+    return counts
+
+
+def invalidate_status_counts():
+    """Drop the cached counts now and again once the current transaction commits"""
+    cache = _cache()
+    cache.delete(STATUS_COUNTS_KEY)
+    # A count taken before the commit may have cached the old numbers
+    transaction.on_commit(lambda: cache.delete(STATUS_COUNTS_KEY))
+
+
+class ApprovalReport:
+    def __init__(self):
+        self.approved = []
+        self.conflicts = []
+        self.skipped = []
+
+    def __str__(self):
+        return (
+            f'{len(self.approved)} approved, {len(self.conflicts)} left pending because of conflicts, '
+            f'{len(self.skipped)} skipped'
+        )
+
+
+class BusinessChanges:
+    """The merged changes of every approved request for one business"""
+    def __init__(self):
+        self.fields = {}
+        self.sources = {}
+        self.added = defaultdict(set)
+        self.removed = defaultdict(set)
+        self.source_of = {}
+
+    def merge(self, edit_request, categories):
+        """Fold in one request; returns a conflict message instead if it disagrees with an earlier one"""
+        fields = requested_fields(edit_request)
+        for field, value in fields.items():
+            if field in self.fields and self.fields[field] != value:
+                label = EditRequest._meta.get_field(field).verbose_name
+                return f'{label} differs from edit request #{self.sources[field]}'
+        for kind, *_ in OFFERINGS:
+            added, removed = categories[kind]
+            clash = (added & self.removed[kind]) | (removed & self.added[kind])
+            if clash:
+                other = self.source_of[(kind, next(iter(clash)))]
+                return f'{kind} added by one request are removed by edit request #{other}'
+
+        for field, value in fields.items():
+            self.fields[field] = value
+            self.sources.setdefault(field, edit_request.pk)
+        for kind, *_ in OFFERINGS:
+            added, removed = categories[kind]
+            self.added[kind] |= added
+            self.removed[kind] |= removed
+            for category_id in added | removed:
+                self.source_of.setdefault((kind, category_id), edit_request.pk)
+        return None
+
+
+def requested_fields(edit_request):
+    """{field: value} of the business and political data fields the request changes"""
+    fields = {}
+    for field in BUSINESS_FIELDS + POLITICAL_FIELDS:
+        value = getattr(edit_request, field)
+        # Blank text and unset (None) values leave the current value alone
+        if value is not None and value != '':
+            fields[field] = value
+    return fields
+
+
+def _requested_categories(edit_request_ids):
+    """{edit request id: {kind: (category ids to add, category ids to remove)}}, one query per table"""
+    categories = defaultdict(lambda: {kind: (set(), set()) for kind, *_ in OFFERINGS})
+    for kind, add_field, remove_field, _, column in OFFERINGS:
+        for position, field in enumerate((add_field, remove_field)):
+            through = EditRequest._meta.get_field(field).remote_field.through
+            for edit_request_id, category_id in through.objects.filter(
+                editrequest_id__in=edit_request_ids
+            ).values_list('editrequest_id', column):
+                categories[edit_request_id][kind][position].add(category_id)
+    return categories
+
+
+def approve_edit_requests(edit_request_ids, reviewer, review_notes=''):
+    """
+    Approve the given edit requests and apply their changes in one transaction.
+    Requests that are no longer pending are skipped; conflicting requests for
+    the same business stay pending. Returns an ApprovalReport.
+    """
+    report = ApprovalReport()
+    with transaction.atomic():
+        edit_requests = list(
+            EditRequest.objects.select_for_update(of=('self',))
+            .select_related('business')
+            .filter(pk__in=list(edit_request_ids))
+            .order_by('created_at', 'id')
+        )
+        for edit_request in edit_requests:
+            if edit_request.status != 'pending':
+                report.skipped.append((edit_request, f'already {edit_request.get_status_display().lower()}'))
+        pending = [edit_request for edit_request in edit_requests if edit_request.status == 'pending']
+        categories = _requested_categories([edit_request.pk for edit_request in pending])
+
+        by_business = defaultdict(list)
+        for edit_request in pending:
+            by_business[edit_request.business_id].append(edit_request)
+
+        changes = {}
+        for business_id, group in by_business.items():
+            merged = BusinessChanges()
+            conflict = None
+            for edit_request in group:
+                conflict = merged.merge(edit_request, categories[edit_request.pk])
+                if conflict:
+                    break
+            if conflict:
+                report.conflicts.extend((edit_request, conflict) for edit_request in group)
+            else:
+                changes[business_id] = merged
+                report.approved.extend(group)
+
+        if report.approved:
+            businesses = {edit_request.business_id: edit_request.business for edit_request in report.approved}
+            _apply(businesses, changes)
+            now = timezone.now()
+            approved_ids = [edit_request.pk for edit_request in report.approved]
+            EditRequest.objects.filter(pk__in=approved_ids).update(
+                status='approved', reviewed_by=reviewer, reviewed_at=now, review_notes=review_notes
+            )
+            DataSource.objects.filter(edit_request_id__in=approved_ids).update(is_approved=True)
+            invalidate_status_counts()
+            for edit_request in report.approved:
+                edit_request.status = 'approved'
+                edit_request.reviewed_by = reviewer
+                edit_request.reviewed_at = now
+                edit_request.review_notes = review_notes
+    return report
+
+
+def _bulk_update_by_fields(model, changed):
+    """bulk_update each (instance, fields) of ``changed``, writing no field an instance did not change"""
+    by_fields = defaultdict(list)
+    for instance, fields in changed:
+        by_fields[tuple(sorted(fields))].append(instance)
+    for fields, instances in by_fields.items():
+        model.objects.bulk_update(instances, list(fields))
+
+
+def _apply(businesses, changes):
+    now = timezone.now()
+
+    # Locked and read again, so edits saved since the requests were loaded are neither lost nor rewritten
+    businesses.update(
+        (business.pk, business)
+        for business in Business.objects.select_for_update().filter(pk__in=list(changes)).order_by('pk')
+    )
+    changed_businesses = []
+    for business_id, merged in changes.items():
+        fields = [field for field in BUSINESS_FIELDS if field in merged.fields]
+        if fields:
+            business = businesses[business_id]
+            for field in fields:
+                setattr(business, field, merged.fields[field])
+            business.updated_at = now
+            changed_businesses.append((business, fields + ['updated_at']))
+    _bulk_update_by_fields(Business, changed_businesses)
+
+    political_changes = {
+        business_id: {field: merged.fields[field] for field in POLITICAL_FIELDS if field in merged.fields}
+        for business_id, merged in changes.items()
+    }
+    political_changes = {business_id: fields for business_id, fields in political_changes.items() if fields}
+    if political_changes:
+        existing = {
+            political_data.business_id: political_data
+            for political_data in PoliticalData.objects.select_for_update()
+            .filter(business_id__in=list(political_changes)).order_by('pk')
+        }
+        to_create, to_update = [], []
+        for business_id, fields in political_changes.items():
+            political_data = existing.get(business_id)
+            if political_data is None:
+                political_data = PoliticalData(business_id=business_id)
+                to_create.append(political_data)
+            else:
+                to_update.append((political_data, list(fields) + PoliticalData.SUMMARY_FIELDS + ['last_updated']))
+            for field, value in fields.items():
+                setattr(political_data, field, value)
+            political_data.last_updated = now
+            political_data.update_summary()
+        PoliticalData.objects.bulk_create(to_create)
+        _bulk_update_by_fields(PoliticalData, to_update)
+
+    offering_changes = set()
+    for kind, _, _, through, column in OFFERINGS:
+        rows = [
+            through(business_id=business_id, **{column: category_id})
+            for business_id, merged in changes.items()
+            for category_id in merged.added[kind]
+        ]
+        through.objects.bulk_create(rows, ignore_conflicts=True)
+
+        removals = Q()
+        for business_id, merged in changes.items():
+            if merged.removed[kind]:
+                removals |= Q(business_id=business_id, **{f'{column}__in': merged.removed[kind]})
+        if removals:
+            through.objects.filter(removals).delete()
+        offering_changes.update(
+            business_id for business_id, merged in changes.items() if merged.added[kind] or merged.removed[kind]
+        )
+
+    # Bulk writes skip the signals that keep search results, suggestions and alternatives fresh
+    invalidate_search_cache()
+    renamed = [
+        (business.pk, business.name, business.slug)
+        for business_id, business in businesses.items() if 'name' in changes[business_id].fields
+    ]
+    transaction.on_commit(lambda: _refresh(renamed, offering_changes, set(political_changes) - offering_changes))
+
+
+def _refresh(renamed, offering_changes, political_changes):
+    for business_id, name, slug in renamed:
+        suggest.business_saved(business_id, name, slug)
+    for business_id in offering_changes:
+        alternatives.offerings_changed(business_id)
+    for business_id in political_changes:
+        alternatives.political_data_changed(business_id)
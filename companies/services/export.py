@@ -0,0 +1,107 @@
+"""
+Streaming export of the business directory.
+
+Every business is written with its political data and approved data sources,
+as NDJSON (one JSON object per line) or CSV (data sources space separated).
+Businesses are read in id order through a server-side cursor,
+``chunk_size`` at a time, with their data sources prefetched per chunk, so
+memory use does not grow with the size of the directory.
+
+Incremental exports pass ``since``: only businesses whose own fields or
+political data changed after it are written. Each record carries both
+timestamps, so the newest one in an export is the ``since`` of the next.
+Deleted businesses are not reported; mirrors should reconcile with a full
+export from time to time.
+"""
+import csv
+import json
+from datetime import datetime, time
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from companies.models import Business, DataSource, PoliticalData
+
+EXPORT_FORMATS = ('ndjson', 'csv')
+
+BUSINESS_FIELDS = [
+    'id', 'name', 'slug', 'website', 'description', 'parent_company',
+    'provides_products', 'provides_services', 'created_at', 'updated_at',
+]
+POLITICAL_FIELDS = [
+    field.name for field in PoliticalData._meta.concrete_fields if field.name not in ('id', 'business')
+]
+COLUMNS = BUSINESS_FIELDS + POLITICAL_FIELDS + ['data_sources']
+
+
+def parse_since(value):
+    """An aware datetime from an ISO date or datetime; naive values are in the current time zone"""
+    since = parse_datetime(value)
+    if since is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f'Invalid since: {value!r}, expected an ISO 8601 date or datetime')
+        since = datetime.combine(day, time.min)
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+
+def export_queryset(since=None):
+    """Businesses to export, in id order, with everything the records need"""
+    businesses = Business.objects.select_related('politicaldata', 'parent_company').prefetch_related(
+        Prefetch('data_sources', queryset=DataSource.objects.filter(is_approved=True).order_by('id'))
+    ).defer('search_vector', 'parent_company__search_vector').order_by('id')
+    if since is not None:
+        # Both timestamps are indexed; political data changes do not touch Business.updated_at
+        businesses = businesses.filter(
+            Q(updated_at__gt=since) |
+            Q(id__in=PoliticalData.objects.filter(last_updated__gt=since).values('business_id'))
+        )
+    return businesses
+
+
+def business_record(business):
+    """One exported business as a flat dict of COLUMNS"""
+    record = {field: getattr(business, field) for field in BUSINESS_FIELDS}
+    record['parent_company'] = business.parent_company.slug if business.parent_company else None
+    political_data = getattr(business, 'politicaldata', None)
+    for field in POLITICAL_FIELDS:
+        record[field] = getattr(political_data, field) if political_data else None
+    record['data_sources'] = [source.url for source in business.data_sources.all()]
+    return record
+
+
+def iter_records(since=None, chunk_size=2000):
+    for business in export_queryset(since).iterator(chunk_size=chunk_size):
+        yield business_record(business)
+
+
+def iter_ndjson(records):
+    for record in records:
+        yield json.dumps(record, cls=DjangoJSONEncoder) + '\n'
+
+
+class _Echo:
+    """File-like object whose write() returns the line, so csv.writer output can be streamed"""
+    def write(self, value):
+        return value
+
+
+def iter_csv(records):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(COLUMNS)
+    for record in records:
+        record['data_sources'] = ' '.join(record['data_sources'])
+        yield writer.writerow([
+            value.isoformat() if hasattr(value, 'isoformat') else value
+            for value in (record[column] for column in COLUMNS)
+        ])
+
+
+def export_lines(export_format, since=None, chunk_size=2000):
+    """Lines of text for a whole export in ``export_format``"""
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f'Unknown export format: {export_format}')
+    records = iter_records(since, chunk_size)
+    return iter_ndjson(records) if export_format == 'ndjson' else iter_csv(records)
@@ -0,0 +1,76 @@
+"""
+Resolve the political data shown for a page of businesses.
+
+A business shows its own political data, or failing that the data of its
+nearest parent company that has any. resolve_political_data does this for a
+whole list of businesses with at most two queries, however many results or
+levels of ownership there are.
+"""
+from collections import defaultdict
+from companies.models import Business, OwnershipClosure, PoliticalData
+
+
+def _own_political_data(businesses):
+    """Attach political data to businesses that were not loaded with select_related('politicaldata')"""
+    missing = [business for business in businesses if not Business.politicaldata.is_cached(business)]
+    if not missing:
+        return
+
+    by_business = PoliticalData.objects.in_bulk([business.pk for business in missing], field_name='business_id')
+    for business in missing:
+        political_data = by_business.get(business.pk)
+        if political_data is not None:
+            Business.politicaldata.related.field.set_cached_value(political_data, business)
+        Business.politicaldata.related.set_cached_value(business, political_data)
+
+
+def _parent_chains(businesses):
+    """Parent companies of every business, nearest first"""
+    if all('ancestor_links' in getattr(business, '_prefetched_objects_cache', {}) for business in businesses):
+        links = [link for business in businesses for link in business.ancestor_links.all()]
+    else:
+        links = OwnershipClosure.objects.ancestry().filter(
+            descendant_id__in=[business.pk for business in businesses]
+        )
+
+    chains = defaultdict(list)
+    for link in sorted(links, key=lambda link: link.depth):
+        if link.depth > 0:
+            chains[link.descendant_id].append(link.ancestor)
+    return chains
+
+
+def resolve_political_data(businesses):
+    """
+    Map each business id to ``(political_data, inherited_from)``, matching
+    Business.get_political_data for every business in ``businesses``.
+    """
+    businesses = list(businesses)
+    if not businesses:
+        return {}
+
+    _own_political_data(businesses)
+    chains = _parent_chains(businesses)
+
+    # Parent companies are shared across a page of results, so check each record once
+    meaningful = {}
+
+    def is_meaningful(political_data):
+        if political_data is None:
+            return False
+        if political_data.pk not in meaningful:
+            meaningful[political_data.pk] = Business.has_meaningful_political_data(political_data)
+        return meaningful[political_data.pk]
+
+    resolved = {}
+    for business in businesses:
+        own = getattr(business, 'politicaldata', None)
+        resolved[business.pk] = (own, None)
+        if is_meaningful(own):
+            continue
+        for parent in chains[business.pk]:
+            inherited = getattr(parent, 'politicaldata', None)
+            if is_meaningful(inherited):
+                resolved[business.pk] = (inherited, parent)
+                break
+    return resolved
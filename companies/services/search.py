@@ -0,0 +1,158 @@
+"""
+Business search backends.
+
+Both backends rank results the same way: an exact name match first, then
+businesses whose name contains the query, then other matches, each group in
+alphabetical order.
+
+- ``postgres`` matches the stored ``Business.search_vector`` (name weighted
+  above description, prefix matching on every word) through its GIN index.
+  When the pg_trgm extension is installed it also matches names containing the
+  query anywhere, and names within a typo or two of it (ranked last), using
+  the trigram indexes created by migration 0027.
+- ``legacy`` is the original ``icontains`` scan over name and description. It
+  is used on databases other than PostgreSQL and kept for benchmarking.
+
+Results are paged with a keyset cursor over (search_priority, name, id), so
+every page is a bounded index-ordered read however many businesses match.
+"""
+import base64
+import json
+import re
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery
+from django.db import connections
+from django.db.models import Case, IntegerField, Q, Value, When
+from companies.models import Business
+
+SEARCH_BACKENDS = ('postgres', 'legacy')
+
+# Priorities shared by both backends
+EXACT_NAME, NAME_CONTAINS, TEXT_MATCH, SIMILAR_NAME = 3, 2, 1, 0
+
+_trigram_available = {}
+
+
+def get_page_size():
+    return getattr(settings, 'BUSINESS_SEARCH_PAGE_SIZE', 25)
+
+
+def get_search_backend(using='default'):
+    backend = getattr(settings, 'BUSINESS_SEARCH_BACKEND', 'postgres')
+    if backend == 'postgres' and connections[using].vendor != 'postgresql':
+        return 'legacy'
+    return backend
+
+
+def trigram_available(using='default'):
+    """Whether pg_trgm is installed, checked once per database per process"""
+    if using not in _trigram_available:
+        with connections[using].cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            _trigram_available[using] = cursor.fetchone() is not None
+    return _trigram_available[using]
+
+
+def prefix_query(query):
+    """tsquery matching every word of ``query`` as a prefix, or None if it has no words"""
+    words = re.findall(r'\w+', query)
+    if not words:
+        return None
+    return SearchQuery(' & '.join(f"'{word}':*" for word in words), search_type='raw', config='english')
+
+
+def search_businesses(query, backend=None, category=None):
+    """
+    Businesses matching ``query``, annotated with ``search_priority`` and ordered by it.
+    A product or service ``category`` limits the results to businesses offering it
+    or any of its subcategories.
+    """
+    backend = backend or get_search_backend()
+    if backend not in SEARCH_BACKENDS:
+        raise ValueError(f"Unknown business search backend: {backend}")
+
+    if backend == 'legacy':
+        businesses = _legacy_search(query)
+    else:
+        businesses = _postgres_search(query)
+    if category is not None:
+        businesses = businesses.in_category(category)
+
+    return businesses.order_by('-search_priority', 'name', 'id')
+
+
+def encode_cursor(business):
+    """Opaque cursor pointing just after ``business`` in search order"""
+    position = [business.search_priority, business.name, business.pk]
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+
+def decode_cursor(cursor):
+    """(search_priority, name, id) from a cursor; ValueError if it was tampered with"""
+    try:
+        priority, name, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (TypeError, ValueError, UnicodeError) as e:
+        raise ValueError('Invalid search cursor') from e
+    if not (isinstance(priority, int) and isinstance(name, str) and isinstance(pk, int)):
+        raise ValueError('Invalid search cursor')
+    return priority, name, pk
+
+
+def search_page(businesses, cursor=None, page_size=None):
+    """
+    One page of ``search_businesses`` results starting after ``cursor``.
+    Returns (businesses, next_cursor); next_cursor is None on the last page.
+    """
+    page_size = page_size or get_page_size()
+    if cursor:
+        priority, name, pk = decode_cursor(cursor)
+        businesses = businesses.filter(
+            Q(search_priority__lt=priority) |
+            Q(search_priority=priority, name__gt=name) |
+            Q(search_priority=priority, name=name, id__gt=pk)
+        )
+
+    # One extra row tells whether there is a next page
+    page = list(businesses[:page_size + 1])
+    if len(page) <= page_size:
+        return page, None
+    page = page[:page_size]
+    return page, encode_cursor(page[-1])
+
+
+def _legacy_search(query):
+    return Business.objects.annotate(
+        search_priority=Case(
+            When(name__iexact=query, then=Value(EXACT_NAME)),
+            When(name__icontains=query, then=Value(NAME_CONTAINS)),
+            When(description__icontains=query, then=Value(TEXT_MATCH)),
+            default=Value(SIMILAR_NAME),
+            output_field=IntegerField(),
+        )
+    ).filter(
+        Q(name__icontains=query) |
+        Q(description__icontains=query)
+    )
+
+
+def _postgres_search(query):
+    text_query = prefix_query(query)
+    matches = Q(search_vector=text_query) if text_query is not None else Q(pk__in=[])
+    if trigram_available():
+        # Each branch is served by its own GIN index and combined with a bitmap OR
+        matches |= Q(name__icontains=query) | Q(name__trigram_word_similar=query)
+
+    priorities = [
+        When(name__iexact=query, then=Value(EXACT_NAME)),
+        When(name__icontains=query, then=Value(NAME_CONTAINS)),
+    ]
+    if text_query is not None:
+        priorities.append(When(search_vector=text_query, then=Value(TEXT_MATCH)))
+
+    return Business.objects.filter(matches).annotate(
+        search_priority=Case(
+            *priorities,
+            default=Value(SIMILAR_NAME),
+            output_field=IntegerField(),
+        )
+    )
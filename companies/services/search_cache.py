@@ -0,0 +1,146 @@
+"""
+Read-through cache for business search result pages.
+
+A cached page holds the ids of its businesses, who each one inherits political
+data from, and the next-page cursor, so a hit is a single primary-key query
+instead of the ranked search plus the ownership walk. Entries live in the
+``search`` cache (locmem by default, the database cache in production) and
+are keyed by the normalized query, the include_employees flag, the category
+filter, the cursor and a generation number. The signal handlers in
+companies.signals bump the generation whenever a Business, its PoliticalData
+or a category changes, which retires every cached page at once.
+
+Hit and miss counters are kept in the same cache; see
+``python manage.py search_cache_stats``.
+"""
+import hashlib
+import json
+import time
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from companies.models import Business
+from companies.services.political_data import resolve_political_data
+from companies.services.search import get_page_size, get_search_backend, search_businesses, search_page
+
+GENERATION_KEY = 'business_search:generation'
+HITS_KEY = 'business_search:hits'
+MISSES_KEY = 'business_search:misses'
+
+
+def get_cache():
+    return caches[getattr(settings, 'BUSINESS_SEARCH_CACHE_ALIAS', 'search')]
+
+
+def get_timeout():
+    return getattr(settings, 'BUSINESS_SEARCH_CACHE_TIMEOUT', 300)
+
+
+def normalize_query(query):
+    """Collapse runs of whitespace so equivalent queries share a cache entry"""
+    return ' '.join(query.split())
+
+
+def _generation(cache):
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        # Start from the clock rather than 1, so a lost key can never bring old pages back
+        cache.add(GENERATION_KEY, time.time_ns(), timeout=None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+def _cache_key(cache, query, include_employees, cursor, category=None):
+    # Every search backend is case-insensitive, so case is folded for the key only
+    parts = [
+        _generation(cache), normalize_query(query).lower(), bool(include_employees),
+        cursor or '', get_search_backend(), get_page_size(),
+        category._meta.label_lower + f':{category.pk}' if category is not None else '',
+    ]
+    digest = hashlib.md5(json.dumps(parts).encode()).hexdigest()
+    return f'business_search:page:{digest}'
+
+
+def _count(cache, key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        # incr fails on a missing key; add() is a no-op if another process won the race
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+def cached_search_page(query, include_employees=False, cursor=None, category=None):
+    """
+    One page of search results for ``query``, optionally limited to a category subtree.
+    Returns (businesses, resolved political data, next_cursor) like
+    search_page + resolve_political_data, reading through the search cache.
+    Raises ValueError for an invalid cursor.
+    """
+    cache = get_cache()
+    query = normalize_query(query)
+    key = _cache_key(cache, query, include_employees, cursor, category)
+    entry = cache.get(key)
+
+    if entry is not None:
+        _count(cache, HITS_KEY)
+        # Results and the parent companies they inherit from, in one query
+        wanted = set(entry['ids']) | {parent_id for parent_id in entry['inherited_from'].values() if parent_id}
+        loaded = Business.objects.select_related('parent_company', 'politicaldata').in_bulk(wanted)
+        if wanted <= loaded.keys():
+            businesses = [loaded[business_id] for business_id in entry['ids']]
+            resolved = {}
+            for business in businesses:
+                parent_id = entry['inherited_from'][business.pk]
+                parent = loaded[parent_id] if parent_id else None
+                resolved[business.pk] = (getattr(parent or business, 'politicaldata', None), parent)
+            return businesses, resolved, entry['next_cursor']
+        # A business vanished without the generation being bumped (e.g. a raw delete); recompute
+
+    _count(cache, MISSES_KEY)
+    businesses, next_cursor = search_page(
+        search_businesses(query, category=category).select_related('parent_company', 'politicaldata'),
+        cursor
+    )
+    resolved = resolve_political_data(businesses)
+    cache.set(key, {
+        'ids': [business.pk for business in businesses],
+        'inherited_from': {
+            business_id: inherited_from.pk if inherited_from else None
+            for business_id, (_, inherited_from) in resolved.items()
+        },
+        'next_cursor': next_cursor,
+    }, get_timeout())
+    return businesses, resolved, next_cursor
+
+
+def invalidate_search_cache():
+    """Retire every cached search page, now and again once the current transaction commits"""
+    cache = get_cache()
+
+    def bump():
+        try:
+            cache.incr(GENERATION_KEY)
+        except ValueError:
+            cache.add(GENERATION_KEY, time.time_ns(), timeout=None)
+
+    bump()
+    # A search running before the commit may have cached the old data under the new generation
+    transaction.on_commit(bump)
+
+
+def search_cache_stats():
+    cache = get_cache()
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    lookups = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': hits / lookups if lookups else 0.0,
+        'generation': cache.get(GENERATION_KEY),
+    }
+
+
+def reset_search_cache_stats():
+    get_cache().delete_many([HITS_KEY, MISSES_KEY])
@@ -0,0 +1,165 @@
+"""
+In-process prefix index for business name autocomplete.
+
+Every worker keeps the names of all businesses in two sorted lists: one keyed
+by the whole name, and one keyed by every later word of the name and by the
+slug. A lookup is a bisect into each list, so suggestions never touch the
+database once the index is warm.
+
+The index is warmed when a WSGI worker starts (config/wsgi.py), or lazily on
+the first suggestion. The signal handlers in companies.signals apply saves and
+deletes incrementally once they commit, and bump a shared version
+(config.shared_version) so other workers know to rebuild their copy.
+"""
+import logging
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, insort
+from django.conf import settings
+from companies.models import Business
+from config.shared_version import SharedVersion
+
+logger = logging.getLogger(__name__)
+
+shared_version = SharedVersion('business_suggest:version', 'BUSINESS_SUGGEST_VERSION_CHECK_INTERVAL')
+
+
+def get_limit():
+    return getattr(settings, 'BUSINESS_SUGGEST_LIMIT', 10)
+
+
+def normalize(text):
+    """Case- and accent-insensitive form used for keys and prefixes"""
+    decomposed = unicodedata.normalize('NFKD', text.casefold())
+    return ' '.join(''.join(char for char in decomposed if not unicodedata.combining(char)).split())
+
+
+def _keys(name, slug):
+    """(whole-name key, other keys) for a business"""
+    primary = normalize(name)
+    words = primary.split(' ')
+    secondary = {' '.join(words[i:]) for i in range(1, len(words))}
+    slug_key = normalize((slug or '').replace('-', ' '))
+    if slug_key and slug_key != primary:
+        secondary.add(slug_key)
+    return primary, secondary
+
+
+class PrefixIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._businesses = {}  # id -> (name, slug)
+        self._primary = []     # sorted (key, id)
+        self._secondary = []   # sorted (key, id)
+        self.version = None
+        self.checked_at = 0.0
+
+    def __len__(self):
+        return len(self._businesses)
+
+    def build(self, rows, version=None):
+        """Replace the contents with ``rows`` of (id, name, slug)"""
+        businesses, primary, secondary = {}, [], []
+        for business_id, name, slug in rows:
+            businesses[business_id] = (name, slug)
+            key, others = _keys(name, slug)
+            primary.append((key, business_id))
+            secondary.extend((other, business_id) for other in others)
+        primary.sort()
+        secondary.sort()
+        with self._lock:
+            self._businesses, self._primary, self._secondary = businesses, primary, secondary
+            self.version = version
+            self.checked_at = time.monotonic()
+
+    def _remove(self, business_id):
+        old = self._businesses.pop(business_id, None)
+        if old is None:
+            return
+        key, others = _keys(*old)
+        for entries, entry_keys in ((self._primary, [key]), (self._secondary, others)):
+            for entry_key in entry_keys:
+                position = bisect_left(entries, (entry_key, business_id))
+                if position < len(entries) and entries[position] == (entry_key, business_id):
+                    del entries[position]
+
+    def upsert(self, business_id, name, slug):
+        with self._lock:
+            self._remove(business_id)
+            self._businesses[business_id] = (name, slug)
+            key, others = _keys(name, slug)
+            insort(self._primary, (key, business_id))
+            for other in others:
+                insort(self._secondary, (other, business_id))
+
+    def remove(self, business_id):
+        with self._lock:
+            self._remove(business_id)
+
+    def suggest(self, prefix, limit=None):
+        """Up to ``limit`` businesses as (id, name, slug), whole-name matches first"""
+        prefix = normalize(prefix)
+        limit = limit or get_limit()
+        if not prefix:
+            return []
+
+        found = []
+        seen = set()
+        with self._lock:
+            for entries in (self._primary, self._secondary):
+                position = bisect_left(entries, (prefix,))
+                while position < len(entries) and len(found) < limit:
+                    key, business_id = entries[position]
+                    if not key.startswith(prefix):
+                        break
+                    if business_id not in seen:
+                        seen.add(business_id)
+                        found.append((business_id, *self._businesses[business_id]))
+                    position += 1
+        return found
+
+
+_index = PrefixIndex()
+
+
+def warm_index():
+    """(Re)build this process's index from the database"""
+    version = shared_version.get()
+    _index.build(Business.objects.values_list('id', 'name', 'slug').iterator(chunk_size=5000), version)
+    logger.info(f"Business suggestion index warmed with {len(_index)} businesses")
+    return _index
+
+
+def get_index():
+    """The process-wide index, rebuilt if another worker changed businesses since it was built"""
+    if _index.version is None or not shared_version.is_current(_index):
+        warm_index()
+    return _index
+
+
+def _apply_change(change):
+    version = shared_version.bump()
+    if _index.version is None:
+        return
+    change()
+    # Keep the patched index only if no other worker changed anything since it was built
+    _index.version = version if version == _index.version + 1 else None
+
+
+def business_saved(business_id, name, slug):
+    _apply_change(lambda: _index.upsert(business_id, name, slug))
+
+
+def business_deleted(business_id):
+    _apply_change(lambda: _index.remove(business_id))
+
+
+def invalidate_index():
+    """Businesses were written in bulk: every worker rebuilds its index on next use"""
+    shared_version.bump()
+    _index.version = None
+
+
+def suggest_businesses(prefix, limit=None):
+    return get_index().suggest(prefix, limit)
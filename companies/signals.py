@@ -0,0 +1,105 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from companies.models import (
+    Business, BusinessAlternative, EditRequest, OwnershipClosure, PoliticalData, ProductCategory, ServiceCategory
+)
+from companies.services import alternatives, suggest
+from companies.services.category_tree import invalidate_category_tree
+from companies.services.edit_requests import invalidate_status_counts
+from companies.services.search_cache import invalidate_search_cache
+
+
+def _on_commit(func, business_id):
+    """Run func(business_id) once the current transaction commits"""
+    transaction.on_commit(lambda: func(business_id))
+
+
+@receiver(m2m_changed, sender=Business.products.through)
+@receiver(m2m_changed, sender=Business.services.through)
+def offerings_changed(sender, instance, action, reverse, model, pk_set, **kwargs):
+    """Refresh the alternatives index and search pages when a business gains or loses products/services"""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        # Category-filtered searches return the businesses offering the category
+        invalidate_search_cache()
+
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            _on_commit(alternatives.offerings_changed, instance.pk)
+        return
+
+    # Changed from the category side; instance is a category and pk_set holds business ids
+    if action == 'pre_clear':
+        related_name = 'product_providers' if sender is Business.products.through else 'service_providers'
+        instance._cleared_business_ids = list(
+            getattr(instance, related_name).values_list('id', flat=True)
+        )
+    elif action == 'post_clear':
+        pk_set = getattr(instance, '_cleared_business_ids', [])
+
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        for business_id in pk_set:
+            _on_commit(alternatives.offerings_changed, business_id)
+
+
+@receiver(post_save, sender=PoliticalData)
+@receiver(post_delete, sender=PoliticalData)
+def political_data_changed(sender, instance, **kwargs):
+    _on_commit(alternatives.political_data_changed, instance.business_id)
+
+
+@receiver(post_save, sender=Business)
+@receiver(post_delete, sender=Business)
+@receiver(post_save, sender=PoliticalData)
+@receiver(post_delete, sender=PoliticalData)
+def search_data_changed(sender, **kwargs):
+    """Names, descriptions, parent links and political data all show up in search results"""
+    invalidate_search_cache()
+
+
+@receiver(post_save, sender=Business)
+def update_suggestions(sender, instance, **kwargs):
+    business_id, name, slug = instance.pk, instance.name, instance.slug
+    transaction.on_commit(lambda: suggest.business_saved(business_id, name, slug))
+
+
+@receiver(post_delete, sender=Business)
+def remove_suggestions(sender, instance, **kwargs):
+    _on_commit(suggest.business_deleted, instance.pk)
+
+
+@receiver(pre_delete, sender=Business)
+def detach_subsidiaries(sender, instance, **kwargs):
+    # Subsidiaries become top-level companies (parent_company is SET_NULL)
+    OwnershipClosure.objects.detach_subtrees(instance)
+
+
+@receiver(pre_delete, sender=Business)
+def business_deleting(sender, instance, **kwargs):
+    # Remember who listed this business; their entries are removed by the cascade
+    instance._listed_by_ids = list(
+        BusinessAlternative.objects.filter(alternative=instance).values_list('business_id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Business)
+def business_deleted(sender, instance, **kwargs):
+    for business_id in getattr(instance, '_listed_by_ids', []):
+        _on_commit(alternatives.alternative_removed, business_id)
+
+
+@receiver(post_save, sender=ProductCategory)
+@receiver(post_delete, sender=ProductCategory)
+@receiver(post_save, sender=ServiceCategory)
+@receiver(post_delete, sender=ServiceCategory)
+def categories_changed(sender, **kwargs):
+    transaction.on_commit(invalidate_category_tree)
+    # Moving a category changes which businesses a category-filtered search returns
+    invalidate_search_cache()
+
+
+@receiver(post_save, sender=EditRequest)
+@receiver(post_delete, sender=EditRequest)
+def edit_requests_changed(sender, **kwargs):
+    invalidate_status_counts()
+
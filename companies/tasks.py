@@ -0,0 +1,87 @@
+"""
+Background tasks of the companies app, run by the jobs worker.
+"""
+import io
+from django.core.management import call_command
+from django.db import transaction
+from django.urls import reverse
+from companies.models import Business, DataSource, PoliticalData
+from companies.services.bulk_import import BulkDonationImporter
+from companies.services.donations import aggregate_csv
+from jobs.models import JobFailed
+from jobs.registry import task
+
+
+@task('companies.import_business', max_attempts=1)
+def import_business(job, name, website, description, data_sources, provides_services, provides_products,
+                    services=(), products=()):
+    """Create a business with its political data from a single-company donation CSV"""
+    try:
+        with transaction.atomic(), job.open_upload() as file:
+            # Decoded as the CSV is read, so a bad byte surfaces partway through
+            csv_text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+            business = Business.objects.create(
+                name=name,
+                website=website,
+                description=description,
+                provides_services=provides_services,
+                provides_products=provides_products,
+            )
+            if provides_services:
+                business.services.set(services)
+            if provides_products:
+                business.products.set(products)
+
+            # Aggregate the CSV into totals and donor flags in one pass
+            totals = aggregate_csv(csv_text)
+            PoliticalData.objects.create(business=business, **totals.political_data_fields())
+
+            for source_url in data_sources:
+                if source_url:
+                    DataSource.objects.get_or_create(
+                        business=business,
+                        url=source_url,
+                        defaults={
+                            'reason': 'import',
+                            'is_approved': True
+                        }
+                    )
+    except UnicodeDecodeError:
+        raise JobFailed('Error importing business: the CSV file is not UTF-8 encoded')
+    except ValueError as e:
+        raise JobFailed(f'Error importing business: {str(e)}')
+
+    return {'message': 'Business imported successfully!', 'url': reverse('business_detail', args=[business.slug])}
+
+
+@task('companies.bulk_import_donations', concurrency=1)
+def bulk_import_donations(job, source_url=None, batch_size=500):
+    """Bulk donation import of an uploaded CSV or ZIP; finished batches are kept if a later one fails"""
+    reported = 0
+
+    def progress(written, total):
+        nonlocal reported
+        errors = importer.report.errors[reported:]
+        reported = len(importer.report.errors)
+        job.progress(written, total, errors=[
+            f'{error.source}:{error.line}: {error.message}' if error.line else f'{error.source}: {error.message}'
+            for error in errors
+        ])
+
+    importer = BulkDonationImporter(batch_size=batch_size, source_url=source_url, progress=progress)
+    try:
+        with job.open_upload() as file:
+            report = importer.run(file, job.upload_name)
+    except ValueError as e:
+        raise JobFailed(f'Error importing donations: {str(e)}')
+    # Errors not yet reported, such as those of a file without any valid company
+    progress(job.processed, job.total)
+    return {'message': f'Imported {report}'}
+
+
+@task('companies.import_categories', concurrency=1)
+def import_categories(job):
+    """Import product and service categories from the bundled JSON files"""
+    out = io.StringIO()
+    call_command('import_categories', stdout=out, no_color=True)
+    return {'message': out.getvalue().strip().splitlines()[-1]}
@@ -0,0 +1,34 @@
+from decimal import Decimal
+from django.utils.text import slugify
+from companies.models import Business, PoliticalData, ProductCategory
+
+
+def create_category(name, model=ProductCategory, parent=None):
+    return model.objects.create(name=name, slug=slugify(name), parent=parent)
+
+
+def create_business(name, products=(), services=(), conservative=None, liberal=None, parent=None, **kwargs):
+    """Create a business with optional offerings and direct donation totals"""
+    business = Business.objects.create(
+        name=name,
+        description=kwargs.pop('description', f'{name} description'),
+        parent_company=parent,
+        provides_products=bool(products),
+        provides_services=bool(services),
+        **kwargs
+    )
+    if products:
+        business.products.set(products)
+    if services:
+        business.services.set(services)
+
+    if conservative is not None or liberal is not None:
+        conservative = Decimal(conservative or 0)
+        liberal = Decimal(liberal or 0)
+        PoliticalData.objects.create(
+            business=business,
+            direct_conservative_total_donations=conservative,
+            direct_liberal_total_donations=liberal,
+            direct_total_donations=conservative + liberal,
+        )
+    return business
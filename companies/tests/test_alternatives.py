@@ -0,0 +1,201 @@
+import importlib
+from decimal import Decimal
+from django.apps import apps
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from companies.models import Business, BusinessAlternative, PoliticalData, ServiceCategory
+from companies.services.alternatives import compute_alternatives, rebuild_alternatives
+from companies.tests.helpers import create_business, create_category
+
+
+class AlternativesIndexTest(TestCase):
+    def setUp(self):
+        self.coffee = create_category('Coffee')
+        self.tea = create_category('Tea')
+        self.delivery = create_category('Delivery', model=ServiceCategory)
+        self.business = create_business('Origin Roasters', products=[self.coffee, self.tea])
+
+    def alternative_names(self, business):
+        return [alt['business'].name for alt in business.get_alternative_businesses()]
+
+    def test_ranks_by_overlap_and_political_score(self):
+        create_business('Both Liberal', products=[self.coffee, self.tea], conservative=0, liberal=100)
+        create_business('Both Conservative', products=[self.coffee, self.tea], conservative=100, liberal=0)
+        create_business('Coffee Only', products=[self.coffee], conservative=0, liberal=100)
+        create_business('Unrelated', services=[self.delivery], conservative=0, liberal=100)
+
+        rebuild_alternatives([self.business.id])
+
+        alternatives = self.business.get_alternative_businesses()
+        self.assertEqual(
+            [alt['business'].name for alt in alternatives],
+            ['Both Liberal', 'Coffee Only', 'Both Conservative']
+        )
+        self.assertEqual([alt['overlap_count'] for alt in alternatives], [2, 1, 2])
+        self.assertAlmostEqual(alternatives[0]['score'], 1.0)
+        self.assertAlmostEqual(alternatives[1]['score'], 0.75)
+        self.assertAlmostEqual(alternatives[2]['score'], 0.5)
+
+    def test_missing_political_data_scores_neutral(self):
+        create_business('No Data', products=[self.coffee, self.tea])
+        rebuild_alternatives([self.business.id])
+
+        alternative = self.business.get_alternative_businesses()[0]
+        self.assertAlmostEqual(alternative['score'], 0.75)
+        self.assertIsNone(alternative['conservative_percentage'])
+
+    def test_business_without_offerings_has_no_alternatives(self):
+        lonely = create_business('Lonely')
+        create_business('Other', products=[self.coffee])
+        rebuild_alternatives([lonely.id])
+        self.assertEqual(lonely.get_alternative_businesses(), [])
+
+    @override_settings(ALTERNATIVES_INDEX_SIZE=2)
+    def test_index_keeps_top_k(self):
+        for i in range(4):
+            create_business(f'Shop {i}', products=[self.coffee], conservative=i, liberal=10)
+        rebuild_alternatives([self.business.id])
+        self.assertEqual(self.alternative_names(self.business), ['Shop 0', 'Shop 1'])
+
+    def test_adding_offering_updates_neighbours(self):
+        newcomer = create_business('Newcomer', conservative=0, liberal=100)
+        rebuild_alternatives([self.business.id])
+        self.assertEqual(self.alternative_names(self.business), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            newcomer.products.add(self.coffee)
+
+        self.assertEqual(self.alternative_names(self.business), ['Newcomer'])
+        self.assertEqual(self.alternative_names(newcomer), ['Origin Roasters'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            newcomer.products.clear()
+
+        self.assertEqual(self.alternative_names(self.business), [])
+        self.assertFalse(BusinessAlternative.objects.filter(business=newcomer).exists())
+
+    def test_adding_offering_from_category_side(self):
+        newcomer = create_business('Newcomer')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tea.product_providers.add(newcomer)
+        self.assertEqual(self.alternative_names(self.business), ['Newcomer'])
+
+    @override_settings(ALTERNATIVES_INDEX_SIZE=1)
+    def test_political_data_change_reorders(self):
+        first = create_business('First', products=[self.coffee], conservative=0, liberal=100)
+        second = create_business('Second', products=[self.coffee], conservative=50, liberal=50)
+        rebuild_alternatives([self.business.id])
+        self.assertEqual(self.alternative_names(self.business), ['First'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            PoliticalData.objects.filter(business=second).delete()
+            political_data = first.politicaldata
+            political_data.direct_conservative_total_donations = 100
+            political_data.direct_liberal_total_donations = 0
+            political_data.save()
+
+        # First dropped below Second's neutral score, so the list was rebuilt
+        self.assertEqual(self.alternative_names(self.business), ['Second'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+
+        self.assertEqual(self.alternative_names(self.business), ['First'])
+
+    def test_migration_builds_the_index_like_a_rebuild(self):
+        create_business('Both Liberal', products=[self.coffee, self.tea], conservative=0, liberal=100)
+        create_business('Coffee Conservative', products=[self.coffee], conservative=100, liberal=0)
+        create_business('Tea Only', products=[self.tea])
+        create_business('Unrelated', services=[self.delivery])
+        business_ids = list(Business.objects.values_list('id', flat=True))
+        rebuild_alternatives(business_ids)
+        rebuilt = list(BusinessAlternative.objects.order_by('business', '-score').values_list(
+            'business', 'alternative', 'score', 'overlap_count'
+        ))
+        BusinessAlternative.objects.all().delete()
+
+        migration = importlib.import_module('companies.migrations.0032_build_alternatives_index')
+        migration.build_index(apps, None)
+        built = list(BusinessAlternative.objects.order_by('business', '-score').values_list(
+            'business', 'alternative', 'score', 'overlap_count'
+        ))
+        self.assertEqual(built, rebuilt)
+
+    def test_incremental_updates_match_full_rebuild(self):
+        others = [
+            create_business(f'Shop {i}', products=[self.coffee] if i % 2 else [self.tea], conservative=i * 10, liberal=50)
+            for i in range(6)
+        ]
+        rebuild_alternatives([self.business.id] + [other.id for other in others])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            others[0].products.add(self.coffee)
+            others[3].products.remove(self.coffee)
+            political_data = others[5].politicaldata
+            political_data.direct_conservative_total_donations = 0
+            political_data.save()
+
+        for business in [self.business] + others:
+            incremental = self.alternative_names(business)
+            rebuild_alternatives([business.id])
+            self.assertEqual(incremental, self.alternative_names(business))
+
+
+class ScoringEngineTest(TestCase):
+    def setUp(self):
+        self.coffee = create_category('Coffee')
+        self.tea = create_category('Tea')
+        self.delivery = create_category('Delivery', model=ServiceCategory)
+        self.business = create_business('Origin Roasters', products=[self.coffee, self.tea], services=[self.delivery])
+        create_business('All Three', products=[self.coffee, self.tea], services=[self.delivery], conservative=30, liberal=70)
+        create_business('Delivery Only', services=[self.delivery], conservative=0, liberal=10)
+        create_business('Tea Only', products=[self.tea])
+        create_business('No Donations', products=[self.coffee], conservative=0, liberal=0)
+        create_business('Tied A', products=[self.tea], conservative=1, liberal=1)
+        create_business('Tied B', products=[self.tea], conservative=1, liberal=1)
+        create_business('Unrelated', products=[create_category('Bread')], conservative=0, liberal=1)
+
+    def scored(self, engine, limit=10):
+        return [
+            (entry.alternative.name, entry.overlap_count, round(entry.score, 9))
+            for entry in compute_alternatives(self.business.id, limit=limit, engine=engine)
+        ]
+
+    def test_engines_agree(self):
+        self.assertEqual(self.scored('sql'), self.scored('python'))
+        self.assertEqual(self.scored('sql', limit=3), self.scored('python', limit=3))
+        self.assertNotIn('Unrelated', [name for name, _, _ in self.scored('sql')])
+
+    def test_sql_engine_is_one_query(self):
+        with self.assertNumQueries(1):
+            compute_alternatives(self.business.id, limit=5, engine='sql')
+
+    def test_queryset_annotations(self):
+        alternative = Business.objects.alternatives_to(self.business.id).get(name='All Three')
+        self.assertEqual(alternative.overlap_count, 3)
+        self.assertEqual(alternative.conservative_percentage, Decimal('30.00'))
+        self.assertAlmostEqual(alternative.score, 0.5 + 0.35)
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            compute_alternatives(self.business.id, engine='fortran')
+
+
+class BusinessDetailQueryCountTest(TestCase):
+    def detail_queries(self, catalog_size):
+        coffee = create_category(f'Coffee {catalog_size}')
+        business = create_business(f'Origin {catalog_size}', products=[coffee], conservative=1, liberal=1)
+        for i in range(catalog_size):
+            create_business(f'Shop {catalog_size}-{i}', products=[coffee], conservative=i, liberal=10)
+        rebuild_alternatives([business.id])
+
+        url = reverse('business_detail', args=[business.slug])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_query_count_independent_of_catalog_size(self):
+        self.assertEqual(self.detail_queries(6), self.detail_queries(40))
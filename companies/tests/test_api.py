@@ -0,0 +1,129 @@
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from companies.models import EditRequest, Location, ServiceCategory
+from companies.tests.helpers import create_business, create_category
+
+
+@override_settings(BUSINESS_API_PAGE_SIZE=2)
+class BusinessApiTest(TestCase):
+    def setUp(self):
+        self.groceries = create_category('Groceries')
+        self.fruit = create_category('Fruit', parent=self.groceries)
+        self.delivery = create_category('Delivery', ServiceCategory)
+        self.parent = create_business('Parent Co', conservative=90, liberal=10)
+        self.acme = create_business('Acme', products=[self.fruit], services=[self.delivery], parent=self.parent)
+        self.blue = create_business('Blue Market', products=[self.groceries], conservative=10, liberal=90)
+        self.corner = create_business('Corner Shop', conservative=60, liberal=40)
+        self.acme.locations.add(Location.objects.create(
+            city='Austin', state='TX', zip_code='78701', latitude=Decimal('30.27'), longitude=Decimal('-97.74')
+        ))
+
+    def get(self, url=None, **params):
+        return self.client.get(url or reverse('business-list'), params)
+
+    def names(self, response):
+        return [business['name'] for business in response.json()['results']]
+
+    def test_cursor_pages(self):
+        response = self.get()
+        self.assertEqual(self.names(response), ['Acme', 'Blue Market'])
+        response = self.get(response.json()['next'])
+        self.assertEqual(self.names(response), ['Corner Shop', 'Parent Co'])
+        self.assertIsNone(response.json()['next'])
+        self.assertEqual(len(self.get(page_size=3).json()['results']), 3)
+
+    def test_full_record(self):
+        data = self.get(reverse('business-detail', args=[self.acme.slug])).json()
+        self.assertEqual(data['inherited_from'], 'parent-co')
+        self.assertEqual(data['parent_company'], 'parent-co')
+        self.assertEqual(data['political_data']['overall_conservative_percentage'], '90.00')
+        self.assertEqual([product['slug'] for product in data['products']], ['fruit'])
+        self.assertEqual(data['services'][0]['name'], 'Delivery')
+        self.assertEqual(data['locations'][0]['city'], 'Austin')
+
+    def test_query_count_independent_of_page_size(self):
+        def count(page_size):
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.get(page_size=page_size).status_code, 200)
+            return len(queries)
+
+        self.assertEqual(count(1), count(4))
+
+    def test_sparse_fields(self):
+        with self.assertNumQueries(1):
+            response = self.get(fields='name,slug')
+        self.assertEqual(response.json()['results'][0], {'name': 'Acme', 'slug': 'acme'})
+
+        response = self.get(fields='name,secret')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'fields': 'Unknown fields: secret'})
+
+    def test_filters(self):
+        response = self.get(category='groceries', category_type='products', fields='name')
+        self.assertEqual(self.names(response), ['Acme', 'Blue Market'])
+        self.assertEqual(self.names(self.get(category='delivery', category_type='services')), ['Acme'])
+        self.assertEqual(self.names(self.get(leaning='liberal')), ['Blue Market'])
+        self.assertEqual(self.names(self.get(max_conservative_percentage='70', min_conservative_percentage='50')),
+                         ['Corner Shop'])
+
+        self.assertEqual(self.get(leaning='centrist').status_code, 400)
+        self.assertEqual(self.get(category='groceries').status_code, 400)
+        self.assertEqual(self.get(max_conservative_percentage='lots').status_code, 400)
+
+    def test_political_filters_match_inherited_data(self):
+        # Acme has no data of its own and shows Parent Co's
+        response = self.get(leaning='conservative', page_size=10)
+        self.assertEqual(self.names(response), ['Acme', 'Corner Shop', 'Parent Co'])
+        self.assertEqual(response.json()['results'][0]['political_data']['overall_conservative_percentage'], '90.00')
+        self.assertEqual(self.names(self.get(min_conservative_percentage='80', page_size=10)), ['Acme', 'Parent Co'])
+
+        political_data = self.parent.politicaldata
+        political_data.affiliated_pac_maga_inc_donor = True
+        political_data.save()
+        self.assertEqual(self.names(self.get(flagged_pac_donor='true', page_size=10)), ['Acme', 'Parent Co'])
+
+        # A subsidiary's own data takes precedence over what it would inherit
+        create_business('Acme Labs', parent=self.acme, conservative=0, liberal=100)
+        self.assertEqual(self.names(self.get(leaning='liberal', page_size=10)), ['Acme Labs', 'Blue Market'])
+
+    def test_read_only(self):
+        self.assertEqual(self.client.post(reverse('business-list'), {'name': 'New'}).status_code, 405)
+
+
+class EditRequestApiTest(TestCase):
+    def setUp(self):
+        self.business = create_business('Acme')
+        self.user = get_user_model().objects.create_user(
+            'member', 'member@example.com', 'password', email_verified=True
+        )
+
+    def test_submit_and_review(self):
+        self.client.force_login(self.user)
+        response = self.client.post(reverse('editrequest-list'), {
+            'business': self.business.pk,
+            'name': 'Acme Foods',
+            'direct_total_donations': '100.00',
+            'justification': 'Renamed',
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['submitted_by'], 'member')
+        edit_request = EditRequest.objects.get()
+
+        admin = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(admin)
+        response = self.client.post(reverse('editrequest-review', args=[edit_request.pk]), {'status': 'approved'})
+        self.assertEqual(response.json()['status'], 'approved')
+        self.business.refresh_from_db()
+        self.assertEqual(self.business.name, 'Acme Foods')
+        self.assertEqual(self.business.politicaldata.direct_total_donations, Decimal('100.00'))
+
+        response = self.client.post(reverse('editrequest-review', args=[edit_request.pk]), {'status': 'approved'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_anonymous_list_is_empty(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse('editrequest-list')).json(), [])
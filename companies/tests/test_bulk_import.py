@@ -0,0 +1,118 @@
+import io
+import os
+import tempfile
+import zipfile
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from companies.models import Business, DataSource, OwnershipClosure, PoliticalData
+from companies.services.bulk_import import BulkDonationImporter
+from companies.tests.helpers import create_business
+from jobs.models import Job
+from jobs.worker import run_pending
+
+MULTI_COMPANY_CSV = '''Company,Recipient,View,From Organization,From PACs,From Individuals,Source URL
+Acme Corp,Democratic Party,Democrat,"$1,000",$0,$0,https://example.com/acme
+Globex,America PAC (Texas),Republican,$500,$0,$0,https://example.com/globex
+Acme Corp,Save America,Republican,$0,$250,$0,
+Globex,Trump Victory,Republican,$0,$0,$75,
+Acme Corp,Someone,Democrat,not money,$0,$0,
+,Nobody,Democrat,$5,$0,$0,
+'''
+
+SINGLE_COMPANY_CSV = '''Recipient,View,From Organization,From PACs
+Make America Great Again Inc,Republican,$100,$0
+Progress PAC,Liberal,$300,$50
+'''
+
+
+def upload(content, name='donations.csv'):
+    return io.BytesIO(content.encode() if isinstance(content, str) else content), name
+
+
+class BulkDonationImporterTest(TestCase):
+    def test_multi_company_csv(self):
+        existing = create_business('Globex', conservative=1, liberal=1)
+        report = BulkDonationImporter(batch_size=1).run(*upload(MULTI_COMPANY_CSV))
+
+        self.assertEqual(report.rows, 6)
+        self.assertEqual((report.companies_created, report.companies_updated), (1, 1))
+        self.assertEqual(sorted((error.line, error.message) for error in report.errors), [
+            (6, "Invalid amount: 'not money'"),
+            (7, 'Missing company name'),
+        ])
+        self.assertGreater(report.rows_per_second, 0)
+
+        acme = Business.objects.get(slug='acme-corp')
+        self.assertEqual(acme.politicaldata.direct_liberal_total_donations, Decimal('1000'))
+        self.assertEqual(acme.politicaldata.affiliated_pac_conservative_total_donations, Decimal('250'))
+        self.assertTrue(acme.politicaldata.affiliated_pac_save_america_pac_donor)
+        self.assertEqual(acme.politicaldata.overall_liberal_percentage, Decimal('80.00'))
+        self.assertTrue(OwnershipClosure.objects.filter(ancestor=acme, descendant=acme, depth=0).exists())
+        self.assertEqual(list(acme.data_sources.values_list('url', 'is_approved')), [('https://example.com/acme', True)])
+
+        existing.politicaldata.refresh_from_db()
+        self.assertEqual(existing.politicaldata.direct_total_donations, Decimal('500'))
+        self.assertTrue(existing.politicaldata.direct_america_pac_donor)
+        self.assertTrue(existing.politicaldata.senior_employee_trump_donor)
+        self.assertTrue(existing.politicaldata.any_flagged_pac_donor)
+
+    def test_reimport_updates_in_place(self):
+        BulkDonationImporter().run(*upload(MULTI_COMPANY_CSV))
+        report = BulkDonationImporter().run(*upload(MULTI_COMPANY_CSV))
+        self.assertEqual((report.companies_created, report.companies_updated), (0, 2))
+        self.assertEqual(PoliticalData.objects.count(), 2)
+        self.assertEqual(DataSource.objects.count(), 2)
+
+    def test_zip_of_company_files(self):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as archive:
+            archive.writestr('exports/Initech.csv', SINGLE_COMPANY_CSV)
+            archive.writestr('Umbrella.csv', 'Recipient,Amount\nX,1\n')
+            archive.writestr('README.txt', 'not a csv')
+        report = BulkDonationImporter(source_url='https://example.com/bulk').run(*upload(buffer.getvalue(), 'bulk.zip'))
+
+        self.assertEqual(report.companies_created, 1)
+        self.assertEqual([(error.source, error.message) for error in report.errors], [
+            ('Umbrella.csv', 'CSV file missing required columns'),
+        ])
+        initech = Business.objects.get(slug='initech')
+        self.assertTrue(initech.politicaldata.direct_maga_inc_donor)
+        self.assertEqual(initech.politicaldata.direct_liberal_total_donations, Decimal('300'))
+        self.assertEqual(initech.data_sources.get().url, 'https://example.com/bulk')
+
+    def test_unsupported_file(self):
+        with self.assertRaises(ValueError):
+            BulkDonationImporter().run(*upload('x', 'donations.xlsx'))
+
+    def test_management_command(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as file:
+            file.write(MULTI_COMPANY_CSV)
+        self.addCleanup(os.remove, file.name)
+
+        out = io.StringIO()
+        call_command('bulk_import_donations', file.name, '--batch-size', '1', stdout=out)
+        self.assertIn('2 businesses created', out.getvalue())
+        self.assertIn("Invalid amount: 'not money'", out.getvalue())
+
+    def test_admin_upload(self):
+        admin = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(admin)
+        url = reverse('admin:companies_business_bulk_import')
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+        response = self.client.post(url, {
+            'donations_file': SimpleUploadedFile('donations.csv', MULTI_COMPANY_CSV.encode()),
+        })
+        job = Job.objects.get()
+        self.assertRedirects(response, reverse('jobs:job_status', args=[job.pk]))
+        self.assertFalse(Business.objects.exists())
+
+        [job] = run_pending()
+        self.assertEqual(job.status, 'succeeded')
+        self.assertEqual((job.processed, job.total), (2, 2))
+        self.assertIn("Invalid amount: 'not money'", job.errors[0])
+        self.assertEqual(Business.objects.filter(slug__in=['acme-corp', 'globex']).count(), 2)
@@ -0,0 +1,103 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from companies.models import DataSource, PoliticalData
+from companies.services.alternatives import rebuild_alternatives
+from companies.tests.helpers import create_business, create_category
+
+
+class BusinessDetailConditionalGetTest(TestCase):
+    def setUp(self):
+        self.coffee = create_category('Coffee')
+        self.parent = create_business('Holding Group', conservative=10, liberal=90)
+        self.business = create_business('Origin Roasters', products=[self.coffee], parent=self.parent)
+        create_business('Corner Cafe', products=[self.coffee], conservative=0, liberal=100)
+        rebuild_alternatives([self.business.id])
+        self.url = reverse('business_detail', args=[self.business.slug])
+
+    def etag(self):
+        return self.client.get(self.url)['ETag']
+
+    def test_full_response_carries_validators_and_public_caching(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Corner Cafe')
+        self.assertTrue(response['ETag'].startswith('"'))
+        self.assertNotIn('Last-Modified', response)
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('max-age=60', response['Cache-Control'])
+        self.assertIn('s-maxage=300', response['Cache-Control'])
+
+    def test_not_modified_runs_only_the_validator_query(self):
+        etag = self.etag()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(len(queries), 1)
+
+    def test_if_modified_since_alone_gets_the_page(self):
+        # Removing a category link moves no timestamp, so dates cannot tell the page changed
+        self.business.products.remove(self.coffee)
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT')
+        self.assertEqual(response.status_code, 200)
+
+    def test_etag_follows_business_and_inherited_political_data(self):
+        etag = self.etag()
+        self.business.description = 'Roasting since 1999'
+        self.business.save()
+        self.assertNotEqual(self.etag(), etag)
+
+        etag = self.etag()
+        political_data = PoliticalData.objects.get(business=self.parent)
+        political_data.direct_conservative_total_donations = 50
+        political_data.save()
+        self.assertNotEqual(self.etag(), etag)
+
+    def test_etag_follows_offerings_sources_and_alternatives(self):
+        etag = self.etag()
+        self.business.products.add(create_category('Tea'))
+        self.assertNotEqual(self.etag(), etag)
+
+        etag = self.etag()
+        source = DataSource.objects.create(business=self.business, url='https://example.com/a', reason='update')
+        self.assertEqual(self.etag(), etag)
+        source.is_approved = True
+        source.save()
+        self.assertNotEqual(self.etag(), etag)
+
+        etag = self.etag()
+        create_business('New Roastery', products=[self.coffee], conservative=0, liberal=100)
+        rebuild_alternatives([self.business.id])
+        self.assertNotEqual(self.etag(), etag)
+
+    def test_signed_in_pages_are_private_per_session(self):
+        anonymous_etag = self.etag()
+        user = get_user_model().objects.create_user('reader', 'reader@example.com', 'password', email_verified=True)
+        self.client.force_login(user)
+        response = self.client.get(self.url)
+        self.assertNotEqual(response['ETag'], anonymous_etag)
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_pages_showing_flash_messages_are_not_cached(self):
+        etag = self.etag()
+        self.client.get(reverse('users:verify_email', args=['no-such-token']))
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, 'Invalid verification link.')
+        self.assertNotIn('ETag', response)
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn('no-store', response['Cache-Control'])
+
+        # Shown once: the next copy is the shared one again
+        response = self.client.get(self.url)
+        self.assertNotContains(response, 'Invalid verification link.')
+        self.assertIn('public', response['Cache-Control'])
+
+    def test_unknown_business(self):
+        response = self.client.get(reverse('business_detail', args=['no-such-business']))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,120 @@
+import io
+import json
+import os
+import tempfile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from companies.models import ProductCategory, ServiceCategory
+from companies.services.category_import import CategoryTreeDiff, flatten_tree
+from companies.tests.helpers import create_category
+
+PRODUCTS = [
+    {'name': 'Groceries', 'children': [
+        {'name': 'Produce', 'children': [{'name': 'Fruit', 'children': []}]},
+        {'name': 'Snacks', 'children': []},
+    ]},
+    {'name': 'Household', 'children': [
+        # Listed twice: the last occurrence decides the parent
+        {'name': 'Snacks', 'children': []},
+        {'name': ' ', 'children': [{'name': 'Lost', 'children': []}]},
+    ]},
+]
+
+
+def write_json(categories):
+    with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as file:
+        json.dump({'categories': categories}, file)
+    return file.name
+
+
+class CategoryTreeDiffTest(TestCase):
+    def parent_names(self):
+        return dict(ProductCategory.objects.values_list('name', 'parent__name'))
+
+    def test_flatten_tree(self):
+        parents, skipped = flatten_tree(PRODUCTS)
+        self.assertEqual(parents, {
+            'Groceries': None, 'Produce': 'Groceries', 'Fruit': 'Produce', 'Household': None, 'Snacks': 'Household',
+        })
+        self.assertEqual(skipped, 1)
+
+    def test_creates_whole_tree(self):
+        diff = CategoryTreeDiff(ProductCategory, PRODUCTS)
+        self.assertEqual(len(diff.creates), 5)
+        diff.apply()
+        self.assertEqual(self.parent_names(), {
+            'Groceries': None, 'Produce': 'Groceries', 'Fruit': 'Produce', 'Household': None, 'Snacks': 'Household',
+        })
+        self.assertEqual(ProductCategory.objects.get(name='Fruit').slug, 'fruit')
+
+    def test_moves_and_slug_fixes(self):
+        groceries = create_category('Groceries')
+        create_category('Produce')
+        snacks = create_category('Snacks', parent=groceries)
+        ProductCategory.objects.filter(pk=snacks.pk).update(slug='snacks-old')
+        create_category('Legacy')
+
+        diff = CategoryTreeDiff(ProductCategory, PRODUCTS)
+        self.assertEqual([category.name for category in diff.creates], ['Fruit', 'Household'])
+        self.assertEqual([(c.name, old, new) for c, old, new in diff.moves], [
+            ('Produce', None, 'Groceries'), ('Snacks', 'Groceries', 'Household'),
+        ])
+        self.assertEqual([(old, new) for _, old, new in diff.slug_fixes], [('snacks-old', 'snacks')])
+        self.assertEqual((diff.unchanged, diff.untouched), (1, 1))
+
+        with self.assertNumQueries(7):
+            # Savepoint, one insert per new level, update, path rebuild (read and write), release
+            self.assertEqual(diff.apply(), 4)
+        self.assertEqual(self.parent_names()['Snacks'], 'Household')
+        self.assertEqual(ProductCategory.objects.get(name='Snacks').slug, 'snacks')
+
+    def test_slug_collision_gets_suffix(self):
+        create_category('Fruit!')  # slug "fruit"
+        diff = CategoryTreeDiff(ProductCategory, [{'name': 'Fruit', 'children': []}])
+        diff.apply()
+        self.assertEqual(ProductCategory.objects.get(name='Fruit').slug, 'fruit-2')
+
+    def test_rerun_writes_nothing(self):
+        CategoryTreeDiff(ProductCategory, PRODUCTS).apply()
+        with CaptureQueriesContext(connection) as queries:
+            diff = CategoryTreeDiff(ProductCategory, PRODUCTS)
+            self.assertEqual(diff.apply(), 0)
+        self.assertFalse(diff.has_changes)
+        self.assertEqual(len(queries), 1)
+
+
+class ImportCategoriesCommandTest(TestCase):
+    def setUp(self):
+        self.products = write_json(PRODUCTS)
+        self.services = write_json([{'name': 'Repairs', 'children': [{'name': 'Plumbing', 'children': []}]}])
+        self.addCleanup(os.remove, self.products)
+        self.addCleanup(os.remove, self.services)
+
+    def call(self, *args):
+        out = io.StringIO()
+        call_command('import_categories', '--products', self.products, '--services', self.services, *args, stdout=out)
+        return out.getvalue()
+
+    def test_dry_run_then_import(self):
+        output = self.call('--dry-run')
+        self.assertIn('+ product category "Fruit" under "Produce"', output)
+        self.assertIn('Dry run: nothing written', output)
+        self.assertFalse(ProductCategory.objects.exists())
+
+        output = self.call()
+        self.assertIn('7 rows written', output)
+        self.assertEqual(ServiceCategory.objects.get(name='Plumbing').parent.name, 'Repairs')
+
+        self.assertIn('0 rows written', self.call())
+
+    def test_cycle_is_rejected(self):
+        self.services = write_json([
+            {'name': 'A', 'children': [{'name': 'B', 'children': [{'name': 'A', 'children': []}]}]},
+        ])
+        self.addCleanup(os.remove, self.services)
+        with self.assertRaisesMessage(CommandError, 'would become its own ancestor'):
+            self.call()
+        self.assertFalse(ProductCategory.objects.exists())
@@ -0,0 +1,113 @@
+import io
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from companies.models import Business, ProductCategory, ServiceCategory, category_path_segment
+from companies.tests.helpers import create_business, create_category
+
+
+class CategoryPathTest(TestCase):
+    def setUp(self):
+        self.groceries = create_category('Groceries')
+        self.produce = create_category('Produce', parent=self.groceries)
+        self.fruit = create_category('Fruit', parent=self.produce)
+        self.household = create_category('Household')
+
+    def names(self, categories):
+        return sorted(category.name for category in categories)
+
+    def test_paths_follow_parents(self):
+        self.assertEqual(self.groceries.path, category_path_segment(self.groceries.pk))
+        self.assertEqual(
+            ProductCategory.objects.get(pk=self.fruit.pk).path,
+            ''.join(category_path_segment(c.pk) for c in (self.groceries, self.produce, self.fruit))
+        )
+
+    def test_descendants_of(self):
+        with self.assertNumQueries(1):
+            names = self.names(ProductCategory.objects.descendants_of(self.groceries))
+        self.assertEqual(names, ['Fruit', 'Groceries', 'Produce'])
+        self.assertEqual(
+            self.names(ProductCategory.objects.descendants_of(self.groceries, include_self=False)),
+            ['Fruit', 'Produce']
+        )
+
+    def test_moving_category_moves_subtree(self):
+        self.produce.parent = self.household
+        self.produce.save()
+        self.assertEqual(self.names(ProductCategory.objects.descendants_of(self.groceries)), ['Groceries'])
+        self.assertEqual(
+            self.names(ProductCategory.objects.descendants_of(self.household)), ['Fruit', 'Household', 'Produce']
+        )
+        self.assertTrue(ProductCategory.objects.get(pk=self.fruit.pk).path.startswith(self.household.path))
+
+    def test_cannot_move_under_own_subcategory(self):
+        self.groceries.parent = self.fruit
+        with self.assertRaises(ValidationError):
+            self.groceries.save()
+        with self.assertRaises(ValidationError):
+            self.groceries.clean()
+
+    def test_rebuild_command(self):
+        ProductCategory.objects.update(path='')
+        ProductCategory.objects.filter(pk=self.groceries.pk).update(parent=self.fruit)
+        out = io.StringIO()
+        call_command('rebuild_category_paths', stdout=out)
+
+        self.assertIn('Rebuilt product category paths: 4 categories', out.getvalue())
+        self.assertEqual(out.getvalue().count('loops back on itself'), 1)
+        self.assertFalse(ProductCategory.objects.filter(path='').exists())
+        ProductCategory.objects.filter(pk=self.groceries.pk).update(parent=None)
+        ProductCategory.objects.rebuild()
+        self.assertEqual(
+            self.names(ProductCategory.objects.descendants_of(self.groceries)), ['Fruit', 'Groceries', 'Produce']
+        )
+
+
+class CategorySubtreeFilterTest(TestCase):
+    def setUp(self):
+        self.groceries = create_category('Groceries')
+        self.fruit = create_category('Fruit', parent=self.groceries)
+        self.delivery = create_category('Delivery', ServiceCategory)
+        self.grocer = create_business('Corner Grocer', products=[self.groceries], conservative=100)
+        self.orchard = create_business('Orchard Grocer', products=[self.fruit], liberal=100)
+        self.courier = create_business('Grocer Courier', products=[create_category('Boxes')], services=[self.delivery])
+
+    def test_in_category(self):
+        names = sorted(Business.objects.in_category(self.groceries).values_list('name', flat=True))
+        self.assertEqual(names, ['Corner Grocer', 'Orchard Grocer'])
+        self.assertEqual(list(Business.objects.in_category(self.fruit)), [self.orchard])
+        self.assertEqual(list(Business.objects.in_category(self.delivery)), [self.courier])
+
+    def test_search_by_category(self):
+        url = reverse('business_search')
+        response = self.client.get(url, {'q': 'grocer', 'format': 'json'})
+        self.assertEqual(len(response.json()['results']), 3)
+
+        response = self.client.get(url, {
+            'q': 'grocer', 'format': 'json', 'category': 'groceries', 'category_type': 'products'
+        })
+        self.assertEqual(
+            [result['name'] for result in response.json()['results']], ['Corner Grocer', 'Orchard Grocer']
+        )
+        response = self.client.get(url, {
+            'q': 'grocer', 'format': 'json', 'category': 'delivery', 'category_type': 'services'
+        })
+        self.assertEqual([result['name'] for result in response.json()['results']], ['Grocer Courier'])
+
+        response = self.client.get(url, {'q': 'grocer', 'format': 'json', 'category': 'groceries'})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(url, {
+            'q': 'grocer', 'format': 'json', 'category': 'nothing', 'category_type': 'products'
+        })
+        self.assertEqual(response.json(), {'error': 'Unknown category: nothing'})
+
+    def test_alternatives_by_category(self):
+        shop = create_business('Shop', products=[self.groceries, self.fruit])
+        alternatives = shop.get_alternative_businesses(category=self.fruit)
+        self.assertEqual([entry['business'] for entry in alternatives], [self.orchard])
+
+        alternatives = shop.get_alternative_businesses(category=self.groceries)
+        self.assertEqual([entry['business'] for entry in alternatives], [self.orchard, self.grocer])
+        self.assertEqual(alternatives[0]['overlap_count'], 1)
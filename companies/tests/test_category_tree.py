@@ -0,0 +1,100 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from companies.models import ProductCategory, ServiceCategory
+from companies.services.category_import import CategoryTreeDiff
+from companies.services import category_tree
+from companies.services.category_tree import CategoryForest, build_forest, get_forest, invalidate_category_tree
+from companies.tests.helpers import create_category
+
+
+class CategoryForestTest(TestCase):
+    def setUp(self):
+        self.forest = CategoryForest([
+            (1, 'Food', None),
+            (2, 'Drinks', 1),
+            (3, 'Coffee', 2),
+            (4, 'Espresso', 3),
+            (5, 'Tea', 2),
+            (6, 'Clothing', None),
+        ])
+
+    def names(self, query):
+        return [self.forest.names[category_id] for category_id in self.forest.filter(query)]
+
+    def test_expands_all_ancestors_and_descendants(self):
+        self.assertEqual(self.names('COFFEE'), ['Coffee', 'Drinks', 'Espresso', 'Food'])
+        self.assertEqual(self.names('food'), ['Coffee', 'Drinks', 'Espresso', 'Food', 'Tea'])
+        self.assertEqual(self.names('nothing'), [])
+
+    def test_empty_query_matches_everything(self):
+        self.assertEqual(len(self.forest.filter('  ')), 6)
+
+    def test_as_dicts(self):
+        self.assertEqual(self.forest.as_dicts([4]), [
+            {'id': 4, 'name': 'Espresso', 'parent_id': 3, 'parent_name': 'Coffee'}
+        ])
+
+
+@override_settings(CATEGORY_TREE_VERSION_CHECK_INTERVAL=0)
+class FilterCategoriesViewTest(TestCase):
+    def setUp(self):
+        invalidate_category_tree()
+        drinks = create_category('Drinks', ServiceCategory)
+        coffee = create_category('Coffee', ServiceCategory, parent=drinks)
+        create_category('Espresso', ServiceCategory, parent=coffee)
+        create_category('Coffee Beans', ProductCategory)
+
+    def get(self, headers=None, **params):
+        return self.client.get(reverse('filter_categories'), params, headers=headers)
+
+    def names(self, response):
+        return [result['name'] for result in response.json()['results']]
+
+    def test_filter_without_queries_once_cached(self):
+        get_forest('services')
+        with self.assertNumQueries(0):
+            response = self.get(q='espresso', type='services')
+        self.assertEqual(self.names(response), ['Coffee', 'Drinks', 'Espresso'])
+        self.assertEqual(response.json()['results'][0]['parent_name'], 'Drinks')
+        self.assertEqual(self.names(self.get(q='coffee', type='products')), ['Coffee Beans'])
+
+    def test_not_modified(self):
+        response = self.get(q='coffee', type='services')
+        etag = response['ETag']
+        self.assertIn('no-cache', response['Cache-Control'])
+
+        response = self.get(q='coffee', type='services', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertNotEqual(self.get(q='tea', type='services')['ETag'], etag)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            create_category('Tea', ServiceCategory, parent=ServiceCategory.objects.get(name='Drinks'))
+        response = self.get(q='coffee', type='services', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+
+    def test_signals_and_import_refresh_tree(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            ServiceCategory.objects.get(name='Espresso').delete()
+        self.assertEqual(self.names(self.get(q='coffee', type='services')), ['Coffee', 'Drinks'])
+
+        diff = CategoryTreeDiff(ServiceCategory, [{'name': 'Coffee', 'children': [{'name': 'Decaf'}]}])
+        with self.captureOnCommitCallbacks(execute=True):
+            diff.apply()
+        self.assertEqual(self.names(self.get(q='decaf', type='services')), ['Coffee', 'Decaf'])
+
+    def test_evicted_version_is_not_reused(self):
+        cache = caches[settings.SHARED_VERSION_CACHE_ALIAS]
+        cache.delete(category_tree.shared_version.key)
+        invalidate_category_tree()
+        stale = build_forest('services')
+        # The version key is evicted and set again: a forest built before must not pass as current
+        cache.delete(category_tree.shared_version.key)
+        invalidate_category_tree()
+        self.assertNotEqual(category_tree.shared_version.get(), stale.version)
+
+    def test_invalid_type(self):
+        response = self.get(q='coffee', type='places')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': 'Invalid category type'})
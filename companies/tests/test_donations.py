@@ -0,0 +1,166 @@
+import csv
+import io
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from django.urls import reverse
+from companies.models import Business
+from companies.services.donations import (
+    DonationAggregator,
+    DonationTotals,
+    RecipientMatcher,
+    aggregate_csv,
+    parse_cents,
+)
+from jobs.models import Job
+from jobs.worker import run_pending
+
+DONATIONS_CSV = '''Recipient,View,From Organization,From PACs,From Individuals
+America PAC (Texas),Republican,"$1,250.50",$0,$0
+Trump Save America JFC,Republican,$0,$10,$0
+DNC,Democrat,$0,40,
+Save America PAC (Texas),Conservative,$0,$0,$5.5
+Independent,Other,$7,$0,$0
+Short Row,Democrat,$1
+'''
+
+
+class DonationTotalsTest(TestCase):
+    def test_totals_and_flags(self):
+        totals = DonationTotals()
+        totals.add_row({'Recipient': 'America PAC (Texas)', 'View': 'Republican', 'From Organization': '$1,250.50'})
+        totals.add_row({'Recipient': 'Trump Save America JFC', 'View': 'Republican', 'From PACs': '$10'})
+        totals.add_row({'Recipient': 'DNC', 'View': 'Democrat', 'From PACs': '40', 'From Individuals': ''})
+        fields = totals.political_data_fields()
+
+        self.assertEqual(fields['direct_conservative_total_donations'], Decimal('1250.50'))
+        self.assertEqual(fields['direct_total_donations'], Decimal('1250.50'))
+        self.assertEqual(fields['affiliated_pac_liberal_total_donations'], Decimal('40'))
+        self.assertEqual(fields['affiliated_pac_total_donations'], Decimal('50'))
+        self.assertTrue(fields['direct_america_pac_donor'])
+        # A Trump recipient stops the PAC checks, as in the single-business importer
+        self.assertFalse(fields['affiliated_pac_save_america_pac_donor'])
+
+    def test_invalid_amount_leaves_totals_untouched(self):
+        totals = DonationTotals()
+        with self.assertRaises(ValueError):
+            totals.add_row({'Recipient': 'X', 'View': 'Democrat', 'From Organization': '$5', 'From PACs': 'n/a'})
+        self.assertEqual(totals.political_data_fields()['direct_total_donations'], Decimal('0'))
+
+    def test_parse_cents(self):
+        self.assertEqual(parse_cents('$1,234.5'), 123450)
+        self.assertEqual(parse_cents(' 7 '), 700)
+        self.assertEqual(parse_cents(''), 0)
+        self.assertEqual(parse_cents('-3'), Decimal('-300'))
+        self.assertEqual(parse_cents('0.125'), Decimal('12.5'))
+        for value in ('n/a', 'NaN', '1.2.3'):
+            with self.assertRaises(ValueError):
+                parse_cents(value)
+
+
+class RecipientMatcherTest(TestCase):
+    def test_first_match_per_source(self):
+        matcher = RecipientMatcher()
+        self.assertEqual(matcher('Trump Save America JFC'), (
+            'direct_save_america_pac_donor', None, 'senior_employee_trump_donor',
+        ))
+        # Overlapping needles still resolve in list order, not position order
+        self.assertEqual(matcher('SAVE AMERICA PAC (TEXAS)')[0], 'direct_america_pac_donor')
+        self.assertEqual(matcher('Progress PAC'), (None, None, None))
+        self.assertEqual(matcher(None), (None, None, None))
+
+
+class DonationAggregatorTest(TestCase):
+    def test_matches_row_at_a_time_totals(self):
+        expected = DonationTotals()
+        for row in csv.DictReader(io.StringIO(DONATIONS_CSV)):
+            expected.add_row(row)
+
+        totals = aggregate_csv(io.StringIO(DONATIONS_CSV))
+        self.assertEqual(totals.political_data_fields(), expected.political_data_fields())
+        fields = totals.political_data_fields()
+        self.assertEqual(fields['direct_total_donations'], Decimal('1258.50'))
+        self.assertEqual(fields['direct_liberal_total_donations'], Decimal('1'))
+        self.assertEqual(fields['senior_employee_conservative_total_donations'], Decimal('5.50'))
+        self.assertTrue(fields['senior_employee_america_pac_donor'])
+
+    def test_errors_and_grouping(self):
+        aggregator = DonationAggregator(key_column='Company', key=str.upper, extra_columns=['Website'])
+        errors = aggregator.read(io.StringIO(
+            'Company,Recipient,View,From PACs,Website\n'
+            'acme,DNC,Democrat,$5,https://acme.example\n'
+            'globex,DNC,Democrat,lots,\n'
+            'Acme,DNC,Democrat,$2,\n'
+        ))
+        self.assertEqual(errors, [(3, "Invalid amount: 'lots'")])
+        self.assertEqual(aggregator.rows, 3)
+        self.assertEqual(list(aggregator.totals), ['ACME'])
+        self.assertEqual(aggregator.totals['ACME'].political_data_fields()['affiliated_pac_liberal_total_donations'], Decimal('7'))
+        self.assertEqual(list(aggregator.extras['ACME']['Website']), ['https://acme.example', ''])
+
+    def test_header_errors(self):
+        with self.assertRaisesMessage(ValueError, 'CSV file missing required columns'):
+            aggregate_csv(io.StringIO('Recipient,Amount\nX,1\n'))
+        with self.assertRaisesMessage(ValueError, 'missing required column "Company"'):
+            DonationAggregator(key_column='Company').read(io.StringIO('Recipient,View,From PACs\n'))
+        with self.assertRaisesMessage(ValueError, "Line 2: Invalid amount: 'lots'"):
+            aggregate_csv(io.StringIO('Recipient,View,From PACs\nX,Democrat,lots\n'))
+
+
+class ImportBusinessViewTest(TestCase):
+    def setUp(self):
+        admin = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'password')
+        self.client.force_login(admin)
+
+    def post(self, content):
+        return self.client.post(reverse('import_business'), {
+            'name': 'Initech',
+            'website': 'https://initech.example',
+            'description': 'Software',
+            'data_sources[]': ['https://example.com/initech'],
+            'csv_file': SimpleUploadedFile('initech.csv', content.encode()),
+        })
+
+    def test_import_uses_aggregated_totals(self):
+        response = self.post(DONATIONS_CSV)
+        job = Job.objects.get()
+        self.assertRedirects(response, reverse('jobs:job_status', args=[job.pk]))
+
+        [job] = run_pending()
+        business = Business.objects.get(name='Initech')
+        self.assertEqual(job.result['url'], reverse('business_detail', args=[business.slug]))
+        self.assertEqual(business.politicaldata.direct_total_donations, Decimal('1258.50'))
+        self.assertEqual(business.politicaldata.affiliated_pac_total_donations, Decimal('50'))
+        self.assertTrue(business.politicaldata.direct_america_pac_donor)
+        self.assertTrue(business.politicaldata.senior_employee_america_pac_donor)
+
+    def test_invalid_amount_rolls_back(self):
+        self.post('Recipient,View,From PACs\nX,Democrat,lots\n')
+        [job] = run_pending()
+        self.assertEqual(job.status, 'failed')
+        self.assertIn("Line 2: Invalid amount: 'lots'", job.last_error)
+        self.assertFalse(Business.objects.filter(name='Initech').exists())
+
+    def test_upload_is_streamed_from_storage(self):
+        self.client.post(reverse('import_business'), {
+            'name': 'Initech',
+            'description': 'Software',
+            'data_sources[]': ['https://example.com/initech'],
+            'csv_file': SimpleUploadedFile('initech.csv', 'Recipient,View,From PACs\nCaf\xe9,Democrat,1\n'.encode('latin-1')),
+        })
+        job = Job.objects.get()
+        self.assertTrue(job.upload.name.startswith('jobs/uploads/'))
+        self.assertEqual(job.upload_name, 'initech.csv')
+
+        [job] = run_pending()
+        self.assertEqual(job.last_error, 'Error importing business: the CSV file is not UTF-8 encoded')
+        self.assertFalse(Business.objects.filter(name='Initech').exists())
+
+    def test_missing_data_source_is_not_queued(self):
+        response = self.client.post(reverse('import_business'), {
+            'name': 'Initech',
+            'csv_file': SimpleUploadedFile('initech.csv', DONATIONS_CSV.encode()),
+        })
+        self.assertContains(response, 'At least one data source URL is required')
+        self.assertFalse(Job.objects.exists())
@@ -0,0 +1,219 @@
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from companies.models import DataSource, EditRequest, PoliticalData, ServiceCategory
+from companies.services.edit_requests import (
+    approve_edit_requests, invalidate_status_counts, review_page, review_queue, status_counts
+)
+from companies.tests.helpers import create_business, create_category
+
+
+def create_edit_request(business, services_to_add=(), services_to_remove=(), products_to_add=(), **fields):
+    edit_request = EditRequest.objects.create(business=business, justification='Public filings', **fields)
+    edit_request.services_to_add.set(services_to_add)
+    edit_request.services_to_remove.set(services_to_remove)
+    edit_request.products_to_add.set(products_to_add)
+    return edit_request
+
+
+class ApproveEditRequestsTest(TestCase):
+    def setUp(self):
+        self.reviewer = get_user_model().objects.create_user('reviewer', 'reviewer@example.com', 'password')
+        self.delivery = create_category('Delivery', ServiceCategory)
+        self.catering = create_category('Catering', ServiceCategory)
+        self.groceries = create_category('Groceries')
+
+    def test_applies_changes(self):
+        business = create_business('Acme', services=[self.delivery], conservative=100, liberal=0)
+        edit_request = create_edit_request(
+            business,
+            name='Acme Foods',
+            direct_conservative_total_donations=Decimal('25'),
+            direct_liberal_total_donations=Decimal('75'),
+            direct_total_donations=Decimal('100'),
+            direct_america_pac_donor=True,
+            services_to_add=[self.catering],
+            services_to_remove=[self.delivery],
+            products_to_add=[self.groceries],
+        )
+        source = DataSource.objects.create(business=business, url='https://example.com', reason='update',
+                                           edit_request=edit_request)
+
+        report = approve_edit_requests([edit_request.pk], self.reviewer, 'Checked')
+        self.assertEqual(str(report), '1 approved, 0 left pending because of conflicts, 0 skipped')
+
+        business.refresh_from_db()
+        self.assertEqual(business.name, 'Acme Foods')
+        self.assertEqual(list(business.services.all()), [self.catering])
+        self.assertEqual(list(business.products.all()), [self.groceries])
+        political_data = business.politicaldata
+        self.assertEqual(political_data.overall_conservative_percentage, Decimal('25.00'))
+        self.assertTrue(political_data.any_flagged_pac_donor)
+
+        edit_request.refresh_from_db()
+        self.assertEqual((edit_request.status, edit_request.reviewed_by, edit_request.review_notes),
+                         ('approved', self.reviewer, 'Checked'))
+        source.refresh_from_db()
+        self.assertTrue(source.is_approved)
+
+    def test_query_count_independent_of_batch_size(self):
+        def approve(count):
+            ids = []
+            for number in range(count):
+                business = create_business(f'Business {count}-{number}', conservative=number % 2 * 10)
+                ids.append(create_edit_request(
+                    business, description='Updated', direct_total_donations=Decimal('10'),
+                    services_to_add=[self.delivery],
+                ).pk)
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(len(approve_edit_requests(ids, self.reviewer).approved), count)
+            return len(queries)
+
+        self.assertEqual(approve(2), approve(8))
+        self.assertEqual(PoliticalData.objects.filter(direct_total_donations=Decimal('10')).count(), 10)
+
+    def test_each_row_is_written_with_its_own_changes(self):
+        renamed = create_business('Acme', conservative=10, liberal=90)
+        described = create_business('Globex', conservative=10, liberal=90)
+        ids = [
+            create_edit_request(renamed, name='Acme Foods', direct_conservative_total_donations=Decimal('50')).pk,
+            create_edit_request(described, description='Updated', direct_liberal_total_donations=Decimal('20')).pk,
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            approve_edit_requests(ids, self.reviewer)
+
+        # A bulk update covering both rows would rewrite one business's name and the other's description
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE "companies_business"')]
+        self.assertEqual(len(updates), 2)
+        for sql in updates:
+            self.assertNotEqual('"name" = ' in sql, '"description" = ' in sql)
+        political_updates = [
+            query['sql'] for query in queries if query['sql'].startswith('UPDATE "companies_politicaldata"')
+        ]
+        self.assertEqual(len(political_updates), 2)
+        for sql in political_updates:
+            self.assertNotEqual('"direct_conservative_total_donations" = ' in sql,
+                                '"direct_liberal_total_donations" = ' in sql)
+
+        renamed.refresh_from_db()
+        described.refresh_from_db()
+        self.assertEqual((renamed.name, described.name, described.description), ('Acme Foods', 'Globex', 'Updated'))
+        self.assertEqual((renamed.politicaldata.direct_conservative_total_donations,
+                          renamed.politicaldata.direct_liberal_total_donations), (Decimal('50'), Decimal('90')))
+        self.assertEqual((described.politicaldata.direct_conservative_total_donations,
+                          described.politicaldata.direct_liberal_total_donations), (Decimal('10'), Decimal('20')))
+
+    def test_conflicting_requests_stay_pending(self):
+        business = create_business('Acme')
+        first = create_edit_request(business, name='Acme One')
+        second = create_edit_request(business, name='Acme Two')
+        other = create_edit_request(create_business('Other'), services_to_add=[self.delivery])
+
+        report = approve_edit_requests([first.pk, second.pk, other.pk], self.reviewer)
+        self.assertEqual(report.approved, [other])
+        self.assertEqual([edit_request for edit_request, _ in report.conflicts], [first, second])
+        self.assertEqual(report.conflicts[0][1], f'name differs from edit request #{first.pk}')
+        self.assertEqual(
+            set(EditRequest.objects.filter(status='pending').values_list('pk', flat=True)), {first.pk, second.pk}
+        )
+
+    def test_category_conflicts_and_compatible_requests(self):
+        business = create_business('Acme')
+        adding = create_edit_request(business, services_to_add=[self.delivery])
+        removing = create_edit_request(business, services_to_remove=[self.delivery])
+        report = approve_edit_requests([adding.pk, removing.pk], self.reviewer)
+        self.assertEqual(len(report.conflicts), 2)
+
+        same = create_edit_request(business, name='Acme Foods', services_to_add=[self.catering])
+        report = approve_edit_requests([adding.pk, same.pk], self.reviewer)
+        self.assertEqual(len(report.approved), 2)
+        self.assertEqual(set(business.services.all()), {self.delivery, self.catering})
+
+    def test_reviewed_requests_are_skipped(self):
+        edit_request = create_edit_request(create_business('Acme'), name='Acme Foods', status='rejected')
+        report = approve_edit_requests([edit_request.pk], self.reviewer)
+        self.assertEqual(report.skipped, [(edit_request, 'already rejected')])
+        self.assertEqual(EditRequest.objects.get(pk=edit_request.pk).status, 'rejected')
+
+
+class ReviewViewsTest(TestCase):
+    def setUp(self):
+        self.reviewer = get_user_model().objects.create_user(
+            'reviewer', 'reviewer@example.com', 'password', email_verified=True
+        )
+        self.reviewer.user_permissions.add(Permission.objects.get(codename='can_review_edits'))
+        self.client.force_login(self.reviewer)
+        self.business = create_business('Acme')
+
+    def test_review_single_request(self):
+        edit_request = create_edit_request(self.business, name='Acme Foods', provides_products=True)
+        response = self.client.post(
+            reverse('review_edit_request', args=[edit_request.pk]), {'action': 'approve', 'review_notes': 'ok'}
+        )
+        self.assertRedirects(response, reverse('review_edit_requests'))
+        self.business.refresh_from_db()
+        self.assertEqual((self.business.name, self.business.provides_products), ('Acme Foods', True))
+
+    def test_bulk_approve(self):
+        first = create_edit_request(self.business, description='First')
+        second = create_edit_request(create_business('Other'), description='Second')
+        self.assertContains(self.client.get(reverse('review_edit_requests')), 'Approve selected')
+
+        response = self.client.post(reverse('bulk_approve_edit_requests'), {
+            'edit_request_ids': [first.pk, second.pk], 'review_notes': 'Batch',
+        }, follow=True)
+        self.assertContains(response, '2 approved')
+        self.assertEqual(EditRequest.objects.filter(status='approved', review_notes='Batch').count(), 2)
+        self.assertEqual(self.client.get(reverse('bulk_approve_edit_requests')).status_code, 405)
+
+
+@override_settings(EDIT_REQUEST_REVIEW_PAGE_SIZE=2)
+class ReviewQueueTest(TestCase):
+    def setUp(self):
+        invalidate_status_counts()
+        acme = create_business('Acme')
+        other = create_business('Other')
+        self.requests = [
+            create_edit_request(acme if number % 2 else other, description=f'Change {number}')
+            for number in range(5)
+        ]
+        EditRequest.objects.filter(pk=self.requests[0].pk).update(status='approved')
+
+    def test_keyset_pages(self):
+        seen = []
+        page, cursor = review_page(review_queue('pending'))
+        seen += page
+        while cursor:
+            page, cursor = review_page(review_queue('pending'), cursor)
+            seen += page
+        self.assertEqual(seen, self.requests[:0:-1])
+        self.assertEqual(review_page(review_queue('', 'acm'))[0], [self.requests[3], self.requests[1]])
+
+        with self.assertRaises(ValueError):
+            review_page(review_queue('pending'), 'not-a-cursor')
+
+    def test_status_counts_are_cached_until_a_change(self):
+        self.assertEqual(status_counts(), {'pending': 4, 'approved': 1, 'rejected': 0})
+        with self.assertNumQueries(0):
+            status_counts()
+        with self.captureOnCommitCallbacks(execute=True):
+            create_edit_request(create_business('New'), description='Change')
+        self.assertEqual(status_counts()['pending'], 5)
+
+    def test_review_list_view(self):
+        reviewer = get_user_model().objects.create_user(
+            'reviewer', 'reviewer@example.com', 'password', email_verified=True
+        )
+        reviewer.user_permissions.add(Permission.objects.get(codename='can_review_edits'))
+        self.client.force_login(reviewer)
+
+        response = self.client.get(reverse('review_edit_requests'))
+        self.assertEqual(list(response.context['edit_requests']), self.requests[:2:-1])
+        self.assertContains(response, 'Pending (4)')
+        response = self.client.get(reverse('review_edit_requests'), {'cursor': response.context['next_cursor']})
+        self.assertEqual(list(response.context['edit_requests']), self.requests[2:0:-1])
+        self.assertIsNone(response.context['next_cursor'])
@@ -0,0 +1,85 @@
+import csv
+import io
+import json
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from companies.models import Business, DataSource, PoliticalData
+from companies.services.export import COLUMNS, export_lines, parse_since
+from companies.tests.helpers import create_business
+
+
+class ExportTest(TestCase):
+    def setUp(self):
+        self.parent = create_business('Parent Co', conservative=75, liberal=25)
+        self.acme = create_business('Acme, "The" Shop', parent=self.parent, description='Line one\nLine two')
+        DataSource.objects.create(business=self.acme, url='https://example.com/a', reason='import', is_approved=True)
+        DataSource.objects.create(business=self.acme, url='https://example.com/b', reason='update')
+
+    def records(self, **kwargs):
+        return [json.loads(line) for line in export_lines('ndjson', **kwargs)]
+
+    def test_ndjson(self):
+        parent, acme = self.records()
+        self.assertEqual(parent['overall_conservative_percentage'], '75.00')
+        self.assertEqual(acme['parent_company'], 'parent-co')
+        self.assertEqual(acme['data_sources'], ['https://example.com/a'])
+        self.assertIsNone(acme['direct_total_donations'])
+        self.assertEqual(list(acme), COLUMNS)
+
+    def test_csv(self):
+        rows = list(csv.DictReader(io.StringIO(''.join(export_lines('csv')))))
+        self.assertEqual([row['name'] for row in rows], ['Parent Co', 'Acme, "The" Shop'])
+        self.assertEqual(rows[1]['description'], 'Line one\nLine two')
+        self.assertEqual(rows[1]['data_sources'], 'https://example.com/a')
+
+    def test_bounded_queries_per_chunk(self):
+        for number in range(6):
+            create_business(f'Business {number}', conservative=1)
+        with self.assertNumQueries(5):
+            # One server-side cursor for the businesses and a data source query for each of the four chunks
+            self.assertEqual(len(self.records(chunk_size=2)), 8)
+
+    def test_since(self):
+        since = timezone.now()
+        self.assertEqual(self.records(since=since), [])
+
+        Business.objects.filter(pk=self.acme.pk).update(updated_at=since + timedelta(seconds=1))
+        PoliticalData.objects.filter(business=self.parent).update(last_updated=since + timedelta(seconds=1))
+        self.assertEqual(len(self.records(since=since)), 2)
+        self.assertEqual(self.records(since=since + timedelta(seconds=2)), [])
+
+    def test_parse_since(self):
+        self.assertEqual(parse_since('2024-05-01').day, 1)
+        self.assertTrue(timezone.is_aware(parse_since('2024-05-01T10:00:00')))
+        with self.assertRaises(ValueError):
+            parse_since('yesterday')
+
+    def test_command(self):
+        out, err = io.StringIO(), io.StringIO()
+        call_command('export_businesses', '--format', 'csv', stdout=out, stderr=err)
+        self.assertEqual(out.getvalue().splitlines()[0], ','.join(COLUMNS))
+        self.assertIn('Exported 2 businesses', err.getvalue())
+
+        with self.assertRaises(CommandError):
+            call_command('export_businesses', '--since', 'soon', stdout=out)
+
+    def test_endpoint(self):
+        url = reverse('export_businesses')
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+        user = get_user_model().objects.create_user('reader', 'reader@example.com', 'password', email_verified=True)
+        self.client.force_login(user)
+        response = self.client.get(url)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 2)
+
+        response = self.client.get(url, {'format': 'csv', 'since': timezone.now().isoformat()})
+        self.assertEqual(b''.join(response.streaming_content).decode().strip(), ','.join(COLUMNS))
+        self.assertEqual(self.client.get(url, {'format': 'xml'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'since': 'soon'}).status_code, 400)
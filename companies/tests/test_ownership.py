@@ -0,0 +1,116 @@
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from io import StringIO
+from companies.models import Business, OwnershipClosure
+from companies.tests.helpers import create_business
+
+
+def closure_of(business):
+    """(ancestor name, depth) pairs for a business, nearest first"""
+    return list(
+        OwnershipClosure.objects.filter(descendant=business)
+        .order_by('depth')
+        .values_list('ancestor__name', 'depth')
+    )
+
+
+class OwnershipClosureTest(TestCase):
+    def setUp(self):
+        self.holding = create_business('Holding', conservative=80, liberal=20)
+        self.group = create_business('Group', parent=self.holding)
+        self.brand = create_business('Brand', parent=self.group)
+
+    def test_closure_maintained_on_create(self):
+        self.assertEqual(closure_of(self.brand), [('Brand', 0), ('Group', 1), ('Holding', 2)])
+        self.assertEqual(closure_of(self.holding), [('Holding', 0)])
+
+    def test_ultimate_parent_and_subsidiaries(self):
+        self.assertEqual(self.brand.ultimate_parent, self.holding)
+        self.assertEqual(self.holding.ultimate_parent, self.holding)
+        self.assertEqual(self.holding.all_subsidiaries, [self.group, self.brand])
+        self.assertEqual(self.brand.all_subsidiaries, [])
+
+    def test_inherits_nearest_political_data(self):
+        political_data, inherited_from = self.brand.get_political_data()
+        self.assertEqual(inherited_from, self.holding)
+        self.assertEqual(political_data, self.holding.politicaldata)
+
+    def test_ancestry_is_prefetched(self):
+        with self.assertNumQueries(2):
+            brand = Business.objects.select_related('politicaldata').with_ancestors().get(pk=self.brand.pk)
+            self.assertEqual(brand.ultimate_parent, self.holding)
+            self.assertEqual(brand.inherited_from, self.holding)
+
+    def test_moving_a_subtree(self):
+        other = create_business('Other Holding')
+        self.group.parent_company = other
+        self.group.save()
+
+        self.assertEqual(closure_of(self.brand), [('Brand', 0), ('Group', 1), ('Other Holding', 2)])
+        self.assertEqual(self.holding.all_subsidiaries, [])
+        self.assertEqual(other.all_subsidiaries, [self.group, self.brand])
+
+        self.group.parent_company = None
+        self.group.save()
+        self.assertEqual(closure_of(self.brand), [('Brand', 0), ('Group', 1)])
+
+    def test_cycles_rejected(self):
+        self.holding.parent_company = self.brand
+        with self.assertRaises(ValidationError):
+            self.holding.full_clean()
+        with self.assertRaises(ValidationError):
+            self.holding.save()
+
+        self.holding.parent_company = self.holding
+        with self.assertRaises(ValidationError):
+            self.holding.save()
+
+        self.assertIsNone(Business.objects.get(pk=self.holding.pk).parent_company_id)
+
+    def test_deleting_a_parent_detaches_subsidiaries(self):
+        self.group.delete()
+        self.brand.refresh_from_db()
+
+        self.assertIsNone(self.brand.parent_company_id)
+        self.assertEqual(closure_of(self.brand), [('Brand', 0)])
+        self.assertEqual(self.holding.all_subsidiaries, [])
+
+    def test_rebuild_command(self):
+        expected = sorted(OwnershipClosure.objects.values_list('ancestor_id', 'descendant_id', 'depth'))
+        OwnershipClosure.objects.all().delete()
+        # Bulk updates bypass save() and leave a loop behind
+        Business.objects.filter(pk=self.holding.pk).update(parent_company=self.brand)
+
+        out = StringIO()
+        call_command('rebuild_ownership_closure', stdout=out)
+        self.assertIn('loops back on itself', out.getvalue())
+        self.assertEqual(closure_of(self.brand), [('Brand', 0)])
+
+        Business.objects.filter(pk=self.holding.pk).update(parent_company=None)
+        call_command('rebuild_ownership_closure', stdout=StringIO())
+        self.assertEqual(
+            sorted(OwnershipClosure.objects.values_list('ancestor_id', 'descendant_id', 'depth')),
+            expected
+        )
+
+
+class SearchOwnershipQueryCountTest(TestCase):
+    def search_queries(self, depth):
+        parent = create_business(f'Owner {depth}', conservative=10, liberal=0)
+        for i in range(depth):
+            parent = create_business(f'Chain {depth}-{i}', parent=parent)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('business_search'), {'q': f'Chain {depth}-'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['businesses']), depth)
+        for result in response.context['businesses']:
+            self.assertEqual(result['inherited_from'].name, f'Owner {depth}')
+        return len([query for query in queries.captured_queries if 'companies_' in query['sql']])
+
+    def test_query_count_independent_of_ownership_depth(self):
+        self.assertEqual(self.search_queries(2), self.search_queries(12))
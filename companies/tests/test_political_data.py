@@ -0,0 +1,81 @@
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from companies.api.serializers import BusinessSerializer
+from companies.models import Business, OwnershipClosure, PoliticalData
+from companies.services.political_data import resolve_political_data
+from companies.tests.helpers import create_business
+
+
+class ResolvePoliticalDataTest(TestCase):
+    def setUp(self):
+        self.holding = create_business('Holding', conservative=80, liberal=20)
+        self.group = create_business('Group', parent=self.holding)
+        PoliticalData.objects.create(business=self.group)  # Present but empty
+        self.brand = create_business('Brand', parent=self.group)
+        self.independent = create_business('Independent', conservative=1, liberal=3)
+        self.unknown = create_business('Unknown')
+        self.businesses = [self.holding, self.group, self.brand, self.independent, self.unknown]
+
+    def test_matches_get_political_data(self):
+        resolved = resolve_political_data(Business.objects.all())
+        for business in self.businesses:
+            fresh = Business.objects.get(pk=business.pk)
+            self.assertEqual(resolved[business.pk], fresh.get_political_data(), business.name)
+
+    def test_inherits_from_nearest_meaningful_parent(self):
+        resolved = resolve_political_data(self.businesses)
+        self.assertEqual(resolved[self.brand.pk], (self.holding.politicaldata, self.holding))
+        self.assertEqual(resolved[self.group.pk], (self.holding.politicaldata, self.holding))
+        self.assertEqual(resolved[self.independent.pk], (self.independent.politicaldata, None))
+        self.assertEqual(resolved[self.unknown.pk], (None, None))
+
+    def test_bounded_queries(self):
+        businesses = list(Business.objects.all())
+        with self.assertNumQueries(2):
+            resolve_political_data(businesses)
+
+        businesses = list(Business.objects.select_related('politicaldata').with_ancestors())
+        with self.assertNumQueries(0):
+            resolve_political_data(businesses)
+
+    def test_api_serializer(self):
+        with self.assertNumQueries(3):
+            data = BusinessSerializer(Business.objects.all(), many=True).data
+        by_slug = {row['slug']: row for row in data}
+        self.assertEqual(by_slug['brand']['inherited_from'], 'holding')
+        self.assertEqual(by_slug['brand']['political_data']['overall_conservative_percentage'], '80.00')
+        self.assertIsNone(by_slug['unknown']['political_data'])
+
+        single = BusinessSerializer(self.brand).data
+        self.assertEqual(single['inherited_from'], 'holding')
+
+
+class SearchQueryCountTest(TestCase):
+    @override_settings(BUSINESS_SEARCH_PAGE_SIZE=500)
+    def test_500_result_search(self):
+        owners = [create_business(f'Owner {i}', conservative=i, liberal=10) for i in range(5)]
+        Business.objects.bulk_create([
+            Business(
+                name=f'Result {i:03d}',
+                slug=f'result-{i:03d}',
+                description='Search result',
+                parent_company=owners[i % len(owners)],
+            )
+            for i in range(500)
+        ])
+        OwnershipClosure.objects.rebuild()
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('business_search'), {'q': 'Result'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['businesses']), 500)
+        self.assertTrue(all(result['inherited_from'] for result in response.context['businesses']))
+
+        # Session/auth lookups aside, one query for the results and one for their parent companies
+        search_queries = [
+            query for query in queries.captured_queries
+            if 'companies_' in query['sql']
+        ]
+        self.assertEqual(len(search_queries), 2)
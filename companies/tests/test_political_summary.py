@@ -0,0 +1,76 @@
+import importlib
+from decimal import Decimal
+from django.apps import apps
+from django.test import TestCase
+from companies.models import PoliticalData
+from companies.tests.helpers import create_business
+
+
+class PoliticalSummaryTest(TestCase):
+    def setUp(self):
+        self.business = create_business('Acme')
+
+    def create_political_data(self, **fields):
+        return PoliticalData.objects.create(business=self.business, **fields)
+
+    def test_summary_computed_on_save(self):
+        political_data = self.create_political_data(
+            direct_conservative_total_donations=Decimal('300'),
+            direct_liberal_total_donations=Decimal('100'),
+            direct_total_donations=Decimal('400'),
+            senior_employee_conservative_total_donations=Decimal('0'),
+            senior_employee_liberal_total_donations=Decimal('600'),
+            senior_employee_total_donations=Decimal('600'),
+        )
+        political_data.refresh_from_db()
+
+        self.assertEqual(political_data.overall_conservative_percentage, Decimal('30.00'))
+        self.assertEqual(political_data.overall_liberal_percentage, Decimal('70.00'))
+        self.assertEqual(political_data.conservative_percentage_without_employees, Decimal('75.00'))
+        self.assertEqual(political_data.liberal_percentage_without_employees, Decimal('25.00'))
+        self.assertFalse(political_data.any_flagged_pac_donor)
+
+    def test_no_donations_leaves_percentages_empty(self):
+        political_data = self.create_political_data(senior_employee_trump_donor=True)
+        self.assertIsNone(political_data.overall_conservative_percentage)
+        self.assertIsNone(political_data.conservative_percentage_without_employees)
+        # A Trump donor flag alone is not a PAC donor flag
+        self.assertFalse(political_data.any_flagged_pac_donor)
+
+    def test_float_inputs(self):
+        political_data = self.create_political_data(
+            affiliated_pac_conservative_total_donations=1.0,
+            affiliated_pac_liberal_total_donations=2.0,
+            affiliated_pac_total_donations=3.0,
+        )
+        self.assertEqual(political_data.overall_conservative_percentage, Decimal('33.33'))
+
+    def test_update_fields_includes_summary(self):
+        political_data = self.create_political_data()
+        political_data.direct_save_america_pac_donor = True
+        political_data.save(update_fields=['direct_save_america_pac_donor'])
+        political_data.refresh_from_db()
+        self.assertTrue(political_data.any_flagged_pac_donor)
+
+    def test_filter_and_order_by_leaning(self):
+        self.create_political_data(direct_conservative_total_donations=10, direct_total_donations=10)
+        other = create_business('Other', conservative=0, liberal=5)
+        leaning = PoliticalData.objects.filter(
+            overall_conservative_percentage__lt=50
+        ).values_list('business__name', flat=True)
+        self.assertEqual(list(leaning), [other.name])
+
+    def test_migration_backfills_summaries(self):
+        political_data = self.create_political_data(
+            direct_conservative_total_donations=Decimal('1'),
+            direct_total_donations=Decimal('4'),
+            affiliated_pac_america_pac_donor=True,
+        )
+        PoliticalData.objects.update(overall_conservative_percentage=None, any_flagged_pac_donor=False)
+
+        migration = importlib.import_module('companies.migrations.0025_politicaldata_summary_columns')
+        migration.backfill_summaries(apps, None)
+
+        political_data.refresh_from_db()
+        self.assertEqual(political_data.overall_conservative_percentage, Decimal('25.00'))
+        self.assertTrue(political_data.any_flagged_pac_donor)
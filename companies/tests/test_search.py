@@ -0,0 +1,104 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from companies.services.search import SEARCH_BACKENDS, search_businesses, trigram_available
+from companies.tests.helpers import create_business
+
+
+class BusinessSearchTest(TestCase):
+    def setUp(self):
+        create_business('Coffee', description='Roasted beans')
+        create_business('Blue Coffee Roasters', description='Independent roastery')
+        create_business('Corner Bakery', description='Bread, pastries and coffee')
+        create_business('Hardware Store', description='Tools and paint')
+
+    def names(self, query, backend):
+        return list(search_businesses(query, backend=backend).values_list('name', flat=True))
+
+    def test_priority_order(self):
+        for backend in SEARCH_BACKENDS:
+            with self.subTest(backend=backend):
+                self.assertEqual(
+                    self.names('coffee', backend),
+                    ['Coffee', 'Blue Coffee Roasters', 'Corner Bakery']
+                )
+
+    def test_priorities(self):
+        priorities = dict(search_businesses('coffee', backend='postgres').values_list('name', 'search_priority'))
+        self.assertEqual(priorities, {'Coffee': 3, 'Blue Coffee Roasters': 2, 'Corner Bakery': 1})
+
+    def test_full_text_matches_word_prefixes(self):
+        self.assertEqual(self.names('roast', 'postgres'), ['Blue Coffee Roasters', 'Coffee'])
+        self.assertEqual(self.names('pastry', 'postgres'), ['Corner Bakery'])
+        self.assertEqual(self.names('bread tools', 'postgres'), [])
+
+    def test_punctuation_only_query(self):
+        self.assertEqual(self.names("'&:*", 'postgres'), [])
+
+    def test_typo_tolerance(self):
+        if not trigram_available():
+            self.skipTest('pg_trgm is not installed')
+        self.assertEqual(self.names('hardwre', 'postgres'), ['Hardware Store'])
+        self.assertEqual(self.names('ware', 'postgres'), ['Hardware Store'])
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            search_businesses('coffee', backend='elastic')
+
+    @override_settings(BUSINESS_SEARCH_BACKEND='legacy')
+    def test_view_uses_configured_backend(self):
+        response = self.client.get(reverse('business_search'), {'q': 'ware'})
+        self.assertEqual([result['business'].name for result in response.context['businesses']], ['Hardware Store'])
+
+
+@override_settings(BUSINESS_SEARCH_PAGE_SIZE=3)
+class SearchPaginationTest(TestCase):
+    def setUp(self):
+        create_business('Shop')
+        for i in range(4):
+            create_business(f'Shop {i}')
+            create_business(f'Corner {i}', description='A shop on the corner')
+        # Same name, told apart by id
+        create_business('Shop 1', slug='shop-1-again')
+
+    def get(self, **params):
+        return self.client.get(reverse('business_search'), {'q': 'shop', **params})
+
+    def test_pages_cover_results_in_order(self):
+        expected = list(search_businesses('shop').values_list('pk', flat=True))
+        self.assertEqual(len(expected), 10)
+
+        seen, cursor = [], None
+        while True:
+            response = self.get(**({'cursor': cursor} if cursor else {}))
+            page = [result['business'].pk for result in response.context['businesses']]
+            self.assertLessEqual(len(page), 3)
+            seen.extend(page)
+            cursor = response.context['next_cursor']
+            if not cursor:
+                break
+            self.assertContains(response, 'Next page')
+
+        self.assertEqual(seen, expected)
+
+    def test_page_query_count_is_bounded(self):
+        cursor = self.get().context['next_cursor']
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('business_search'), {'q': 'shop', 'cursor': cursor, 'format': 'json'})
+        self.assertEqual(len(response.json()['results']), 3)
+
+    def test_json_variant(self):
+        data = self.get(format='json').json()
+        self.assertEqual(data['query'], 'shop')
+        self.assertEqual([row['name'] for row in data['results']], ['Shop', 'Shop 0', 'Shop 1'])
+        self.assertIsNotNone(data['next_cursor'])
+
+        last = self.get(format='json', cursor=data['next_cursor']).json()
+        self.assertEqual(last['results'][0]['name'], 'Shop 1')
+
+    def test_invalid_cursor(self):
+        response = self.get(format='json', cursor='not-a-cursor')
+        self.assertEqual(response.status_code, 400)
+
+        response = self.get(cursor='not-a-cursor')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['businesses']), 3)
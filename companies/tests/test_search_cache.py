@@ -0,0 +1,114 @@
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from io import StringIO
+from companies.models import Business, OwnershipClosure, PoliticalData
+from companies.services.search_cache import (
+    cached_search_page, get_cache, reset_search_cache_stats, search_cache_stats
+)
+from companies.tests.helpers import create_business, create_category
+
+
+class SearchCacheTest(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.holding = create_business('Holding', conservative=80, liberal=20)
+        self.brand = create_business('Coffee Brand', parent=self.holding)
+        create_business('Coffee House', conservative=1, liberal=9)
+
+    def search(self, query='coffee', **kwargs):
+        businesses, resolved, next_cursor = cached_search_page(query, **kwargs)
+        return [business.name for business in businesses], resolved
+
+    def test_hit_after_miss(self):
+        names, resolved = self.search()
+        self.assertEqual(search_cache_stats()['misses'], 1)
+
+        with self.assertNumQueries(1):
+            cached_names, cached_resolved = self.search('  COFFEE ')
+        self.assertEqual(cached_names, names)
+        self.assertEqual(cached_resolved, resolved)
+        self.assertEqual(cached_resolved[self.brand.pk], (self.holding.politicaldata, self.holding))
+
+        stats = search_cache_stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+        self.assertEqual(stats['hit_rate'], 0.5)
+
+    def test_include_employees_is_part_of_the_key(self):
+        self.search()
+        self.search(include_employees=True)
+        self.assertEqual(search_cache_stats()['misses'], 2)
+
+    def test_business_change_invalidates(self):
+        self.search()
+        create_business('Coffee Cart')
+        names, _ = self.search()
+        self.assertIn('Coffee Cart', names)
+
+        self.brand.name = 'Tea Brand'
+        self.brand.save()
+        names, _ = self.search()
+        self.assertIn('Tea Brand', names)
+        self.assertEqual(search_cache_stats()['hits'], 0)
+
+    def test_political_data_and_parent_changes_invalidate(self):
+        self.search()
+        PoliticalData.objects.filter(business=self.holding).delete()
+        _, resolved = self.search()
+        self.assertEqual(resolved[self.brand.pk], (None, None))
+
+        self.brand.parent_company = None
+        self.brand.save()
+        self.search()
+        self.assertEqual(search_cache_stats()['hits'], 0)
+
+    def test_offering_changes_invalidate_category_searches(self):
+        beans = create_category('Coffee Beans')
+        self.assertEqual(self.search(category=beans)[0], [])
+
+        self.brand.products.add(beans)
+        self.assertEqual(self.search(category=beans)[0], ['Coffee Brand'])
+        beans.product_providers.remove(self.brand)
+        self.assertEqual(self.search(category=beans)[0], [])
+        self.brand.products.add(beans)
+        self.brand.products.clear()
+        self.assertEqual(self.search(category=beans)[0], [])
+        self.assertEqual(search_cache_stats()['hits'], 0)
+
+    def test_deleted_business_is_not_served(self):
+        self.search()
+        # A raw delete sends no signals, so the cached page is stale
+        house = Business.objects.get(name='Coffee House')
+        for queryset in (
+            OwnershipClosure.objects.filter(descendant=house),
+            PoliticalData.objects.filter(business=house),
+            Business.objects.filter(pk=house.pk),
+        ):
+            queryset._raw_delete('default')
+        names, _ = self.search()
+        self.assertEqual(names, ['Coffee Brand'])
+        self.assertEqual(search_cache_stats()['misses'], 2)
+
+    def test_view_reads_through_cache(self):
+        url = reverse('business_search')
+        first = self.client.get(url, {'q': 'coffee'})
+        second = self.client.get(url, {'q': 'coffee'})
+        self.assertEqual(
+            [result['business'].pk for result in first.context['businesses']],
+            [result['business'].pk for result in second.context['businesses']],
+        )
+        self.assertEqual(
+            second.context['businesses'][0]['inherited_from'], self.holding
+        )
+        self.assertEqual(search_cache_stats()['hits'], 1)
+
+    def test_stats_command(self):
+        self.search()
+        self.search()
+        out = StringIO()
+        call_command('search_cache_stats', '--reset', stdout=out)
+        self.assertIn('hits 1  misses 1  hit rate 50.0%', out.getvalue())
+        self.assertEqual(search_cache_stats()['hits'], 0)
+
+    def tearDown(self):
+        reset_search_cache_stats()
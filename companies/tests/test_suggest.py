@@ -0,0 +1,97 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from companies.services import suggest
+from companies.services.suggest import PrefixIndex, warm_index
+from companies.tests.helpers import create_business
+
+
+class PrefixIndexTest(TestCase):
+    def setUp(self):
+        self.index = PrefixIndex()
+        self.index.build([
+            (1, 'Blue Bottle Coffee', 'blue-bottle-coffee'),
+            (2, 'Bluebird Café', 'bluebird-cafe'),
+            (3, 'Coffee Club', 'coffee-club'),
+            (4, 'Acme', 'acme-holdings'),
+        ], version=1)
+
+    def names(self, prefix, limit=10):
+        return [name for _, name, _ in self.index.suggest(prefix, limit)]
+
+    def test_whole_name_matches_first(self):
+        self.assertEqual(self.names('coff'), ['Coffee Club', 'Blue Bottle Coffee'])
+        self.assertEqual(self.names('BLUE'), ['Blue Bottle Coffee', 'Bluebird Café'])
+
+    def test_accents_and_slug(self):
+        self.assertEqual(self.names('bluebird cafe'), ['Bluebird Café'])
+        self.assertEqual(self.names('acme hold'), ['Acme'])
+
+    def test_limit_and_empty_prefix(self):
+        self.assertEqual(len(self.names('b', limit=1)), 1)
+        self.assertEqual(self.names('   '), [])
+
+    def test_incremental_updates(self):
+        self.index.upsert(3, 'Tea Club', 'tea-club')
+        self.index.upsert(5, 'Coffee Cart', 'coffee-cart')
+        self.index.remove(1)
+        self.assertEqual(self.names('coff'), ['Coffee Cart'])
+        self.assertEqual(self.names('club'), ['Tea Club'])
+        self.assertEqual(len(self.index), 4)
+
+
+@override_settings(BUSINESS_SUGGEST_VERSION_CHECK_INTERVAL=0)
+class BusinessSuggestViewTest(TestCase):
+    def setUp(self):
+        create_business('Blue Bottle Coffee')
+        create_business('Coffee Club')
+        warm_index()
+
+    def get(self, **params):
+        return self.client.get(reverse('business_suggest'), params)
+
+    def test_suggestions_without_queries(self):
+        with self.assertNumQueries(0):
+            response = self.get(q='coffee')
+        self.assertEqual(
+            [result['name'] for result in response.json()['results']],
+            ['Coffee Club', 'Blue Bottle Coffee']
+        )
+        self.assertEqual(response.json()['results'][0]['slug'], 'coffee-club')
+
+    def test_invalid_limit(self):
+        self.assertEqual(self.get(q='coffee', limit='many').status_code, 400)
+        self.assertEqual(self.get(q='coffee', limit='0').status_code, 400)
+        self.assertEqual(len(self.get(q='coffee', limit='1').json()['results']), 1)
+
+    def test_signals_update_index(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            cart = create_business('Coffee Cart')
+        with self.captureOnCommitCallbacks(execute=True):
+            cart.name = 'Tea Cart'
+            cart.save()
+        with self.assertNumQueries(0):
+            names = [result['name'] for result in self.get(q='tea').json()['results']]
+        self.assertEqual(names, ['Tea Cart'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            cart.delete()
+        self.assertEqual(self.get(q='tea').json()['results'], [])
+
+    def test_other_worker_changes_trigger_rebuild(self):
+        create_business('Coffee Cart')
+        # Another worker committed a change: only the shared version moves here
+        suggest.shared_version.bump()
+        names = [result['name'] for result in self.get(q='coffee').json()['results']]
+        self.assertIn('Coffee Cart', names)
+
+    def test_evicted_version_is_not_reused(self):
+        cache = caches[settings.SHARED_VERSION_CACHE_ALIAS]
+        cache.delete(suggest.shared_version.key)
+        suggest.shared_version.bump()
+        stale = warm_index().version
+        # The version key is evicted and set again: an index built before must not pass as current
+        cache.delete(suggest.shared_version.key)
+        suggest.shared_version.bump()
+        self.assertNotEqual(suggest.shared_version.get(), stale)
@@ -7,10 +7,13 @@ urlpatterns = [
     path('api/', include('companies.api.urls')),
     path('business/<slug:slug>/', views.business_detail, name='business_detail'),
     path('edit-requests/', views.edit_requests, name='edit_requests'),
+    path('export/businesses/', views.export_businesses, name='export_businesses'),
     path('filter-categories/', views.filter_categories, name='filter_categories'),
     path('import/', views.import_business, name='import_business'),
     path('review/', views.review_edit_requests, name='review_edit_requests'),
     path('review/<int:edit_request_id>/', views.review_edit_request, name='review_edit_request'),
+    path('review/approve/', views.bulk_approve_edit_requests, name='bulk_approve_edit_requests'),
     path('search/', views.business_search, name='business_search'),
+    path('search/suggest/', views.business_suggest, name='business_suggest'),
     path('update/<int:business_id>/', views.submit_update, name='submit_update'),
 ]
@@ -1,9 +1,11 @@
 from .add_business import add_business
 from .business_detail import business_detail
 from .business_search import business_search
+from .business_suggest import business_suggest
 from .edit_requests import edit_requests
+from .export_businesses import export_businesses
 from .filter_categories import filter_categories
 from .home import home
 from .import_business import import_business
-from .review_edit_requests import review_edit_requests, review_edit_request, is_reviewer
+from .review_edit_requests import review_edit_requests, review_edit_request, bulk_approve_edit_requests, is_reviewer
 from .submit_update import submit_update
\ No newline at end of file
@@ -1,12 +1,44 @@
+from django.contrib import messages
+from django.http import Http404
 from django.shortcuts import get_object_or_404, render
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.views.decorators.http import require_safe
 from companies.models import (
     Business
 )
+from companies.services.business_page import get_max_age, get_shared_max_age, page_etag
+from companies.services.political_data import resolve_political_data
 
 
+@require_safe
 def business_detail(request, slug):
+    # Signed in users see their own navigation and CSRF token, so their copies are per session
+    authenticated = request.user.is_authenticated
+    etag = page_etag(slug, request.session.session_key if authenticated else '')
+    if etag is None:
+        raise Http404('No Business matches the given query.')
+
+    # Flash messages render into this page only: it must not be cached or answered with a 304
+    if len(messages.get_messages(request)):
+        response = _render_business_detail(request, slug)
+        patch_cache_control(response, private=True, no_store=True)
+        return response
+
+    # A current copy costs the one validator query: nothing below runs for a 304
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = _render_business_detail(request, slug)
+    response['ETag'] = etag
+    if authenticated:
+        patch_cache_control(response, private=True, no_cache=True)
+    else:
+        patch_cache_control(response, public=True, max_age=get_max_age(), s_maxage=get_shared_max_age())
+    return response
+
+
+def _render_business_detail(request, slug):
     business = get_object_or_404(
-        Business.objects.prefetch_related(
+        Business.objects.with_ancestors().prefetch_related(
             'services',
             'products',
             'subsidiaries'
@@ -18,7 +50,7 @@ def business_detail(request, slug):
     )
 
     # Get political data (either direct or inherited)
-    political_data, inherited_from = business.get_political_data()
+    political_data, inherited_from = resolve_political_data([business])[business.pk]
 
     # Get a list of approved data sources
     approved_sources = business.data_sources.filter(is_approved=True)
@@ -1,8 +1,22 @@
-from django.db.models import Case, IntegerField, Q, Value, When
+from django.contrib import messages
+from django.http import JsonResponse
 from django.shortcuts import render
-from companies.models import (
-    Business
-)
+from companies.api.serializers import BusinessSerializer
+from companies.services.category_tree import CATEGORY_MODELS
+from companies.services.search_cache import cached_search_page
+
+def _category_filter(request):
+    """The category whose subtree the search is limited to, if ?category=<slug>&category_type= is given"""
+    slug = request.GET.get('category', '').strip()
+    if not slug:
+        return None
+    model = CATEGORY_MODELS.get(request.GET.get('category_type'))
+    if model is None:
+        raise ValueError('Invalid category type')
+    category = model.objects.filter(slug=slug).first()
+    if category is None:
+        raise ValueError(f'Unknown category: {slug}')
+    return category
 
 def business_search(request):
     query = request.GET.get('q', '').strip()
@@ -14,48 +28,54 @@ def business_search(request):
         # Only set default false if parameter isn't present
         include_employee_data = False
     
-    businesses = Business.objects.none()
+    as_json = request.GET.get('format') == 'json'
+    cursor = request.GET.get('cursor')
+    businesses = []
+    businesses_with_data = []
+    resolved = {}
+    next_cursor = None
+
+    try:
+        category = _category_filter(request)
+    except ValueError as e:
+        if as_json:
+            return JsonResponse({'error': str(e)}, status=400)
+        messages.error(request, str(e))
+        category = None
     
     if query:
-        # Create a query that checks for exact matches and partial matches
-        # Use Case/When to assign priority values
-        businesses = Business.objects.annotate(
-            search_priority=Case(
-                # Priority 1: Exact name match (case-insensitive)
-                When(name__iexact=query, then=Value(3)),
-                # Priority 2: Name contains the query
-                When(name__icontains=query, then=Value(2)),
-                # Priority 3: Description contains the query
-                When(description__icontains=query, then=Value(1)),
-                default=Value(0),
-                output_field=IntegerField(),
-            )
-        ).filter(
-            # Combine conditions with OR
-            Q(name__icontains=query) |
-            Q(description__icontains=query)
-        ).select_related(
-            'parent_company',
-            'politicaldata'
-        ).order_by(
-            '-search_priority',  # Sort by priority (highest first)
-            'name'              # Then alphabetically by name
-        )
+        # One page ranked exact name > name contains > other matches, with the political
+        # data each result shows (own or inherited), read through the search cache
+        try:
+            businesses, resolved, next_cursor = cached_search_page(query, include_employee_data, cursor, category)
+        except ValueError as e:
+            if as_json:
+                return JsonResponse({'error': str(e)}, status=400)
+            messages.error(request, str(e))
+            businesses, resolved, next_cursor = cached_search_page(query, include_employee_data, category=category)
 
-        # Get political data for each business
-        businesses_with_data = []
         for business in businesses:
-            political_data, inherited_from = business.get_political_data()
+            political_data, inherited_from = resolved[business.pk]
             businesses_with_data.append({
                 'business': business,
                 'political_data': political_data,
                 'inherited_from': inherited_from
             })
-    else:
-        businesses_with_data = []
+
+    if as_json:
+        return JsonResponse({
+            'query': query,
+            'results': BusinessSerializer(
+                businesses, many=True, context={'political_data': resolved}
+            ).data,
+            'next_cursor': next_cursor,
+        })
     
     return render(request, 'companies/business_search.html', {
         'query': query,
         'businesses': businesses_with_data,
         'include_employee_data': include_employee_data,
+        'next_cursor': next_cursor,
+        'category': category,
+        'category_type': request.GET.get('category_type') if category else None,
     })
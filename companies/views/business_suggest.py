@@ -0,0 +1,23 @@
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+from companies.services.suggest import get_limit, suggest_businesses
+
+MAX_SUGGESTIONS = 25
+
+@require_GET
+def business_suggest(request):
+    query = request.GET.get('q', '').strip()
+
+    try:
+        limit = min(int(request.GET.get('limit', get_limit())), MAX_SUGGESTIONS)
+    except ValueError:
+        return JsonResponse({'error': 'Invalid limit'}, status=400)
+    if limit < 1:
+        return JsonResponse({'error': 'Invalid limit'}, status=400)
+
+    # Served from the in-process prefix index, without touching the database
+    results = [
+        {'id': business_id, 'name': name, 'slug': slug}
+        for business_id, name, slug in suggest_businesses(query, limit)
+    ]
+    return JsonResponse({'results': results})
@@ -0,0 +1,27 @@
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.views.decorators.http import require_GET
+from companies.services.export import EXPORT_FORMATS, export_lines, parse_since
+
+CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+@login_required
+@require_GET
+def export_businesses(request):
+    export_format = request.GET.get('format', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        return JsonResponse({'error': 'Invalid export format'}, status=400)
+    try:
+        since = parse_since(request.GET['since']) if request.GET.get('since') else None
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    # Rows are read from a server-side cursor while the response is being sent
+    response = StreamingHttpResponse(export_lines(export_format, since), content_type=CONTENT_TYPES[export_format])
+    filename = f'businesses-{timezone.now():%Y%m%dT%H%M%S}.{export_format}'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -3,9 +3,11 @@ from django.contrib.auth.decorators import permission_required
 from django.db import transaction
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
+from django.views.decorators.http import require_POST
 from companies.models import (
     EditRequest
 )
+from companies.services.edit_requests import approve_edit_requests, review_page, review_queue, status_counts
 
 
 def is_reviewer(user):
@@ -20,61 +22,25 @@ def review_edit_request(request, edit_request_id):
 
     if request.method == 'POST':
         action = request.POST.get('action')
-        if action in ['approve', 'reject']:
+        if action == 'approve':
+            report = approve_edit_requests(
+                [edit_request.pk], request.user, request.POST.get('review_notes', '')
+            )
+            if report.approved:
+                messages.success(request, 'Edit request approved successfully.')
+            else:
+                for _, reason in report.skipped + report.conflicts:
+                    messages.warning(request, f'Edit request not approved: {reason}.')
+            return redirect('review_edit_requests')
+        if action == 'reject':
             with transaction.atomic():
-                edit_request.status = 'approved' if action == 'approve' else 'rejected'
+                edit_request.status = 'rejected'
                 edit_request.reviewed_by = request.user
                 edit_request.reviewed_at = timezone.now()
                 edit_request.review_notes = request.POST.get('review_notes', '')
                 edit_request.save()
-                
-                if action == 'approve':
-                    # Apply the changes to the business
-                    business = edit_request.business
-                    
-                    # Update basic info
-                    if edit_request.name:
-                        business.name = edit_request.name
-                    if edit_request.description:
-                        business.description = edit_request.description
-                    
-                    # Update service/product flags
-                    if edit_request.provides_services is not None:
-                        business.provides_services = edit_request.provides_services
-                    if edit_request.provides_products is not None:
-                        business.provides_products = edit_request.provides_products
-                    
-                    business.save()
-                    
-                    # Update political data
-                    political_data = business.politicaldata
-                    for field in ['conservative_percentage', 'conservative_total_donations',
-                                'liberal_percentage', 'liberal_total_donations',
-                                'trump_donor', 'america_pac_donor', 'save_america_pac_donor',
-                                'data_source']:
-                        value = getattr(edit_request, field)
-                        if value is not None:
-                            setattr(political_data, field, value)
-                    political_data.save()
-
-                    # approve the data source
-                    edit_request.data_sources.all().update(is_approved=True)
-                    
-                    # Update services
-                    if edit_request.services_to_add.exists():
-                        business.services.add(*edit_request.services_to_add.all())
-                    if edit_request.services_to_remove.exists():
-                        business.services.remove(*edit_request.services_to_remove.all())
-                    
-                    # Update products
-                    if edit_request.products_to_add.exists():
-                        business.products.add(*edit_request.products_to_add.all())
-                    if edit_request.products_to_remove.exists():
-                        business.products.remove(*edit_request.products_to_remove.all())
-                
-                messages.success(request, f'Edit request {action}d successfully.')
-                return redirect('review_edit_requests')
-        pass
+            messages.success(request, 'Edit request rejected successfully.')
+            return redirect('review_edit_requests')
 
     # Prepare changes display
     changes = {}
@@ -199,18 +165,39 @@ def review_edit_request(request, edit_request_id):
 def review_edit_requests(request):
     # Get filters
     status = request.GET.get('status', 'pending')
-    business_filter = request.GET.get('business', '')
+    business_filter = request.GET.get('business', '').strip()
+    cursor = request.GET.get('cursor')
     
-    # Build queryset
-    edit_requests = EditRequest.objects.select_related('business', 'submitted_by').order_by('-created_at')
-    
-    if status:
-        edit_requests = edit_requests.filter(status=status)
-    if business_filter:
-        edit_requests = edit_requests.filter(business__name__icontains=business_filter)
+    # One keyset page, newest first, read through the (status, created_at) index
+    edit_requests = review_queue(status, business_filter)
+    try:
+        page, next_cursor = review_page(edit_requests, cursor)
+    except ValueError as e:
+        messages.error(request, str(e))
+        page, next_cursor = review_page(edit_requests)
     
     return render(request, 'companies/review_edit_requests.html', {
-        'edit_requests': edit_requests,
+        'edit_requests': page,
         'status': status,
         'business_filter': business_filter,
+        'status_counts': status_counts(),
+        'next_cursor': next_cursor,
+        'is_first_page': not cursor,
     })
+
+@require_POST
+@permission_required('companies.can_review_edits', raise_exception=True)
+def bulk_approve_edit_requests(request):
+    """Approve every selected edit request in one transaction"""
+    edit_request_ids = [value for value in request.POST.getlist('edit_request_ids') if value.isdigit()]
+    if not edit_request_ids:
+        messages.error(request, 'Select at least one edit request to approve.')
+        return redirect('review_edit_requests')
+
+    report = approve_edit_requests(edit_request_ids, request.user, request.POST.get('review_notes', ''))
+    messages.success(request, f'Edit requests: {report}.')
+    for edit_request, reason in report.conflicts:
+        messages.warning(request, f'Edit request #{edit_request.pk} for {edit_request.business.name} left pending: {reason}.')
+    for edit_request, reason in report.skipped:
+        messages.warning(request, f'Edit request #{edit_request.pk} for {edit_request.business.name} skipped: {reason}.')
+    return redirect('review_edit_requests')
@@ -25,6 +25,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'django.contrib.humanize',
+    'django.contrib.postgres',
     
     # Third party apps
     'rest_framework',
@@ -32,6 +33,7 @@ INSTALLED_APPS = [
     
     # Local apps
     'companies.apps.CompaniesConfig',
+    'jobs.apps.JobsConfig',
     'online_security.apps.OnlineSecurityConfig',
     'pack_planner.apps.PackPlannerConfig',
     'relocation_planner.apps.RelocationPlannerConfig',
@@ -107,4 +109,93 @@ STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 
+# Files uploaded for background jobs wait here for the job to run (jobs.models.Job.upload). It must survive
+# redeploys, e.g. a mounted volume (check jobs.W001); with jobs run outside the web service, point
+# STORAGES['default'] at storage both services share
+MEDIA_ROOT = config('MEDIA_ROOT', default=str(BASE_DIR / 'media'))
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Business search result pages (companies.services.search_cache)
+    'search': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'business-search',
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
+    # Versions of the snapshots every process keeps in memory (config.shared_version)
+    'versions': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'shared-versions',
+    },
+}
+SHARED_VERSION_CACHE_ALIAS = 'versions'
+
+# Number of precomputed alternatives stored per business (companies.services.alternatives)
+ALTERNATIVES_INDEX_SIZE = 10
+
+# Where alternatives are scored: 'sql' (in the database) or 'python' (legacy, for comparison)
+ALTERNATIVES_SCORING_ENGINE = 'sql'
+
+# Business search backend: 'postgres' (full-text and trigram indexes) or 'legacy' (icontains scan)
+BUSINESS_SEARCH_BACKEND = 'postgres'
+
+# Businesses per page of search results (keyset paginated, see companies.services.search)
+BUSINESS_SEARCH_PAGE_SIZE = 25
+
+# Seconds a cached page of search results is kept (invalidated early on any data change)
+BUSINESS_SEARCH_CACHE_TIMEOUT = 300
+
+# Default number of names returned by /search/suggest/ (companies.services.suggest)
+BUSINESS_SUGGEST_LIMIT = 10
+
+# Seconds between checks for business changes made by other workers (companies.services.suggest)
+BUSINESS_SUGGEST_VERSION_CHECK_INTERVAL = 5
+
+# Seconds between checks for category changes made by other workers (companies.services.category_tree)
+CATEGORY_TREE_VERSION_CHECK_INTERVAL = 5
+
+# Edit requests per page of the review queue, and how long its per-status counts are cached (companies.services.edit_requests)
+EDIT_REQUEST_REVIEW_PAGE_SIZE = 50
+EDIT_REQUEST_STATUS_COUNTS_TIMEOUT = 300
+
+# Default page size of the read-only business API at /api/businesses/ (companies.api.views)
+BUSINESS_API_PAGE_SIZE = 100
+
+# Seconds browsers and shared caches (CDN, reverse proxy) may serve an anonymous business page (companies.services.business_page)
+BUSINESS_DETAIL_MAX_AGE = 60
+BUSINESS_DETAIL_SHARED_MAX_AGE = 300
+
+# Seconds between checks for pack catalog changes made by other workers (pack_planner.services.catalog)
+PACK_CATALOG_VERSION_CHECK_INTERVAL = 5
+
+# Background jobs (jobs app), run by `manage.py run_worker` or inside the web processes
+# Run jobs in every gunicorn worker process of the web service (gunicorn.conf.py)
+JOB_RUN_IN_WEB = config('JOB_RUN_IN_WEB', default=True, cast=bool)
+
+# Jobs running at once across all workers
+JOB_MAX_RUNNING = 4
+
+# Jobs each run_worker process, or each web process, runs at once
+JOB_WORKER_CONCURRENCY = 2
+
+# Seconds an idle worker waits before polling for jobs again
+JOB_POLL_INTERVAL = 2
+
+# Seconds before the first automatic retry of a failed job; doubles with each attempt
+JOB_RETRY_DELAY = 30
+
+# Days a failed or cancelled job keeps its upload for a retry (`manage.py purge_job_uploads`)
+JOB_UPLOAD_RETENTION_DAYS = 7
+
+# Seconds between the heartbeats a worker sends for each job it is running
+JOB_HEARTBEAT_INTERVAL = 60
+
+# Seconds without a heartbeat after which a running job's worker is presumed dead
+JOB_STALE_AFTER = 600
+
+# Characters one record of a streamed JSON upload may take, and so the most of the file held in memory (jobs.json_stream)
+JSON_UPLOAD_MAX_RECORD_SIZE = 1024 * 1024
@@ -78,6 +78,19 @@ DATABASES = {
     }
 }
 
+# Search results are shared by every worker; the table is created by `manage.py createcachetable`
+CACHES['search'] = {
+    'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+    'LOCATION': 'business_search_cache',
+    'OPTIONS': {'MAX_ENTRIES': 50000},
+}
+
+# Snapshot versions must be seen by every worker, and never culled with search results
+CACHES['versions'] = {
+    'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+    'LOCATION': 'shared_versions_cache',
+}
+
 # Security settings
 SECURE_SSL_REDIRECT = True
 SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
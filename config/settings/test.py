@@ -1,3 +1,4 @@
+import tempfile
 from .base import *
 
 DEBUG = False
@@ -14,6 +15,7 @@ DATABASES = {
 }
 
 # Test specific settings
+MEDIA_ROOT = tempfile.mkdtemp(prefix='bluelist-media-')
 EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
 PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
 
@@ -0,0 +1,54 @@
+"""
+Version numbers of data that every process keeps a snapshot of in memory.
+
+A process builds its snapshot (the pack catalog, the category forests, the
+business suggestion index) from the database together with the current
+shared version, and rebuilds it once the version has moved: whoever changes
+the data bumps the version once the change commits. The versions live in the
+SHARED_VERSION_CACHE_ALIAS cache, which every process must share and which
+holds nothing else, so they are not culled with other entries.
+"""
+import time
+from django.conf import settings
+from django.core.cache import caches
+
+
+def _cache():
+    return caches[getattr(settings, 'SHARED_VERSION_CACHE_ALIAS', 'versions')]
+
+
+class SharedVersion:
+    def __init__(self, key, interval_setting, default_interval=5):
+        self.key = key
+        self.interval_setting = interval_setting
+        self.default_interval = default_interval
+
+    def check_interval(self):
+        """Seconds between checks of the shared version, so most lookups make no cache round trip"""
+        return getattr(settings, self.interval_setting, self.default_interval)
+
+    def get(self):
+        return _cache().get(self.key, 0)
+
+    def bump(self):
+        """Move the version on, so every snapshot built before is out of date; returns the new version"""
+        cache = _cache()
+        try:
+            return cache.incr(self.key)
+        except ValueError:
+            # Evicted or never set: start from a number no earlier snapshot can have
+            cache.add(self.key, time.time_ns(), timeout=None)
+            return cache.get(self.key)
+
+    def is_current(self, snapshot):
+        """
+        Whether ``snapshot``, which has the ``version`` it was built from and the
+        monotonic time it was ``checked_at``, may still be used
+        """
+        now = time.monotonic()
+        if now - snapshot.checked_at < self.check_interval():
+            return True
+        if snapshot.version != self.get():
+            return False
+        snapshot.checked_at = now
+        return True
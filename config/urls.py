@@ -6,6 +6,7 @@ urlpatterns = [
     path('', include('companies.urls')),
     path('admin/', admin.site.urls),
     path('auth/', include('users.urls', namespace='users')),
+    path('jobs/', include('jobs.urls')),
     path('login/', auth_views.LoginView.as_view(template_name='companies/login.html'), name='login'),
     path('logout/', auth_views.LogoutView.as_view(next_page='/'), name='logout'),
     path('packplanner/', include('pack_planner.urls')),
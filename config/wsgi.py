@@ -7,6 +7,7 @@ For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/wsgi/
 """
 
+import logging
 import os
 
 from django.core.wsgi import get_wsgi_application
@@ -14,3 +15,12 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.local')
 
 application = get_wsgi_application()
+
+# Build the autocomplete index before the worker takes its first request
+from companies.services.suggest import warm_index  # noqa: E402
+
+try:
+    warm_index()
+except Exception:
+    # The index is built lazily on the first suggestion instead
+    logging.getLogger(__name__).exception('Could not warm the business suggestion index')
@@ -0,0 +1,27 @@
+"""
+Gunicorn settings, read from the working directory by the web service's
+`gunicorn config.wsgi:application`.
+
+Background jobs (imports, data uploads) run in the web service: with
+JOB_RUN_IN_WEB on, every gunicorn worker process runs a jobs.worker.WorkerPool
+of JOB_WORKER_CONCURRENCY threads next to the requests it serves.
+JOB_MAX_RUNNING still caps the jobs running across all of them. Turn
+JOB_RUN_IN_WEB off when jobs run in a separate `manage.py run_worker` service.
+"""
+
+
+def post_worker_init(worker):
+    # Django is set up once the worker has loaded the application
+    from django.conf import settings
+    from jobs.worker import WorkerPool
+
+    if getattr(settings, 'JOB_RUN_IN_WEB', True):
+        worker.job_pool = WorkerPool().start()
+        worker.log.info(f'Running background jobs in worker {worker.pid}')
+
+
+def worker_exit(server, worker):
+    # Claim nothing more; a job cut off by the exit is requeued once its heartbeats stop
+    pool = getattr(worker, 'job_pool', None)
+    if pool is not None:
+        pool.stop()
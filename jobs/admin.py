@@ -0,0 +1,28 @@
+from django.contrib import admin, messages
+from jobs.models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'task', 'description', 'status', 'attempts', 'processed', 'total', 'created_by', 'created_at', 'finished_at')
+    list_filter = ('status', 'task')
+    search_fields = ('description', 'upload_name', 'last_error')
+    readonly_fields = (
+        'task', 'payload', 'upload_name', 'created_by', 'status', 'attempts', 'worker', 'processed', 'total',
+        'errors', 'result', 'last_error', 'created_at', 'started_at', 'heartbeat_at', 'finished_at',
+    )
+    actions = ['cancel_jobs', 'retry_jobs']
+
+    def cancel_jobs(self, request, queryset):
+        jobs = [job for job in queryset if not job.is_finished]
+        for job in jobs:
+            job.cancel()
+        self.message_user(request, f'Cancelled or asked to stop {len(jobs)} jobs.', messages.SUCCESS)
+    cancel_jobs.short_description = 'Cancel selected jobs'
+
+    def retry_jobs(self, request, queryset):
+        jobs = queryset.filter(status__in=['failed', 'cancelled'])
+        for job in jobs:
+            job.retry()
+        self.message_user(request, f'Queued {len(jobs)} jobs again.', messages.SUCCESS)
+    retry_jobs.short_description = 'Retry selected failed or cancelled jobs'
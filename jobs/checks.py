@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+from django.core.files.storage import default_storage
+from django.core.files.storage.filesystem import FileSystemStorage
+
+
+@register()
+def check_upload_storage(app_configs, **kwargs):
+    """Uploads wait for their job in storage that must outlive a redeploy of the web service"""
+    if settings.DEBUG or not isinstance(default_storage, FileSystemStorage):
+        return []
+    if not str(settings.MEDIA_ROOT).startswith(str(settings.BASE_DIR)):
+        return []
+    return [Warning(
+        'Uploads for background jobs are stored in MEDIA_ROOT inside the application directory, '
+        'which is lost when the service is redeployed, failing the jobs still waiting for them.',
+        hint='Set MEDIA_ROOT to a persistent volume (on Railway, the volume mount path), '
+             'or point STORAGES["default"] at object storage.',
+        id='jobs.W001',
+    )]
@@ -0,0 +1,180 @@
+"""
+Incremental reader for large JSON uploads.
+
+The upload formats are one top-level object whose keys hold arrays of
+records, e.g. ``{"categories": [...], "items": [...], "products": [...]}``.
+``read_records`` walks that outer object and array structure itself and
+decodes one record at a time with the standard library's C decoder, so an
+upload is never held in memory as one parsed document: only a window of
+the file holding the current record is buffered. The window may not grow
+past ``JSON_UPLOAD_MAX_RECORD_SIZE`` characters, which puts a hard ceiling
+on the memory a single record can take.
+
+Each record comes out as a ``Record(section, index, value, line, column)``
+event, ``index`` being its position in the section's array (None for a
+top-level value that is not an array). Malformed JSON raises JSONStreamError,
+carrying the line, column and character offset of the error like
+json.JSONDecodeError, once the records before it have been read.
+"""
+import codecs
+import json
+import re
+from collections import namedtuple
+from django.conf import settings
+
+CHUNK_SIZE = 64 * 1024
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+# Longer than any literal, number fragment or escape a chunk boundary can cut
+TOKEN_LOOKAHEAD = 16
+
+Record = namedtuple('Record', ['section', 'index', 'value', 'line', 'column'], defaults=[None, None])
+
+
+def get_max_record_size():
+    """Characters a single record may take, and so the most the reader buffers"""
+    return getattr(settings, 'JSON_UPLOAD_MAX_RECORD_SIZE', 1024 * 1024)
+
+
+class JSONStreamError(ValueError):
+    def __init__(self, msg, lineno, colno, pos):
+        super().__init__(f'{msg}: line {lineno} column {colno} (char {pos})')
+        self.msg = msg
+        self.lineno = lineno
+        self.colno = colno
+        self.pos = pos
+
+
+class JSONStreamReader:
+    def __init__(self, file, max_record_size=None, chunk_size=CHUNK_SIZE):
+        self.file = file
+        self.max_record_size = max_record_size or get_max_record_size()
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.text_decoder = codecs.getincrementaldecoder('utf-8-sig')()
+        self.eof = False
+        self.buffer = ''
+        self.pos = 0
+        # Characters dropped from the front of the buffer, and the line count up to `scanned`
+        self.offset = 0
+        self.scanned = 0
+        self.line = 1
+        self.line_start = 0
+
+    def __iter__(self):
+        if self._peek() != '{':
+            raise self._error('Expecting object', self.pos)
+        self.pos += 1
+        if self._peek() == '}':
+            self.pos += 1
+        else:
+            while True:
+                if self._peek() != '"':
+                    raise self._error('Expecting property name enclosed in double quotes', self.pos)
+                section = self._value()
+                if self._peek() != ':':
+                    raise self._error("Expecting ':' delimiter", self.pos)
+                self.pos += 1
+                if self._peek() == '[':
+                    self.pos += 1
+                    yield from self._array(section)
+                else:
+                    line, column = self._location(self.pos)
+                    yield Record(section, None, self._value(), line, column)
+                if not self._delimiter('}'):
+                    break
+        if self._peek():
+            raise self._error('Extra data', self.pos)
+
+    def _array(self, section):
+        if self._peek() == ']':
+            self.pos += 1
+            return
+        index = 0
+        while True:
+            self._peek()
+            line, column = self._location(self.pos)
+            yield Record(section, index, self._value(), line, column)
+            index += 1
+            if not self._delimiter(']'):
+                return
+
+    def _delimiter(self, closing):
+        """Consume ',' (True: more to come) or ``closing`` (False)"""
+        char = self._peek()
+        if char == ',':
+            self.pos += 1
+            return True
+        if char == closing:
+            self.pos += 1
+            return False
+        raise self._error("Expecting ',' delimiter", self.pos)
+
+    def _peek(self):
+        """The next character that is not whitespace, '' at the end of the file"""
+        while True:
+            self.pos = WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer) or not self._fill():
+                return self.buffer[self.pos:self.pos + 1]
+
+    def _value(self):
+        """Decode the JSON value at ``pos``, reading more of the file until it is complete"""
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                # A value cut off by the end of the buffer fails within a token's length of it, or on
+                # its unterminated last string; anything failing further back is malformed
+                truncated = e.msg.startswith('Unterminated string') or len(self.buffer) - e.pos <= TOKEN_LOOKAHEAD
+                if self.eof or not truncated:
+                    raise self._error(e.msg, e.pos)
+            else:
+                # A number or literal running to the end of the buffer may continue in the next chunk
+                if end < len(self.buffer) or self.eof:
+                    if end - self.pos > self.max_record_size:
+                        raise self._error(f'Record larger than {self.max_record_size} characters', self.pos)
+                    self.pos = end
+                    return value
+            if len(self.buffer) - self.pos > self.max_record_size:
+                raise self._error(f'Record larger than {self.max_record_size} characters', self.pos)
+            self._fill()
+
+    def _fill(self):
+        """Drop what has been consumed and read the next chunk; False at the end of the file"""
+        if self.eof:
+            return False
+        self._location(self.pos)
+        self.offset += self.pos
+        self.scanned -= self.pos
+        self.buffer = self.buffer[self.pos:]
+        self.pos = 0
+
+        text = ''
+        while not text and not self.eof:
+            # A chunk may end inside a multi-byte character and decode to nothing
+            chunk = self.file.read(self.chunk_size)
+            try:
+                text = self.text_decoder.decode(chunk, final=not chunk)
+            except UnicodeDecodeError as e:
+                decoded = e.object[:e.start].decode('utf-8', 'replace')
+                raise self._error('File is not UTF-8 text', len(self.buffer) + len(decoded))
+            self.eof = not chunk
+        self.buffer += text
+        return True
+
+    def _location(self, pos):
+        """(line, column) of ``pos`` in the buffer, counting lines incrementally"""
+        newlines = self.buffer.count('\n', self.scanned, pos)
+        if newlines:
+            self.line += newlines
+            self.line_start = self.offset + self.buffer.rfind('\n', self.scanned, pos) + 1
+        self.scanned = pos
+        return self.line, self.offset + pos - self.line_start + 1
+
+    def _error(self, message, pos):
+        line, column = self._location(pos)
+        return JSONStreamError(message, line, column, self.offset + pos)
+
+
+def read_records(file, max_record_size=None):
+    """Record events of a JSON upload read from the binary ``file``, one record in memory at a time"""
+    return iter(JSONStreamReader(file, max_record_size))
@@ -0,0 +1,26 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from jobs.models import Job
+
+class Command(BaseCommand):
+    help = 'Remove the uploaded files of jobs that failed or were cancelled longer ago than JOB_UPLOAD_RETENTION_DAYS'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=getattr(settings, 'JOB_UPLOAD_RETENTION_DAYS', 7),
+            help='Days a failed or cancelled job keeps its upload for a retry',
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        jobs = Job.objects.filter(status__in=Job.FINISHED_STATUSES, finished_at__lt=cutoff).exclude(upload='')
+        purged = 0
+        for job in jobs.iterator():
+            job.delete_upload()
+            job.save(update_fields=['upload'])
+            purged += 1
+        self.stdout.write(self.style.SUCCESS(f'Removed the uploads of {purged} finished jobs'))
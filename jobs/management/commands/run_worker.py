@@ -0,0 +1,43 @@
+import signal
+import threading
+from django.core.management.base import BaseCommand
+from jobs.worker import WorkerPool, get_concurrency, get_poll_interval
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs (imports, data population) until stopped'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=get_concurrency(),
+            help='Number of jobs this worker runs at once',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=get_poll_interval(),
+            help='Seconds to wait before polling again when no job can start',
+        )
+        parser.add_argument(
+            '--burst',
+            action='store_true',
+            help='Exit once no queued job can start instead of waiting for more',
+        )
+
+    def handle(self, *args, **options):
+        self.lock = threading.Lock()
+        self.completed = 0
+        pool = WorkerPool(options['concurrency'], options['poll_interval'], options['burst'], on_job=self.finished)
+        # Let running jobs finish on SIGTERM/SIGINT, then exit
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda *args: pool.stop())
+
+        self.stdout.write(f"Worker started with {options['concurrency']} threads")
+        pool.start().join()
+        self.stdout.write(self.style.SUCCESS(f'Worker stopped after {self.completed} jobs'))
+
+    def finished(self, job):
+        with self.lock:
+            self.completed += 1
+        self.stdout.write(f'Job {job.pk} ({job.task}): {job.status}')
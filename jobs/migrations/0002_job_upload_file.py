@@ -0,0 +1,38 @@
+# Generated by Django 5.1.3 on 2026-10-18 20:16
+
+from django.core.files.base import ContentFile
+from django.db import migrations, models
+
+
+def move_uploads_to_storage(apps, schema_editor):
+    # Jobs that may still run need their upload; finished ones keep only its name
+    Job = apps.get_model('jobs', 'Job')
+    pending = Job.objects.exclude(status__in=['succeeded', 'failed', 'cancelled']).filter(upload_data__isnull=False)
+    for job in pending.iterator(chunk_size=1):
+        job.upload.save(job.upload_name or f'job-{job.pk}', ContentFile(bytes(job.upload_data)), save=False)
+        job.save(update_fields=['upload'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='job',
+            old_name='upload',
+            new_name='upload_data',
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='upload',
+            field=models.FileField(blank=True, editable=False, upload_to='jobs/uploads/%Y/%m/'),
+        ),
+        migrations.RunPython(move_uploads_to_storage, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='job',
+            name='upload_data',
+        ),
+    ]
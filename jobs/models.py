@@ -0,0 +1,154 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection, models
+from django.utils import timezone
+
+# Errors kept per job; the rest are only counted by the task
+MAX_ERRORS = 100
+
+
+class JobCancelled(Exception):
+    """Raised inside a running task once cancellation has been requested"""
+
+
+class JobFailed(Exception):
+    """Raised by a task for errors that another attempt would not fix, such as invalid input"""
+
+
+def outside_transaction(func, *args, **kwargs):
+    """
+    Call ``func`` on a database connection of its own, committed at once. A
+    task reporting progress from inside a long transaction does so through this:
+    written on the task's connection, the job row would stay locked until the
+    transaction ends, blocking cancellation and heartbeats and hiding progress.
+    """
+    def call():
+        try:
+            return func(*args, **kwargs)
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(call).result()
+
+
+class Job(models.Model):
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+        ('cancelled', 'Cancelled'),
+    ]
+    FINISHED_STATUSES = ('succeeded', 'failed', 'cancelled')
+
+    task = models.CharField(max_length=100)
+    description = models.CharField(max_length=200, blank=True)
+    payload = models.JSONField(default=dict, blank=True)
+    # Uploaded file the task works on, written to storage in chunks and streamed back by the task
+    upload = models.FileField(upload_to='jobs/uploads/%Y/%m/', blank=True, editable=False)
+    upload_name = models.CharField(max_length=255, blank=True)
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    cancel_requested = models.BooleanField(default=False)
+    worker = models.CharField(max_length=100, blank=True)
+
+    # Progress, written by the task while it runs
+    processed = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(null=True, blank=True)
+    errors = models.JSONField(default=list, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            # The worker's claim query: oldest runnable job first
+            models.Index(fields=['status', 'run_after'], name='job_claim_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.description or self.task} ({self.get_status_display()})'
+
+    @property
+    def is_finished(self):
+        return self.status in self.FINISHED_STATUSES
+
+    @property
+    def percent_complete(self):
+        if self.status == 'succeeded':
+            return 100
+        if not self.total:
+            return None
+        return min(100, round(self.processed * 100 / self.total))
+
+    def progress(self, processed, total=None, errors=None):
+        """
+        Record progress from inside a task and raise JobCancelled if the job
+        has been cancelled. Progress written inside a transaction shows up on
+        the status page once it commits.
+        """
+        self.processed = processed
+        if total is not None:
+            self.total = total
+        if errors:
+            self.errors = (self.errors + list(errors))[:MAX_ERRORS]
+        self.heartbeat_at = timezone.now()
+        updated = Job.objects.filter(pk=self.pk, cancel_requested=False).update(
+            processed=self.processed, total=self.total, errors=self.errors, heartbeat_at=self.heartbeat_at
+        )
+        if not updated:
+            raise JobCancelled()
+
+    def open_upload(self):
+        """The uploaded file, opened for reading; JobFailed if it has been removed"""
+        if not self.upload:
+            raise JobFailed('The uploaded file is no longer available, please upload it again')
+        try:
+            return self.upload.open('rb')
+        except FileNotFoundError:
+            raise JobFailed('The uploaded file is no longer available, please upload it again')
+
+    def delete_upload(self):
+        """Remove the uploaded file from storage; the caller saves the cleared field"""
+        if self.upload:
+            self.upload.delete(save=False)
+
+    def cancel(self):
+        """Cancel a queued job now, or ask a running one to stop at its next progress report"""
+        if self.status == 'queued':
+            Job.objects.filter(pk=self.pk, status='queued').update(
+                status='cancelled', cancel_requested=True, finished_at=timezone.now()
+            )
+        elif self.status == 'running':
+            Job.objects.filter(pk=self.pk).update(cancel_requested=True)
+        self.refresh_from_db()
+
+    def retry(self):
+        """Queue a failed or cancelled job again with a fresh set of attempts"""
+        if self.status not in ('failed', 'cancelled'):
+            raise ValueError(f'Only failed or cancelled jobs can be retried, this one is {self.status}')
+        self.status = 'queued'
+        self.attempts = 0
+        self.cancel_requested = False
+        self.run_after = timezone.now()
+        self.processed = 0
+        self.total = None
+        self.errors = []
+        self.last_error = ''
+        self.finished_at = None
+        self.save()
+
+    def retry_delay(self):
+        """Backoff before the next automatic attempt, doubling with each failure"""
+        return timedelta(seconds=getattr(settings, 'JOB_RETRY_DELAY', 30) * 2 ** max(self.attempts - 1, 0))
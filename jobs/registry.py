@@ -0,0 +1,50 @@
+"""
+Registry of background tasks.
+
+Apps declare tasks in their ``tasks.py`` with the ``task`` decorator; the jobs
+app imports those modules at startup. A task is called as ``func(job,
+**job.payload)`` by a worker, reports progress through ``job.progress()`` and
+returns a JSON-serializable result.
+"""
+from collections import namedtuple
+from jobs.models import Job
+
+Task = namedtuple('Task', ['name', 'func', 'max_attempts', 'concurrency'])
+
+_tasks = {}
+
+
+def task(name, max_attempts=3, concurrency=None):
+    """
+    Register a function as a background task. ``concurrency`` caps how many
+    jobs of this task run at once across all workers.
+    """
+    def decorator(func):
+        _tasks[name] = Task(name, func, max_attempts, concurrency)
+        return func
+    return decorator
+
+
+def get_task(name):
+    try:
+        return _tasks[name]
+    except KeyError:
+        raise LookupError(f'Unknown background task: {name}')
+
+
+def enqueue(name, payload=None, upload=None, user=None, description=''):
+    """
+    Queue a job for a registered task and return it; workers pick it up once
+    committed. ``upload``, a File such as an UploadedFile, is copied to storage
+    a chunk at a time for the task to read from ``job.open_upload()``.
+    """
+    registered = get_task(name)
+    return Job.objects.create(
+        task=name,
+        description=description[:200],
+        payload=payload or {},
+        upload=upload,
+        upload_name=upload.name[:255] if upload else '',
+        created_by=user if user is not None and user.is_authenticated else None,
+        max_attempts=registered.max_attempts,
+    )
@@ -0,0 +1,291 @@
+import io
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from jobs.checks import check_upload_storage
+from jobs.models import Job, JobCancelled, JobFailed, outside_transaction
+from jobs.registry import enqueue, task
+from jobs.worker import WorkerPool, claim_job, run_job, run_pending
+
+calls = []
+
+
+@task('tests.count', max_attempts=2)
+def count(job, rows=3):
+    for row in range(1, rows + 1):
+        job.progress(row, rows, errors=[f'row {row} skipped'] if row == 2 else None)
+    return {'message': f'{rows} rows'}
+
+
+@task('tests.flaky', max_attempts=3)
+def flaky(job, failures=1):
+    calls.append(job.attempts)
+    if job.attempts <= failures:
+        raise RuntimeError('temporary outage')
+    return {'message': 'ok'}
+
+
+@task('tests.invalid')
+def invalid(job):
+    raise JobFailed('bad input')
+
+
+@task('tests.silent')
+def silent(job, seconds=0.3):
+    # A long step that reports no progress, like call_command
+    time.sleep(seconds)
+    return None
+
+
+@task('tests.exclusive', concurrency=1)
+def exclusive(job):
+    return None
+
+
+@task('tests.read_upload', max_attempts=1)
+def read_upload(job, fail=False):
+    with job.open_upload() as file:
+        content = file.read().decode()
+    if fail:
+        raise RuntimeError('could not load')
+    return {'message': content}
+
+
+class JobQueueTest(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_progress_and_result(self):
+        job = enqueue('tests.count', payload={'rows': 3}, description='Count')
+        [job] = run_pending()
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'succeeded')
+        self.assertEqual((job.processed, job.total, job.attempts), (3, 3, 1))
+        self.assertEqual(job.errors, ['row 2 skipped'])
+        self.assertEqual(job.result, {'message': '3 rows'})
+        self.assertIsNotNone(job.finished_at)
+
+    @override_settings(JOB_RETRY_DELAY=0)
+    def test_retries_until_success(self):
+        enqueue('tests.flaky', payload={'failures': 2})
+        with self.assertLogs('jobs.worker', 'ERROR'):
+            jobs = run_pending()
+        self.assertEqual(calls, [1, 2, 3])
+        self.assertEqual(jobs[-1].status, 'succeeded')
+
+    def test_retry_is_delayed_then_fails(self):
+        job = enqueue('tests.flaky', payload={'failures': 5})
+        with self.assertLogs('jobs.worker', 'ERROR'):
+            run_pending()
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'queued')
+        self.assertGreater(job.run_after, timezone.now())
+        self.assertEqual(job.last_error, 'RuntimeError: temporary outage')
+
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now(), attempts=2)
+        with self.assertLogs('jobs.worker', 'ERROR'):
+            run_pending()
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+
+        job.retry()
+        self.assertEqual((job.status, job.attempts), ('queued', 0))
+
+    def test_permanent_failure_is_not_retried(self):
+        job = enqueue('tests.invalid')
+        run_pending()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.last_error, job.attempts), ('failed', 'bad input', 1))
+
+    def test_cancel_queued_and_running(self):
+        queued = enqueue('tests.count')
+        queued.cancel()
+        self.assertEqual(queued.status, 'cancelled')
+        self.assertEqual(run_pending(), [])
+
+        running = enqueue('tests.count')
+        claimed = claim_job()
+        running.refresh_from_db()
+        running.cancel()
+        self.assertTrue(running.cancel_requested)
+        run_job(claimed)
+        claimed.refresh_from_db()
+        self.assertEqual(claimed.status, 'cancelled')
+
+    def test_concurrency_limits(self):
+        first = enqueue('tests.exclusive')
+        second = enqueue('tests.exclusive')
+        other = enqueue('tests.count')
+
+        self.assertEqual(claim_job(), first)
+        # The task's own limit holds back the second job, not the others
+        self.assertEqual(claim_job(), other)
+        self.assertIsNone(claim_job())
+
+        with override_settings(JOB_MAX_RUNNING=2):
+            Job.objects.filter(pk=other.pk).update(status='succeeded')
+            Job.objects.filter(pk=first.pk).update(status='succeeded')
+            latest = enqueue('tests.count')
+            self.assertEqual(claim_job(), second)
+            self.assertEqual(claim_job(), latest)
+            # Two jobs running is the global limit
+            enqueue('tests.count')
+            self.assertIsNone(claim_job())
+
+    @override_settings(JOB_STALE_AFTER=60)
+    def test_abandoned_job_is_requeued(self):
+        job = enqueue('tests.count')
+        claim_job()
+        Job.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - timedelta(minutes=5))
+
+        [job] = run_pending()
+        self.assertEqual((job.status, job.attempts), ('succeeded', 2))
+
+    def test_unknown_task(self):
+        job = Job.objects.create(task='tests.missing')
+        self.assertIsNone(claim_job())
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        with self.assertRaises(LookupError):
+            enqueue('tests.missing')
+
+
+class JobUploadTest(TestCase):
+    def test_uploads_in_the_app_directory_are_flagged(self):
+        with override_settings(MEDIA_ROOT=str(settings.BASE_DIR / 'media')):
+            self.assertEqual([warning.id for warning in check_upload_storage(None)], ['jobs.W001'])
+        with override_settings(MEDIA_ROOT='/data/media'):
+            self.assertEqual(check_upload_storage(None), [])
+
+    def enqueue(self, **payload):
+        return enqueue('tests.read_upload', payload=payload, upload=ContentFile(b'rows', name='rows.csv'))
+
+    def test_succeeded_job_removes_its_upload(self):
+        job = self.enqueue()
+        storage, name = job.upload.storage, job.upload.name
+        [job] = run_pending()
+        self.assertEqual(job.result, {'message': 'rows'})
+        self.assertFalse(storage.exists(name))
+        job.refresh_from_db()
+        self.assertFalse(job.upload)
+
+    def test_failed_job_keeps_its_upload_until_purged(self):
+        job = self.enqueue(fail=True)
+        with self.assertLogs('jobs.worker', 'ERROR'):
+            run_pending()
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        storage, name = job.upload.storage, job.upload.name
+        self.assertTrue(storage.exists(name))
+
+        call_command('purge_job_uploads', stdout=io.StringIO())
+        self.assertTrue(storage.exists(name))
+        Job.objects.filter(pk=job.pk).update(finished_at=timezone.now() - timedelta(days=8))
+        out = io.StringIO()
+        call_command('purge_job_uploads', stdout=out)
+        self.assertIn('Removed the uploads of 1 finished jobs', out.getvalue())
+        self.assertFalse(storage.exists(name))
+
+        # A retry without its file fails at once instead of using up its attempts
+        job.refresh_from_db()
+        job.retry()
+        [job] = run_pending()
+        self.assertEqual((job.status, job.last_error),
+                         ('failed', 'The uploaded file is no longer available, please upload it again'))
+
+
+class JobViewsTest(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.owner = User.objects.create_user('owner', 'owner@example.com', 'password', email_verified=True)
+        self.job = enqueue('tests.count', user=self.owner, description='Count rows')
+        self.client.force_login(self.owner)
+
+    def test_status_page_and_json(self):
+        response = self.client.get(reverse('jobs:job_status', args=[self.job.pk]))
+        self.assertContains(response, 'Count rows')
+
+        run_pending()
+        data = self.client.get(reverse('jobs:job_status', args=[self.job.pk]), {'format': 'json'}).json()
+        self.assertEqual((data['status'], data['processed'], data['finished']), ('succeeded', 3, True))
+        self.assertEqual(data['percent_complete'], 100)
+
+    def test_other_users_cannot_see_job(self):
+        other = get_user_model().objects.create_user('other', 'other@example.com', 'password', email_verified=True)
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(reverse('jobs:job_status', args=[self.job.pk])).status_code, 404)
+
+    def test_cancel_and_retry(self):
+        self.client.post(reverse('jobs:cancel_job', args=[self.job.pk]))
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, 'cancelled')
+
+        self.client.post(reverse('jobs:retry_job', args=[self.job.pk]))
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, 'queued')
+
+        self.assertEqual(self.client.get(reverse('jobs:cancel_job', args=[self.job.pk])).status_code, 405)
+
+
+class HeartbeatTest(TransactionTestCase):
+    @override_settings(JOB_HEARTBEAT_INTERVAL=0.05, JOB_STALE_AFTER=60)
+    def test_worker_beats_while_task_is_silent(self):
+        enqueue('tests.silent')
+        job = claim_job()
+        abandoned = timezone.now() - timedelta(minutes=5)
+        Job.objects.filter(pk=job.pk).update(heartbeat_at=abandoned)
+
+        run_job(job)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('succeeded', 1))
+        self.assertGreater(job.heartbeat_at, abandoned + timedelta(minutes=4))
+
+
+class ProgressOutsideTransactionTest(TransactionTestCase):
+    def test_progress_leaves_job_row_unlocked(self):
+        enqueue('tests.count')
+        job = claim_job()
+        with transaction.atomic():
+            outside_transaction(job.progress, 1, 3)
+
+            # Cancelling and the status page are not held up by the task's transaction
+            def cancel():
+                with transaction.atomic():
+                    running = Job.objects.select_for_update(nowait=True).get(pk=job.pk)
+                running.cancel()
+                return running.processed
+            self.assertEqual(outside_transaction(cancel), 1)
+
+            with self.assertRaises(JobCancelled):
+                outside_transaction(job.progress, 2, 3)
+
+
+class RunWorkerCommandTest(TransactionTestCase):
+    def test_burst_runs_queued_jobs(self):
+        enqueue('tests.count')
+        enqueue('tests.count')
+        out = io.StringIO()
+        call_command('run_worker', '--burst', '--concurrency', '2', stdout=out)
+        self.assertIn('Worker stopped after 2 jobs', out.getvalue())
+        self.assertEqual(Job.objects.filter(status='succeeded').count(), 2)
+
+    def test_pool_threads_outlive_errors(self):
+        enqueue('tests.count')
+        enqueue('tests.count')
+        finished = []
+
+        def on_job(job):
+            finished.append(job.pk)
+            if len(finished) == 1:
+                raise RuntimeError('database went away')
+
+        with self.assertLogs('jobs.worker', 'ERROR'):
+            WorkerPool(concurrency=1, poll_interval=0, burst=True, on_job=on_job).start().join()
+        self.assertEqual(len(finished), 2)
@@ -0,0 +1,61 @@
+import io
+import json
+from django.test import SimpleTestCase, override_settings
+from jobs.json_stream import JSONStreamError, JSONStreamReader, read_records
+
+UPLOAD = {
+    'categories': [{'name': 'Water', 'order': 1.5, 'go_bag': True, 'notes': None}],
+    'items': [{'name': f'Item {i}', 'alternatives': [f'Item {i + 1}'], 'order': -i * 1000} for i in range(50)],
+    'empty': [],
+    'version': 12345,
+}
+
+
+def read(text, chunk_size, max_record_size=None):
+    return list(JSONStreamReader(io.BytesIO(text), max_record_size=max_record_size, chunk_size=chunk_size))
+
+
+class JSONStreamTest(SimpleTestCase):
+    def test_records_whatever_the_chunk_boundaries(self):
+        text = json.dumps(UPLOAD, indent=2).encode()
+        lines = text.decode().splitlines()
+        for chunk_size in (1, 7, 4096):
+            records = read(text, chunk_size)
+            self.assertEqual([record.value for record in records if record.section == 'items'], UPLOAD['items'])
+            self.assertEqual(records[-1][:3], ('version', None, 12345))
+            self.assertEqual(len(records), 52)
+            for record in records:
+                # Line and column of the first character of the record
+                self.assertEqual(lines[record.line - 1][record.column - 1], json.dumps(record.value)[0])
+
+    def test_errors_are_located_like_the_json_module(self):
+        malformed = [
+            b'{"items": [1, 2,, 3]}',
+            b'{"items": [\n  {"name": "a"}\n  {"name": "b"}\n]}',
+            b'{"items": [tru]}',
+            b'{"items": [{"name": "unterminated}]}',
+            b'{"items" [1]}',
+            b'{"items": [1]} trailing',
+        ]
+        for text in malformed:
+            with self.assertRaises(json.JSONDecodeError) as expected:
+                json.loads(text)
+            for chunk_size in (1, 3, 4096):
+                with self.subTest(text=text, chunk_size=chunk_size), self.assertRaises(JSONStreamError) as raised:
+                    read(text, chunk_size)
+                error, reference = raised.exception, expected.exception
+                self.assertEqual((error.msg, error.lineno, error.colno, error.pos),
+                                 (reference.msg, reference.lineno, reference.colno, reference.pos))
+
+        with self.assertRaisesMessage(JSONStreamError, 'Expecting object: line 1 column 1 (char 0)'):
+            read(b'[{"name": "a"}]', 4096)
+        with self.assertRaisesMessage(JSONStreamError, 'File is not UTF-8 text: line 1 column 22 (char 21)'):
+            read(b'{"items": [{"name": "\xff"}]}', 4096)
+
+    @override_settings(JSON_UPLOAD_MAX_RECORD_SIZE=1000)
+    def test_records_larger_than_the_ceiling_are_rejected(self):
+        text = json.dumps({'items': [{'name': 'small'}, {'name': 'x' * 5000}]}, indent=2).encode()
+        records = read_records(io.BytesIO(text))
+        self.assertEqual(next(records).value, {'name': 'small'})
+        with self.assertRaisesMessage(JSONStreamError, 'Record larger than 1000 characters: line 6 column 5'):
+            next(records)
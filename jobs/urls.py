@@ -0,0 +1,10 @@
+from django.urls import path
+from jobs import views
+
+app_name = 'jobs'
+
+urlpatterns = [
+    path('<int:pk>/', views.job_status, name='job_status'),
+    path('<int:pk>/cancel/', views.cancel_job, name='cancel_job'),
+    path('<int:pk>/retry/', views.retry_job, name='retry_job'),
+]
@@ -0,0 +1,66 @@
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.views.decorators.http import require_POST
+from jobs.models import Job
+
+
+def _get_job(request, pk):
+    job = get_object_or_404(Job, pk=pk)
+    if not (request.user.is_staff or job.created_by_id == request.user.pk):
+        raise Http404('No Job matches the given query.')
+    return job
+
+
+def _job_data(job):
+    return {
+        'id': job.pk,
+        'task': job.task,
+        'description': job.description,
+        'status': job.status,
+        'status_display': job.get_status_display(),
+        'finished': job.is_finished,
+        'attempts': job.attempts,
+        'max_attempts': job.max_attempts,
+        'processed': job.processed,
+        'total': job.total,
+        'percent_complete': job.percent_complete,
+        'errors': job.errors,
+        'last_error': job.last_error,
+        'result': job.result,
+        'created_at': job.created_at.isoformat(),
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+@login_required
+def job_status(request, pk):
+    job = _get_job(request, pk)
+    if request.GET.get('format') == 'json':
+        return JsonResponse(_job_data(job))
+    return render(request, 'jobs/job_status.html', {'job': job})
+
+
+@login_required
+@require_POST
+def cancel_job(request, pk):
+    job = _get_job(request, pk)
+    if job.is_finished:
+        messages.error(request, f'This job already {job.get_status_display().lower()}.')
+    else:
+        job.cancel()
+        messages.success(request, 'Cancellation requested.' if job.status == 'running' else 'Job cancelled.')
+    return redirect('jobs:job_status', pk=job.pk)
+
+
+@login_required
+@require_POST
+def retry_job(request, pk):
+    job = _get_job(request, pk)
+    try:
+        job.retry()
+        messages.success(request, 'Job queued again.')
+    except ValueError as e:
+        messages.error(request, str(e))
+    return redirect('jobs:job_status', pk=job.pk)
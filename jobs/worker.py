@@ -0,0 +1,243 @@
+"""
+Claiming and running queued jobs.
+
+Workers poll the job table; there is no broker. A claim runs in a short
+transaction that takes a Postgres advisory lock, so concurrent workers claim
+one at a time and the JOB_MAX_RUNNING and per-task concurrency limits hold
+across processes. While a job runs, a thread of its worker touches the job's
+heartbeat every JOB_HEARTBEAT_INTERVAL seconds, however long the task goes
+without reporting progress. Jobs whose worker stopped sending heartbeats for
+JOB_STALE_AFTER seconds are put back in the queue (or failed, once out of
+attempts).
+
+In production the jobs run in the web service: gunicorn.conf.py starts a
+WorkerPool in each gunicorn worker process (JOB_RUN_IN_WEB). ``manage.py
+run_worker`` runs the same pool as a process of its own.
+"""
+import logging
+import os
+import socket
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from datetime import timedelta
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+from jobs.models import Job, JobCancelled, JobFailed
+from jobs.registry import get_task
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary key of the advisory lock serializing claims
+CLAIM_LOCK_ID = 7310142
+
+# Queued jobs looked at per claim when the oldest ones are held back by their task's limit
+CLAIM_WINDOW = 50
+
+
+def get_max_running():
+    return getattr(settings, 'JOB_MAX_RUNNING', 4)
+
+
+def get_concurrency():
+    return getattr(settings, 'JOB_WORKER_CONCURRENCY', 2)
+
+
+def get_poll_interval():
+    return getattr(settings, 'JOB_POLL_INTERVAL', 2)
+
+
+def get_stale_after():
+    return timedelta(seconds=getattr(settings, 'JOB_STALE_AFTER', 600))
+
+
+def get_heartbeat_interval():
+    return getattr(settings, 'JOB_HEARTBEAT_INTERVAL', 60)
+
+
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}'[:100]
+
+
+def requeue_stale_jobs():
+    """Return jobs of workers that died mid-run to the queue; returns how many were found"""
+    now = timezone.now()
+    stale = list(Job.objects.select_for_update(skip_locked=True).filter(
+        status='running', heartbeat_at__lt=now - get_stale_after()
+    ))
+    for job in stale:
+        job.last_error = f'Worker {job.worker} stopped responding'
+        job.worker = ''
+        if job.cancel_requested or job.attempts >= job.max_attempts:
+            job.status = 'cancelled' if job.cancel_requested else 'failed'
+            job.finished_at = now
+        else:
+            job.status = 'queued'
+            job.run_after = now
+        job.save(update_fields=['status', 'last_error', 'worker', 'run_after', 'finished_at'])
+        logger.warning(f'Job {job.pk} ({job.task}) was abandoned by its worker, now {job.status}')
+    return len(stale)
+
+
+@transaction.atomic
+def claim_job(worker=None):
+    """Mark the oldest runnable job as running and return it, or None if nothing can start now"""
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_xact_lock(%s)', [CLAIM_LOCK_ID])
+    requeue_stale_jobs()
+
+    running = Counter(Job.objects.filter(status='running').values_list('task', flat=True))
+    if sum(running.values()) >= get_max_running():
+        return None
+
+    now = timezone.now()
+    candidates = (
+        Job.objects.select_for_update(skip_locked=True)
+        .filter(status='queued', run_after__lte=now)
+        .order_by('run_after', 'id')[:CLAIM_WINDOW]
+    )
+    for job in candidates:
+        try:
+            limit = get_task(job.task).concurrency
+        except LookupError as e:
+            _finish(job, 'failed', last_error=str(e))
+            continue
+        if limit is not None and running[job.task] >= limit:
+            continue
+
+        job.status = 'running'
+        job.attempts += 1
+        job.worker = worker or worker_name()
+        job.started_at = job.heartbeat_at = now
+        job.save(update_fields=['status', 'attempts', 'worker', 'started_at', 'heartbeat_at'])
+        return job
+    return None
+
+
+def run_job(job):
+    """Run a claimed job to completion, recording its outcome"""
+    task = get_task(job.task)
+    logger.info(f'Job {job.pk} ({job.task}) attempt {job.attempts}/{job.max_attempts} started')
+    try:
+        with heartbeat(job):
+            result = task.func(job, **job.payload)
+    except JobCancelled:
+        _finish(job, 'cancelled')
+    except JobFailed as e:
+        _finish(job, 'failed', last_error=str(e))
+    except Exception as e:
+        logger.exception(f'Job {job.pk} ({job.task}) failed')
+        if job.attempts < job.max_attempts:
+            job.status = 'queued'
+            job.run_after = timezone.now() + job.retry_delay()
+            job.last_error = f'{type(e).__name__}: {e}'
+            job.worker = ''
+            job.save(update_fields=['status', 'run_after', 'last_error', 'worker', 'processed', 'total', 'errors'])
+        else:
+            _finish(job, 'failed', last_error=f'{type(e).__name__}: {e}')
+    else:
+        _finish(job, 'succeeded', result=result)
+    logger.info(f'Job {job.pk} ({job.task}) finished as {job.status}')
+    return job
+
+
+@contextmanager
+def heartbeat(job):
+    """Keep the running ``job``'s heartbeat current from a thread of its own until the block exits"""
+    interval = get_heartbeat_interval()
+    stopped = threading.Event()
+
+    def beat():
+        try:
+            while not stopped.wait(interval):
+                Job.objects.filter(pk=job.pk, status='running', worker=job.worker).update(heartbeat_at=timezone.now())
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=beat, name=f'job-{job.pk}-heartbeat', daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stopped.set()
+        thread.join()
+
+
+def _finish(job, status, **fields):
+    job.status = status
+    job.finished_at = timezone.now()
+    for field, value in fields.items():
+        setattr(job, field, value)
+    # Failed and cancelled jobs keep their upload for a retry until purge_job_uploads removes it
+    if status == 'succeeded':
+        job.delete_upload()
+    job.save(update_fields=['status', 'finished_at', 'processed', 'total', 'errors', 'upload', *fields])
+
+
+def run_pending(limit=None, worker=None):
+    """Run queued jobs in this thread until none can start (or ``limit`` ran); returns the jobs run"""
+    jobs = []
+    while limit is None or len(jobs) < limit:
+        job = claim_job(worker)
+        if job is None:
+            break
+        jobs.append(run_job(job))
+    return jobs
+
+
+class WorkerPool:
+    """
+    Threads claiming and running jobs until stop() is called or, with ``burst``,
+    until no queued job can start. ``on_job`` is called with each finished job.
+    """
+    def __init__(self, concurrency=None, poll_interval=None, burst=False, on_job=None):
+        self.concurrency = concurrency or get_concurrency()
+        self.poll_interval = get_poll_interval() if poll_interval is None else poll_interval
+        self.burst = burst
+        self.on_job = on_job
+        self.stopping = threading.Event()
+        self.threads = []
+
+    def start(self):
+        self.threads = [
+            threading.Thread(target=self._work, name=f'job-worker-{number}', daemon=True)
+            for number in range(self.concurrency)
+        ]
+        for thread in self.threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        """Let running jobs finish but claim no more"""
+        self.stopping.set()
+
+    def join(self):
+        for thread in self.threads:
+            # A timeout keeps the joining thread responsive to signals
+            while thread.is_alive():
+                thread.join(timeout=1)
+
+    def _work(self):
+        name = worker_name()
+        try:
+            while not self.stopping.is_set():
+                close_old_connections()
+                try:
+                    job = claim_job(name)
+                    if job is None:
+                        if self.burst:
+                            break
+                        self.stopping.wait(self.poll_interval)
+                        continue
+                    run_job(job)
+                    if self.on_job:
+                        self.on_job(job)
+                except Exception:
+                    # Nothing restarts these threads, so outlive a database restart or the like
+                    logger.exception(f'Job worker {name} failed, retrying in {self.poll_interval}s')
+                    close_old_connections()
+                    self.stopping.wait(self.poll_interval)
+        finally:
+            connection.close()
@@ -5,6 +5,7 @@ from django.shortcuts import redirect
 from django.contrib import messages
 from .models import Category, Recommendation, Solution, Tutorial, TutorialStep
 from .management.commands.populate_online_security_data import SecurityDataAdmin
+from jobs.registry import enqueue
 
 class TutorialStepInline(admin.TabularInline):
     model = TutorialStep
@@ -64,13 +65,9 @@ class CategoryAdmin(SecurityDataAdmin, admin.ModelAdmin):
         return custom_urls + urls
     
     def populate_online_security_data_view(self, request):
-        from django.core.management import call_command
-        try:
-            call_command('populate_online_security_data')
-            self.message_user(request, 'Online Security data populated successfully!')
-        except Exception as e:
-            self.message_user(request, f'Error populating security data: {str(e)}', level=messages.ERROR)
-        return redirect('admin:online_security_category_changelist')
+        job = enqueue('online_security.populate_data', user=request.user, description='Populate online security data')
+        self.message_user(request, 'Online Security data population queued.')
+        return redirect('jobs:job_status', pk=job.pk)
 
 @admin.register(Recommendation)
 class RecommendationAdmin(admin.ModelAdmin):
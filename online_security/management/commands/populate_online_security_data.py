@@ -6,8 +6,8 @@ from django.http import HttpResponse
 from django.urls import path
 from django.conf import settings
 from django.db import transaction
+from jobs.json_stream import JSONStreamError, read_records
 from online_security.models import Category, Recommendation, Solution
-import json
 import logging
 import os
 
@@ -27,11 +27,8 @@ class Command(BaseCommand):
         data_file_path = os.path.join(settings.BASE_DIR, 'data', 'online_security.json')
         
         try:
-            # Read data from local file
-            with open(data_file_path, 'r', encoding='utf-8') as file:
-                data = json.load(file)
-            
-            with transaction.atomic():
+            # Stream the local file one category at a time; a JSON error rolls back the categories before it
+            with open(data_file_path, 'rb') as file, transaction.atomic():
                 # Clear existing data if requested
                 if options['clear']:
                     self.stdout.write('Clearing existing data...')
@@ -39,12 +36,18 @@ class Command(BaseCommand):
                     self.stdout.write('Existing data cleared.')
 
                 # Process categories and their nested data
-                for category_data in data['categories']:
+                for record in read_records(file):
+                    if record.section != 'categories':
+                        continue
+                    category_data = record.value
                     try:
                         category = self.create_category(category_data)
                         self.process_recommendations(category, category_data.get('recommendations', []))
                     except Exception as e:
-                        logger.error(f"Error processing category {category_data.get('name', 'Unknown')}: {str(e)}")
+                        logger.error(
+                            f"Error processing category {category_data.get('name', 'Unknown')} "
+                            f"(line {record.line}): {str(e)}"
+                        )
                         raise
 
             self.stdout.write(
@@ -55,7 +58,7 @@ class Command(BaseCommand):
             error_msg = f'Data file not found at {data_file_path}'
             logger.error(error_msg)
             self.stderr.write(self.style.ERROR(error_msg))
-        except json.JSONDecodeError as e:
+        except JSONStreamError as e:
             error_msg = f'Failed to parse JSON data: {str(e)}'
             logger.error(error_msg)
             self.stderr.write(self.style.ERROR(error_msg))
@@ -0,0 +1,18 @@
+"""
+Background tasks of the online security app, run by the jobs worker.
+"""
+import io
+from django.core.management import call_command
+from jobs.models import JobFailed
+from jobs.registry import task
+
+
+@task('online_security.populate_data', concurrency=1)
+def populate_data(job):
+    """Populate categories, recommendations and solutions from the bundled JSON file"""
+    errors = io.StringIO()
+    call_command('populate_online_security_data', stdout=io.StringIO(), stderr=errors, no_color=True)
+    # The command reports its failures on stderr rather than raising
+    if errors.getvalue().strip():
+        raise JobFailed(f'Error populating security data: {errors.getvalue().strip()}')
+    return {'message': 'Online Security data populated successfully!'}
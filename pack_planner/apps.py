@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class PackPlannerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'pack_planner'
+
+    def ready(self):
+        from pack_planner import signals  # noqa: F401
@@ -1,7 +1,7 @@
 from django import forms
 from django.core.exceptions import ValidationError
+from jobs.json_stream import JSONStreamError, read_records
 from pack_planner.validators import validate_file_extension, validate_json_structure
-import json
 
 class AssessmentForm(forms.Form):
     # Family Composition
@@ -98,12 +98,11 @@ class DataUploadForm(forms.Form):
     def clean_file(self):
         file = self.cleaned_data['file']
         try:
-            # Validate JSON structure
-            data = json.load(file)
-            validate_json_structure(data)
+            # Validate JSON structure, streaming the file rather than parsing it whole
+            validate_json_structure(read_records(file))
             file.seek(0)  # Reset file pointer
             return file
-        except json.JSONDecodeError:
-            raise forms.ValidationError("Invalid JSON file")
+        except JSONStreamError as e:
+            raise forms.ValidationError(f"Invalid JSON file: {e}")
         except ValidationError as e:
             raise forms.ValidationError(str(e))
@@ -0,0 +1,102 @@
+import random
+import statistics
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from pack_planner.models import Category, Item
+from pack_planner.services.catalog import build_catalog, invalidate_pack_catalog
+from pack_planner.services.data_processor import generate_packs
+from pack_planner.services.pack_engine import FLAGS
+
+class Command(BaseCommand):
+    help = 'Benchmark pack generation for families of 1 to 20 people against a synthetic catalog (rolled back afterwards)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--items',
+            type=int,
+            default=500,
+            help='Items in the synthetic catalog',
+        )
+        parser.add_argument(
+            '--max-family',
+            type=int,
+            default=20,
+            help='Largest family size to benchmark',
+        )
+        parser.add_argument(
+            '--runs',
+            type=int,
+            default=20,
+            help='Timed runs per family size',
+        )
+
+    def handle(self, *args, **options):
+        self.random = random.Random(42)
+        with transaction.atomic():
+            self.seed_catalog(options['items'])
+            self.benchmark_snapshot(options['runs'])
+            for size in range(1, options['max_family'] + 1):
+                self.benchmark(size, options['runs'])
+            # Never keep the synthetic catalog
+            transaction.set_rollback(True)
+        invalidate_pack_catalog()
+
+    def seed_catalog(self, size):
+        """Create `size` items over 12 categories with random applicability flags"""
+        categories = Category.objects.bulk_create([
+            Category(name=f'Benchmark Category {i:02d}', description='Synthetic category', importance='critical', order=i)
+            for i in range(12)
+        ])
+        Item.objects.bulk_create([
+            Item(
+                name=f'Benchmark Item {i:05d}',
+                description='Synthetic item',
+                uses='',
+                category=categories[i % len(categories)],
+                importance='recommended',
+                order=i,
+                **{flag: self.random.random() < 0.6 for flag in FLAGS},
+            )
+            for i in range(size)
+        ], batch_size=5000)
+
+    def assessment(self, size):
+        """A family of `size` people, half of them children, with elderly and disabled members and two pets"""
+        return {
+            'adults': size - size // 2,
+            'children': size // 2,
+            'hasElderly': True,
+            'hasDisabled': True,
+            'hasPets': True,
+            'petTypes': ['dog', 'cat'],
+            'transportType': 'car',
+        }
+
+    def measure(self, func, runs):
+        """Return (result, query count, p50 ms, p95 ms) for func"""
+        with CaptureQueriesContext(connection) as queries:
+            result = func()
+
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+
+        p95 = statistics.quantiles(timings, n=20)[18] if len(timings) > 1 else timings[0]
+        return result, len(queries), statistics.median(timings), p95
+
+    def benchmark_snapshot(self, runs):
+        """Cost of (re)building the catalog snapshot, paid once per worker after each data change"""
+        catalog, queries, p50, p95 = self.measure(build_catalog, runs)
+        self.stdout.write(
+            f'snapshot    {len(catalog):>5} items  {queries:>3} queries  p50 {p50:8.2f}ms  p95 {p95:8.2f}ms'
+        )
+
+    def benchmark(self, size, runs):
+        packs, queries, p50, p95 = self.measure(lambda: generate_packs(self.assessment(size)), runs)
+        self.stdout.write(
+            f'{size:>3} people  {len(packs):>3} packs  {queries:>3} queries  p50 {p50:8.2f}ms  p95 {p95:8.2f}ms'
+        )
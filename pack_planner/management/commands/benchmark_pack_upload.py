@@ -0,0 +1,110 @@
+import io
+import json
+import random
+import time
+import tracemalloc
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from jobs.json_stream import read_records
+from pack_planner.services.catalog import invalidate_pack_catalog
+from pack_planner.services.data_processor import DataProcessor
+from pack_planner.services.pack_engine import FLAGS
+
+class Command(BaseCommand):
+    help = 'Benchmark pack planner data uploads against a synthetic file (rolled back afterwards)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--items',
+            type=int,
+            default=50000,
+            help='Items in the synthetic upload',
+        )
+        parser.add_argument(
+            '--changed',
+            type=float,
+            default=0.1,
+            help='Share of items changed in the re-upload',
+        )
+
+    def handle(self, *args, **options):
+        self.random = random.Random(42)
+        data = self.synthetic_upload(options['items'])
+        self.stdout.write(
+            f"Upload: {len(data['categories'])} categories, {len(data['items'])} items, "
+            f"{len(data['products'])} products"
+        )
+
+        self.benchmark_parsing(json.dumps(data, indent=2).encode())
+
+        with transaction.atomic():
+            self.run('new catalog', 'update', data)
+
+            for row in self.random.sample(data['items'], int(len(data['items']) * options['changed'])):
+                row['weight_note'] = 'Changed'
+            self.run('re-upload, changed', 'update', data)
+            self.run('re-upload, unchanged', 'update', data)
+            self.run('full replace', 'full', data)
+            self.run('streamed file', 'update', read_records(io.BytesIO(json.dumps(data).encode())))
+            # Never keep the synthetic catalog
+            transaction.set_rollback(True)
+        invalidate_pack_catalog()
+
+    def synthetic_upload(self, size):
+        """`size` items over 12 categories, each naming the next two items as alternatives, one product per 5 items"""
+        categories = [
+            {'name': f'Benchmark Category {i:02d}', 'description': 'Synthetic category', 'importance': 'critical', 'order': i}
+            for i in range(12)
+        ]
+        items = [
+            {
+                'name': f'Benchmark Item {i:06d}',
+                'description': 'Synthetic item',
+                'category': categories[i % len(categories)]['name'],
+                'importance': 'recommended',
+                'order': i,
+                # Forward references: the alternatives come later in the file
+                'alternatives': [f'Benchmark Item {j:06d}' for j in (i + 1, i + 2) if j < size],
+                **{flag: self.random.random() < 0.6 for flag in FLAGS},
+            }
+            for i in range(size)
+        ]
+        products = [
+            {'name': f'Benchmark Product {i:06d}', 'description': 'Synthetic product', 'item': items[i]['name']}
+            for i in range(0, size, 5)
+        ]
+        return {'categories': categories, 'items': items, 'products': products}
+
+    def benchmark_parsing(self, text):
+        """Time and peak memory of parsing the upload whole, and of streaming its records"""
+        for label, parse in [
+            ('json.loads', lambda: json.loads(text)),
+            ('read_records', lambda: sum(1 for _ in read_records(io.BytesIO(text)))),
+        ]:
+            start = time.perf_counter()
+            parse()
+            elapsed = time.perf_counter() - start
+            tracemalloc.start()
+            parse()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            self.stdout.write(f'{label:<22} {elapsed:7.2f}s  peak {peak / 2**20:8.1f} MiB  ({len(text) / 2**20:.1f} MiB file)')
+
+    def run(self, label, upload_type, data):
+        """Load ``data``, an upload dict or a stream of records"""
+        processor = DataProcessor(upload_type)
+        start = time.perf_counter()
+        with CaptureQueriesContext(connection) as queries:
+            if isinstance(data, dict):
+                stats = processor.process_data(data)
+            else:
+                stats = processor.process_records(data)
+        elapsed = time.perf_counter() - start
+        updated = stats['updated']
+        self.stdout.write(
+            f'{label:<22} {elapsed:7.2f}s  {len(queries):>6} queries  '
+            f"created {stats['categories']}/{stats['items']}/{stats['products']}  "
+            f"updated {updated['categories']}/{updated['items']}/{updated['products']}  "
+            f"{stats['alternatives']} alternative links  {stats['error_count']} errors"
+        )
@@ -0,0 +1,148 @@
+"""
+Process-wide snapshot of the pack planner catalog.
+
+Pack data only changes when an admin uploads a file or edits it in the admin,
+so each worker keeps every Category, Item (with its category, alternatives
+and recommended products) and a PackEngine over the items in memory. The
+results, browse, checklist and item pages are answered from it without
+touching the pack tables.
+
+A snapshot is built lazily, four queries, and never modified afterwards; a
+rebuild makes a new one and swaps the reference, so a request always sees one
+consistent catalog. DataProcessor.process_data and the signal handlers in
+pack_planner.signals bump a shared version (config.shared_version) once
+changes commit. Workers compare it with the version of their snapshot at most
+every PACK_CATALOG_VERSION_CHECK_INTERVAL seconds and rebuild when it moved.
+"""
+import logging
+import threading
+import time
+from django.db import transaction
+from config.shared_version import SharedVersion
+from pack_planner.models import Category, Item
+from pack_planner.services.pack_engine import PackEngine
+
+logger = logging.getLogger(__name__)
+
+shared_version = SharedVersion('pack_catalog:version', 'PACK_CATALOG_VERSION_CHECK_INTERVAL')
+
+
+class PackCatalog:
+    def __init__(self, categories, items, version=None):
+        self.version = version
+        self.checked_at = time.monotonic()
+        self.categories = list(categories)
+        categories_by_id = {category.pk: category for category in self.categories}
+        self.items = list(items)
+        for item in self.items:
+            # Every item of a category shares the one Category instance
+            item.category = categories_by_id.get(item.category_id, item.category)
+        self.items_by_id = {item.pk: item for item in self.items}
+        self.engine = PackEngine(self.items)
+
+    @classmethod
+    def load(cls, version=None):
+        return cls(
+            Category.objects.all(),
+            Item.objects.select_related('category').prefetch_related('alternatives', 'recommended_products'),
+            version,
+        )
+
+    def __len__(self):
+        return len(self.items)
+
+    def item(self, pk):
+        """The item with primary key ``pk``, or None"""
+        try:
+            return self.items_by_id.get(int(pk))
+        except (TypeError, ValueError):
+            return None
+
+    def products(self, item, extended=None):
+        """
+        Recommended products of ``item``: all of them, those for a go-bag, or
+        with ``extended`` those for a go-bag or a 72-hour kit
+        """
+        products = item.recommended_products.all()
+        if extended is None:
+            return list(products)
+        return [product for product in products if product.go_bag or (extended and product.seventy_two_hr_bag)]
+
+    def browse(self, query='', category_id=None, importance=None, special_need=None):
+        """Items matching the browse page filters, in catalog order"""
+        query = query.lower()
+        special_need = (special_need or '').lower()
+        items = self.items
+        if query:
+            items = [
+                item for item in items
+                if query in item.name.lower() or query in item.description.lower() or query in item.uses.lower()
+            ]
+        if category_id:
+            items = [item for item in items if str(item.category_id) == str(category_id)]
+        if importance:
+            items = [item for item in items if item.importance == importance]
+        if special_need:
+            items = [item for item in items if special_need in item.special_considerations.lower()]
+        return list(items)
+
+    def checklist(self, assessment_data=None):
+        """Critical items, plus those whose special considerations mention the assessment's needs"""
+        needs = []
+        if assessment_data:
+            if assessment_data.get('children'):
+                needs.append('children')
+            if assessment_data.get('has_elderly'):
+                needs.append('elderly')
+            if assessment_data.get('has_pets'):
+                needs.append('pets')
+        return [
+            item for item in self.items
+            if item.importance == 'critical' or any(need in item.special_considerations.lower() for need in needs)
+        ]
+
+
+_catalog = None
+_lock = threading.Lock()
+# Whether this thread changed pack data since its last invalidation
+_pending = threading.local()
+
+
+def build_catalog():
+    """(Re)build this process's snapshot from the database and swap it in"""
+    global _catalog
+    version = shared_version.get()
+    catalog = PackCatalog.load(version)
+    with _lock:
+        _catalog = catalog
+    logger.info(f'Pack catalog cached with {len(catalog)} items')
+    return catalog
+
+
+def get_catalog():
+    """The process-wide snapshot, rebuilt if pack data changed since it was built"""
+    catalog = _catalog
+    if catalog is None or not shared_version.is_current(catalog):
+        return build_catalog()
+    return catalog
+
+
+def invalidate_pack_catalog():
+    """Pack data changed: this worker rebuilds on its next request, the others after their next version check"""
+    global _catalog
+    shared_version.bump()
+    with _lock:
+        _catalog = None
+
+
+def _invalidate_pending():
+    # The first of a transaction's callbacks invalidates; the others find nothing pending
+    if getattr(_pending, 'changes', False):
+        _pending.changes = False
+        invalidate_pack_catalog()
+
+
+def invalidate_on_commit():
+    """Invalidate once the current transaction commits, however many rows it changes"""
+    _pending.changes = True
+    transaction.on_commit(_invalidate_pending)
@@ -1,187 +1,354 @@
-from collections import defaultdict
+"""
+Bulk loader for pack planning data uploads.
+
+An upload holds ``categories``, ``items`` (referring to categories by name,
+and to alternative items by name) and ``products`` (referring to items by
+name). DataProcessor.process_records takes it as a stream of records (see
+jobs.json_stream) and loads each section in batches of BATCH_SIZE rows, so
+only a batch of the upload is in memory at a time. Every row of a batch is
+first checked against the model's fields, so nothing is written for a row
+that would fail; such rows are skipped and counted in ``stats['error_count']``,
+the first MAX_ERRORS of them being reported in ``stats['errors']``.
+Each model is read once into a name-to-row map and the batch is written with
+bulk_create/bulk_update, new or changed rows only, references being resolved
+through the maps. A section arriving before the one it refers to, or in an
+upload without it, is set aside in a temporary file until the end.
+
+The alternatives of every item that lists them are replaced once the items
+section is loaded, so they may name items that appear later in it: only the
+links that differ from the stored ones are deleted or bulk created on the
+through table.
+
+Rows are matched to existing ones by name (products by name and item), and a
+name repeated in an upload keeps its last row.
+"""
+import json
+import tempfile
+from itertools import groupby, islice
+from operator import attrgetter
 from django.db import transaction
+from django.db.models import BooleanField, Q
+from jobs.json_stream import Record
+from jobs.models import MAX_ERRORS
 from pack_planner.models import Category, Item, Product
+from pack_planner.services.catalog import get_catalog, invalidate_on_commit
+
+BATCH_SIZE = 2000
+
+SECTIONS = ['categories', 'items', 'products']
+# The section whose rows each section refers to by name
+DEPENDS_ON = {'items': 'categories', 'products': 'items'}
+
+# Optional fields of each section, with the defaults used when a row leaves them out
+CATEGORY_DEFAULTS = {
+    'order': 0,
+    'go_bag': True,
+    'seventy_two_hr_bag': True,
+}
+ITEM_DEFAULTS = {
+    'uses': '',
+    'weight_note': '',
+    'special_considerations': '',
+    'order': 0,
+    'conditional_applicability': False,
+    'for_adults': True,
+    'for_children': False,
+    'for_pets': False,
+    'for_cats': False,
+    'for_dogs': False,
+    'for_small_animals': False,
+    'for_disabled': False,
+    'for_elderly': False,
+    'for_on_foot': True,
+    'for_bicycle': True,
+    'for_vehicle': True,
+    'for_public_transit': True,
+    'go_bag': True,
+    'seventy_two_hr_bag': True,
+}
+PRODUCT_DEFAULTS = {
+    'url': '',
+    'notes': '',
+    'is_available': True,
+    'go_bag': True,
+    'seventy_two_hr_bag': True,
+}
+
+AlternativeLink = Item.alternatives.through
+
+# Model of each section, and the key its rows are matched by
+MODELS = {
+    'categories': (Category, attrgetter('name')),
+    'items': (Item, attrgetter('name')),
+    'products': (Product, attrgetter('name', 'item_id')),
+}
+
+
+class RowError(ValueError):
+    pass
+
+
+def row_fields(model, row, required, defaults):
+    """Model field values of one uploaded row, checked against the model's fields"""
+    missing = [key for key in required if key not in row]
+    if missing:
+        raise RowError(f'Missing {", ".join(missing)}')
+    for key in ('category', 'item'):
+        if key in required and not isinstance(row[key], str):
+            raise RowError(f'{key} must be a name')
+    values = {key: row[key] for key in required if key not in ('category', 'item')}
+    values.update({key: row.get(key, default) for key, default in defaults.items()})
+    if not isinstance(values['name'], str) or not values['name'].strip():
+        raise RowError('Name must be a non-empty string')
+
+    for key, value in values.items():
+        field = model._meta.get_field(key)
+        if isinstance(field, BooleanField):
+            if not isinstance(value, bool):
+                raise RowError(f'{key} must be a boolean value')
+        elif field.get_internal_type() == 'IntegerField':
+            if not isinstance(value, int) or isinstance(value, bool):
+                raise RowError(f'{key} must be an integer')
+        elif not isinstance(value, str):
+            raise RowError(f'{key} must be a string')
+        elif field.max_length and len(value) > field.max_length:
+            raise RowError(f'{key} is longer than {field.max_length} characters')
+        if field.choices and value not in dict(field.choices):
+            raise RowError(f'{key} must be one of {", ".join(dict(field.choices))}')
+    return values
+
 
 class DataProcessor:
-    def __init__(self, upload_type):
+    def __init__(self, upload_type, progress=None):
         self.upload_type = upload_type
-        self.stats = {'categories': 0, 'items': 0, 'products': 0}
+        # Called with the number of rows read after each batch
+        self.progress = progress
+        self.rows = 0
+        self.stats = {
+            'categories': 0,
+            'items': 0,
+            'products': 0,
+            'updated': {'categories': 0, 'items': 0, 'products': 0},
+            'alternatives': 0,
+            'errors': [],
+            'error_count': 0,
+        }
+        # {key: instance} of each model, read on first use and kept up to date by _upsert
+        self.existing = {}
+        # {item name: (index, alternative names)} of the item rows listing alternatives
+        self.alternatives = {}
 
     def process_data(self, data):
+        """Load an upload that has already been parsed into a dict"""
+        return self.process_records(
+            Record(section, index, row)
+            for section in SECTIONS
+            for index, row in enumerate(data.get(section) or [])
+        )
+
+    def process_records(self, records):
+        """Load an upload from its ``Record`` events, a batch at a time"""
         if self.upload_type == 'full':
             self._clear_existing_data()
-            
-        self._process_categories(data.get('categories', []))
-        self._process_items(data.get('items', []))
-        self._process_products(data.get('products', []))
-        
+
+        loaded = set()
+        spooled = {}
+        for section, group in groupby(records, key=attrgetter('section')):
+            if section not in SECTIONS:
+                continue
+            dependency = DEPENDS_ON.get(section)
+            if dependency and dependency not in loaded:
+                # Refers to rows further on in the upload, or only to stored ones
+                spooled[section] = self._spool(group, spooled.get(section))
+                continue
+            self._load_section(section, group)
+            loaded.add(section)
+        for section in SECTIONS:
+            if section in spooled:
+                self._load_section(section, self._unspool(section, spooled[section]))
+
+        # Workers swap in a fresh catalog snapshot once the upload is committed
+        invalidate_on_commit()
         return self.stats
 
+    def _load_section(self, section, records):
+        records = iter(records)
+        load = getattr(self, f'_process_{section}')
+        while batch := list(islice(records, BATCH_SIZE)):
+            load(batch)
+            self.rows += len(batch)
+            if self.progress:
+                self.progress(self.rows)
+        if section == 'items':
+            self._process_alternatives()
+
+    def _spool(self, records, file=None):
+        """Write records to a temporary file, one JSON line each"""
+        file = file or tempfile.TemporaryFile('w+', encoding='utf-8')
+        for record in records:
+            file.write(json.dumps([record.index, record.value, record.line, record.column]) + '\n')
+        return file
+
+    def _unspool(self, section, file):
+        with file:
+            file.seek(0)
+            for line in file:
+                yield Record(section, *json.loads(line))
+
+    def _error(self, section, record, message, name=None):
+        if name is None and isinstance(record.value, dict):
+            name = record.value.get('name')
+        self.stats['error_count'] += 1
+        if len(self.stats['errors']) >= MAX_ERRORS:
+            return
+        self.stats['errors'].append({
+            'section': section, 'index': record.index, 'line': record.line, 'name': name, 'error': message,
+        })
+
+    def _rows(self, section, records, model, required, defaults):
+        """[(record, field values)] of the valid rows of a batch, the last row of each name"""
+        valid = {}
+        for record in records:
+            row = record.value
+            if record.index is None:
+                self._error(section, record, 'Must be a list of rows')
+                continue
+            if not isinstance(row, dict):
+                self._error(section, record, 'Row must be an object')
+                continue
+            try:
+                values = row_fields(model, row, required, defaults)
+            except RowError as e:
+                self._error(section, record, str(e))
+                continue
+            key = (values['name'], row['item']) if section == 'products' else values['name']
+            valid.pop(key, None)
+            valid[key] = (record, values)
+        return list(valid.values())
+
     def _clear_existing_data(self):
         with transaction.atomic():
             Product.objects.all().delete()
+            AlternativeLink.objects.all().delete()
             Item.objects.all().delete()
             Category.objects.all().delete()
 
-    def _process_categories(self, categories):
-        for cat_data in categories:
-            category, created = Category.objects.update_or_create(
-                name=cat_data['name'],
-                defaults={
-                    'description': cat_data['description'],
-                    'importance': cat_data['importance'],
-                    'order': cat_data.get('order', 0),
-                    'go_bag': cat_data.get('go_bag', True),
-                    'seventy_two_hr_bag': cat_data.get('seventy_two_hr_bag', True)
-                }
-            )
-            if created:
-                self.stats['categories'] += 1
-
-    def _process_items(self, items):
-        for item_data in items:
-            try:
-                category = Category.objects.get(name=item_data['category'])
-                item, created = Item.objects.update_or_create(
-                    name=item_data['name'],
-                    defaults={
-                        'description': item_data['description'],
-                        'uses': item_data.get('uses', ''),
-                        'category': category,
-                        'importance': item_data['importance'],
-                        'weight_note': item_data.get('weight_note', ''),
-                        'special_considerations': item_data.get('special_considerations', ''),
-                        'order': item_data.get('order', 0),
-                        # All boolean fields with their defaults
-                        'conditional_applicability': item_data.get('conditional_applicability', False),
-                        'for_adults': item_data.get('for_adults', True),
-                        'for_children': item_data.get('for_children', False),
-                        'for_pets': item_data.get('for_pets', False),
-                        'for_cats': item_data.get('for_cats', False),
-                        'for_dogs': item_data.get('for_dogs', False),
-                        'for_small_animals': item_data.get('for_small_animals', False),
-                        'for_disabled': item_data.get('for_disabled', False),
-                        'for_elderly': item_data.get('for_elderly', False),
-                        'for_on_foot': item_data.get('for_on_foot', True),
-                        'for_bicycle': item_data.get('for_bicycle', True),
-                        'for_vehicle': item_data.get('for_vehicle', True),
-                        'for_public_transit': item_data.get('for_public_transit', True),
-                        'go_bag': item_data.get('go_bag', True),
-                        'seventy_two_hr_bag': item_data.get('seventy_two_hr_bag', True)
-                    }
-                )
-                
-                # Handle alternatives
-                if 'alternatives' in item_data:
-                    alt_items = Item.objects.filter(name__in=item_data['alternatives'])
-                    item.alternatives.set(alt_items)
-                
-                if created:
-                    self.stats['items'] += 1
-            
-            except Category.DoesNotExist:
-                raise ValueError(f"Category not found: {item_data['category']}")
-
-    def _process_products(self, products):
-        for prod_data in products:
-            try:
-                item = Item.objects.get(name=prod_data['item'])
-                product, created = Product.objects.update_or_create(
-                    name=prod_data['name'],
-                    item=item,
-                    defaults={
-                        'description': prod_data['description'],
-                        'url': prod_data.get('url', ''),
-                        'notes': prod_data.get('notes', ''),
-                        'is_available': prod_data.get('is_available', True),
-                        'go_bag': prod_data.get('go_bag', True),
-                        'seventy_two_hr_bag': prod_data.get('seventy_two_hr_bag', True)
-                    }
-                )
-                if created:
-                    self.stats['products'] += 1
-            
-            except Item.DoesNotExist:
-                raise ValueError(f"Item not found: {prod_data['item']}")
-            
-def generate_packs(assessment_data):
+    def _upsert(self, section, model, existing, rows):
+        """
+        Create the rows not in ``existing`` ({key: instance}) and update those
+        whose values changed; ``rows`` is [(key, field values)].
+        """
+        creates, updates = [], []
+        fields = set()
+        for key, values in rows:
+            instance = existing.get(key)
+            if instance is None:
+                instance = model(**values)
+                creates.append(instance)
+                existing[key] = instance
+            else:
+                changed = [field for field, value in values.items() if getattr(instance, field) != value]
+                if changed:
+                    for field in changed:
+                        setattr(instance, field, values[field])
+                    updates.append(instance)
+                    fields.update(changed)
+        model.objects.bulk_create(creates, batch_size=BATCH_SIZE)
+        if updates:
+            model.objects.bulk_update(updates, sorted(fields), batch_size=BATCH_SIZE)
+        self.stats[section] += len(creates)
+        self.stats['updated'][section] += len(updates)
+
+    def _existing(self, section):
+        """{key: instance} of the stored rows of a section; of rows sharing a key, the oldest is kept in sync"""
+        if section not in self.existing:
+            model, key = MODELS[section]
+            self.existing[section] = {key(instance): instance for instance in model.objects.order_by('-pk')}
+        return self.existing[section]
+
+    def _process_categories(self, records):
+        categories = self._rows('categories', records, Category,
+                                ['name', 'description', 'importance'], CATEGORY_DEFAULTS)
+        self._upsert('categories', Category, self._existing('categories'), [
+            (values['name'], values) for _, values in categories
+        ])
+
+    def _resolve(self, section, rows, reference, existing, label):
+        """Rows whose ``reference`` names a row in ``existing``, with its id set; the others are reported"""
+        resolved = []
+        for record, values in rows:
+            target = existing.get(record.value[reference])
+            if target is None:
+                self._error(section, record, f'{label} not found: {record.value[reference]}')
+                continue
+            values[f'{reference}_id'] = target.pk
+            resolved.append((record, values))
+        return resolved
+
+    def _process_items(self, records):
+        items = self._rows('items', records, Item,
+                           ['name', 'description', 'category', 'importance'], ITEM_DEFAULTS)
+        items = self._resolve('items', items, 'category', self._existing('categories'), 'Category')
+        self._upsert('items', Item, self._existing('items'), [
+            (values['name'], values) for _, values in items
+        ])
+        for record, values in items:
+            # Only the alternatives of an item's last row count
+            self.alternatives.pop(values['name'], None)
+            if 'alternatives' in record.value:
+                self.alternatives[values['name']] = (record._replace(value=None), record.value['alternatives'])
+
+    def _process_alternatives(self):
+        """Replace the alternatives of every item whose row lists them"""
+        items = self._existing('items')
+        pairs = set()
+        replaced = []
+        for name, (record, alternatives) in self.alternatives.items():
+            if not isinstance(alternatives, list):
+                self._error('items', record, 'alternatives must be a list of item names', name)
+                continue
+            item_id = items[name].pk
+            replaced.append(item_id)
+            for alternative in alternatives:
+                target = items.get(alternative) if isinstance(alternative, str) else None
+                if target is None:
+                    self._error('items', record, f'Alternative not found: {alternative}', name)
+                elif target.pk != item_id:
+                    # Alternatives are symmetrical: each link is stored in both directions
+                    pairs.add((item_id, target.pk))
+                    pairs.add((target.pk, item_id))
+        self.alternatives = {}
+        if not replaced:
+            return
+
+        # Only the difference with the stored links is written
+        stored = {
+            (from_id, to_id): pk for pk, from_id, to_id in AlternativeLink.objects.filter(
+                Q(from_item_id__in=replaced) | Q(to_item_id__in=replaced)
+            ).values_list('pk', 'from_item_id', 'to_item_id')
+        }
+        removed = [pk for pair, pk in stored.items() if pair not in pairs]
+        if removed:
+            AlternativeLink.objects.filter(pk__in=removed).delete()
+        AlternativeLink.objects.bulk_create([
+            AlternativeLink(from_item_id=from_id, to_item_id=to_id)
+            for from_id, to_id in pairs if (from_id, to_id) not in stored
+        ], batch_size=BATCH_SIZE, ignore_conflicts=True)
+        self.stats['alternatives'] += len(pairs) // 2
+
+    def _process_products(self, records):
+        products = self._rows('products', records, Product, ['name', 'description', 'item'], PRODUCT_DEFAULTS)
+        products = self._resolve('products', products, 'item', self._existing('items'), 'Item')
+        self._upsert('products', Product, self._existing('products'), [
+            ((values['name'], values['item_id']), values) for _, values in products
+        ])
+
+
+def generate_packs(assessment_data, extended=False):
     """
     Generate packs based on the user's assessment data.
-    Returns a dictionary of packs, each containing categories and their items.
+    Returns a dictionary of packs, each containing categories and their items:
+    go-bag packs, or 72-hour kits when ``extended``.
+    Packs come from the process-wide catalog snapshot (see catalog and pack_engine).
     """
-    packs = {}
-    
-    # Get base query for all items with their categories
-    base_items = Item.objects.select_related('category').all()
-    
-    # Apply transportation mode filter
-    transport_type = assessment_data.get('transportType', 'walking')
-    if transport_type == 'walking':
-        base_items = base_items.filter(for_on_foot=True)
-    elif transport_type == 'bicycle':
-        base_items = base_items.filter(for_bicycle=True)
-    elif transport_type == 'car':
-        base_items = base_items.filter(for_vehicle=True)
-    elif transport_type == 'public':
-        base_items = base_items.filter(for_public_transit=True)
-
-    # Generate adult packs
-    num_adults = assessment_data.get('adults', 1)
-    for i in range(num_adults):
-        pack_name = f"Adult pack {i + 1}"
-        adult_items = base_items.filter(for_adults=True)
-        
-        if assessment_data.get('hasElderly'):
-            adult_items = adult_items | base_items.filter(for_elderly=True)
-        if assessment_data.get('hasDisabled'):
-            adult_items = adult_items | base_items.filter(for_disabled=True)
-            
-        # Organize items by category
-        categories_dict = {}
-        for item in adult_items:
-            if item.category not in categories_dict:
-                categories_dict[item.category] = []
-            categories_dict[item.category].append(item)
-            
-        # Sort categories by order
-        sorted_categories = sorted(categories_dict.items(), key=lambda x: (x[0].order, x[0].name))
-        packs[pack_name] = sorted_categories
-
-    # Generate child packs
-    num_children = assessment_data.get('children', 0)
-    for i in range(num_children):
-        pack_name = f"Child pack {i + 1}"
-        child_items = base_items.filter(for_children=True)
-        
-        if assessment_data.get('hasDisabled'):
-            child_items = child_items | base_items.filter(for_disabled=True, for_children=True)
-            
-        # Organize items by category
-        categories_dict = {}
-        for item in child_items:
-            if item.category not in categories_dict:
-                categories_dict[item.category] = []
-            categories_dict[item.category].append(item)
-            
-        # Sort categories by order
-        sorted_categories = sorted(categories_dict.items(), key=lambda x: (x[0].order, x[0].name))
-        packs[pack_name] = sorted_categories
-
-    # Generate pet packs
-    if assessment_data.get('hasPets'):
-        for pet_type in assessment_data.get('petTypes', []):
-            pack_name = f"{pet_type.title()} pack 1"
-            pet_items = base_items.filter(for_pets=True)
-            
-            # Organize items by category
-            categories_dict = {}
-            for item in pet_items:
-                if item.category not in categories_dict:
-                    categories_dict[item.category] = []
-                categories_dict[item.category].append(item)
-                
-            # Sort categories by order
-            sorted_categories = sorted(categories_dict.items(), key=lambda x: (x[0].order, x[0].name))
-            packs[pack_name] = sorted_categories
-
-    return packs
\ No newline at end of file
+    return get_catalog().engine.generate(assessment_data, extended)
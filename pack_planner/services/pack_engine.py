@@ -0,0 +1,172 @@
+"""
+In-memory pack generation for the pack planner.
+
+``PackEngine.load()`` reads every Item with its Category in one query and
+stores each item's boolean applicability fields, and its category's pack
+type fields, as one integer bitmask. A pack is described by a rule: a tuple
+of ``(required, excluded)`` mask pairs, any one of which an item must
+satisfy by having every required bit and no excluded one (e.g. "on foot and
+for adults" or "on foot and for elderly people"). Matching is a bitwise AND
+per item, so a whole family is planned from the one table, however many
+people it has.
+
+Packs are built for one of two modes. A go-bag holds the items that are
+go-bag items in go-bag categories; the extended (72-hour) kit adds
+everything marked for a 72-hour bag. Pets get a pack per species: the items
+for that species plus those for pets in general.
+
+Packs with the same rule (every adult, every child) share a single grouped
+and sorted ``[(category, [items])]`` structure, built the first time the
+rule is seen. Callers must treat it as read-only. ``generate`` lists each
+distinct pack once, labelled with who needs it.
+"""
+from itertools import product
+from pack_planner.models import Item
+
+# One bit per boolean applicability field of Item
+FLAGS = [
+    'for_adults', 'for_children', 'for_elderly', 'for_disabled',
+    'for_pets', 'for_cats', 'for_dogs', 'for_small_animals',
+    'for_on_foot', 'for_bicycle', 'for_vehicle', 'for_public_transit',
+    'go_bag', 'seventy_two_hr_bag', 'conditional_applicability',
+]
+# Pack type fields of the item's Category
+CATEGORY_FLAGS = ['go_bag', 'seventy_two_hr_bag']
+
+BITS = {flag: 1 << position for position, flag in enumerate(FLAGS)}
+BITS.update({
+    f'category_{flag}': 1 << (len(FLAGS) + position) for position, flag in enumerate(CATEGORY_FLAGS)
+})
+
+# Assessment transportType -> the field items must have set
+TRANSPORT_FLAGS = {
+    'walking': 'for_on_foot',
+    'bicycle': 'for_bicycle',
+    'car': 'for_vehicle',
+    'public': 'for_public_transit',
+}
+
+# Assessment petTypes -> the species field of Item
+PET_FLAGS = {
+    'dog': 'for_dogs',
+    'cat': 'for_cats',
+    'other': 'for_small_animals',
+}
+
+
+def item_mask(item):
+    """Bitmask of the applicability fields set on ``item`` and the pack type fields of its category"""
+    mask = 0
+    for flag in FLAGS:
+        if getattr(item, flag):
+            mask |= BITS[flag]
+    for flag in CATEGORY_FLAGS:
+        if getattr(item.category, flag):
+            mask |= BITS[f'category_{flag}']
+    return mask
+
+
+def mask_of(*flags):
+    mask = 0
+    for flag in flags:
+        mask |= BITS[flag]
+    return mask
+
+
+def pack_type_masks(extended=False):
+    """Masks of which any one makes an item part of a go-bag, or of the extended kit"""
+    if not extended:
+        return [mask_of('go_bag', 'category_go_bag')]
+    return [
+        mask_of(item_flag, f'category_{category_flag}')
+        for item_flag, category_flag in product(CATEGORY_FLAGS, CATEGORY_FLAGS)
+    ]
+
+
+def combine(clauses, pack_types):
+    """Rule matching any of ``clauses`` in any of ``pack_types``"""
+    return tuple(
+        (required | pack_type, excluded)
+        for (required, excluded), pack_type in product(clauses, pack_types)
+    )
+
+
+class PackEngine:
+    def __init__(self, items):
+        # Items arrive in Item.Meta.ordering, i.e. by category, then order and name
+        self.items = list(items)
+        self.masks = [item_mask(item) for item in self.items]
+        self._grouped = {}
+
+    @classmethod
+    def load(cls):
+        """An engine over every Item, read with its category in one query"""
+        return cls(Item.objects.select_related('category'))
+
+    def __len__(self):
+        return len(self.items)
+
+    def matching(self, rule):
+        """Items matching any clause of ``rule``, in catalog order"""
+        return [
+            item for item, mask in zip(self.items, self.masks)
+            if any(mask & required == required and not mask & excluded for required, excluded in rule)
+        ]
+
+    def pack(self, rule):
+        """[(category, [items])] for ``rule``, categories by order and name; shared between callers"""
+        grouped = self._grouped.get(rule)
+        if grouped is None:
+            by_category = {}
+            for item in self.matching(rule):
+                by_category.setdefault(item.category, []).append(item)
+            grouped = sorted(by_category.items(), key=lambda entry: (entry[0].order, entry[0].name))
+            self._grouped[rule] = grouped
+        return grouped
+
+    def rules(self, assessment_data, extended=False):
+        """(pack name, rule) for every pack of an assessment, one per person and pet"""
+        transport = TRANSPORT_FLAGS.get(assessment_data.get('transportType', 'walking'))
+        base = mask_of(transport) if transport else 0
+        pack_types = pack_type_masks(extended)
+
+        adult_clauses = [(base | BITS['for_adults'], 0)]
+        if assessment_data.get('hasElderly'):
+            adult_clauses.append((base | BITS['for_elderly'], 0))
+        if assessment_data.get('hasDisabled'):
+            adult_clauses.append((base | BITS['for_disabled'], 0))
+        adult_rule = combine(adult_clauses, pack_types)
+        for _ in range(assessment_data.get('adults', 1)):
+            yield 'Adult pack', adult_rule
+
+        # Disabled children need nothing beyond the children's items
+        child_rule = combine([(base | BITS['for_children'], 0)], pack_types)
+        for _ in range(assessment_data.get('children', 0)):
+            yield 'Child pack', child_rule
+
+        if assessment_data.get('hasPets'):
+            species = mask_of(*PET_FLAGS.values())
+            for pet_type in assessment_data.get('petTypes', []):
+                # Items for every pet, plus those for this species
+                clauses = [(base | BITS['for_pets'], species)]
+                if pet_type in PET_FLAGS:
+                    clauses.append((base | BITS[PET_FLAGS[pet_type]], 0))
+                yield f'{pet_type.title()} pack', combine(clauses, pack_types)
+
+    def generate(self, assessment_data, extended=False):
+        """
+        {label: [(category, [items])]} for an assessment, each distinct pack
+        once: identical packs are labelled with how many are needed (e.g.
+        "Adult pack × 3"), and names with the same contents are joined.
+        """
+        counts = {}
+        for name, rule in self.rules(assessment_data, extended):
+            counts[name, rule] = counts.get((name, rule), 0) + 1
+
+        labels = {}
+        for (name, rule), count in counts.items():
+            grouped = self.pack(rule)
+            contents = tuple(item.pk for _, items in grouped for item in items)
+            label = name if count == 1 else f'{name} × {count}'
+            labels.setdefault(contents, ([], grouped))[0].append(label)
+        return {' / '.join(names): grouped for names, grouped in labels.values()}
@@ -0,0 +1,15 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from pack_planner.models import Category, Item, Product
+from pack_planner.services.catalog import invalidate_on_commit
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Item)
+@receiver(post_delete, sender=Item)
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(m2m_changed, sender=Item.alternatives.through)
+def pack_data_changed(sender, **kwargs):
+    invalidate_on_commit()
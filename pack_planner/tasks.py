@@ -0,0 +1,47 @@
+"""
+Background tasks of the pack planner, run by the jobs worker.
+"""
+from django.db import transaction
+from jobs.json_stream import JSONStreamError, read_records
+from jobs.models import JobFailed, outside_transaction
+from jobs.registry import task
+from pack_planner.services.data_processor import DataProcessor
+
+
+@task('pack_planner.data_upload', concurrency=1)
+def data_upload(job, upload_type):
+    """Load an uploaded pack planning JSON file, streamed a batch of rows at a time"""
+    reported = 0
+
+    def progress(rows, total=None):
+        nonlocal reported
+        errors = processor.stats['errors'][reported:]
+        reported = len(processor.stats['errors'])
+        # The upload's transaction must not lock the job row
+        outside_transaction(job.progress, rows, total, errors=[
+            f'{error["section"]}[{error["index"]}]'
+            + (f' (line {error["line"]})' if error['line'] else '')
+            + (f' "{error["name"]}"' if error['name'] else '')
+            + f': {error["error"]}'
+            for error in errors
+        ])
+
+    processor = DataProcessor(upload_type, progress=progress)
+    try:
+        # A malformed file rolls back the batches loaded before the error
+        with transaction.atomic(), job.open_upload() as file:
+            result = processor.process_records(read_records(file))
+            # Errors not yet reported, such as those of the alternatives
+            progress(processor.rows, processor.rows)
+    except JSONStreamError as e:
+        raise JobFailed(f'Error processing file: {str(e)}')
+
+    updated = result['updated']
+    return {
+        'message': (
+            f'Successfully processed data: {result["categories"]} categories, '
+            f'{result["items"]} items, {result["products"]} products created; '
+            f'{updated["categories"]} categories, {updated["items"]} items, {updated["products"]} products updated; '
+            f'{result["alternatives"]} alternative links; {result["error_count"]} rows skipped'
+        ),
+    }
@@ -1,3 +1,325 @@
-from django.test import TestCase
+import json
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from jobs.models import MAX_ERRORS
+from jobs.registry import enqueue
+from jobs.worker import run_pending
+from pack_planner.forms import DataUploadForm
+from pack_planner.models import Category, Item, Product
+from pack_planner.services import catalog as pack_catalog
+from pack_planner.services.catalog import get_catalog, invalidate_pack_catalog
+from pack_planner.services.data_processor import DataProcessor, generate_packs
+from pack_planner.services.pack_engine import PackEngine
 
-# Create your tests here.
+
+def create_item(name, category, importance='critical', **fields):
+    return Item.objects.create(name=name, description=f'{name} description', uses='', category=category,
+                               importance=importance, **fields)
+
+
+class GeneratePacksTest(TestCase):
+    def setUp(self):
+        invalidate_pack_catalog()
+        self.water = Category.objects.create(name='Water', description='', importance='critical', order=1)
+        self.first_aid = Category.objects.create(name='First Aid', description='', importance='critical', order=0)
+        self.bottle = create_item('Water bottle', self.water)
+        self.bandages = create_item('Bandages', self.first_aid, for_children=True)
+        self.cane = create_item('Folding cane', self.first_aid, for_adults=False, for_elderly=True)
+        self.ramp = create_item('Portable ramp', self.first_aid, for_adults=False, for_disabled=True, for_on_foot=False)
+        self.snack = create_item('Juice box', self.water, for_adults=False, for_children=True)
+        self.leash = create_item('Leash', self.water, for_adults=False, for_pets=True)
+
+    def names(self, pack):
+        return [(category.name, [item.name for item in items]) for category, items in pack]
+
+    def test_packs_for_a_family(self):
+        packs = generate_packs({
+            'adults': 2, 'children': 1, 'hasElderly': True, 'hasDisabled': True,
+            'hasPets': True, 'petTypes': ['dog'], 'transportType': 'car',
+        })
+        self.assertEqual(list(packs), ['Adult pack × 2', 'Child pack', 'Dog pack'])
+        self.assertEqual(self.names(packs['Adult pack × 2']), [
+            ('First Aid', ['Bandages', 'Folding cane', 'Portable ramp']),
+            ('Water', ['Water bottle']),
+        ])
+        self.assertEqual(self.names(packs['Child pack']), [('First Aid', ['Bandages']), ('Water', ['Juice box'])])
+        self.assertEqual(self.names(packs['Dog pack']), [('Water', ['Leash'])])
+
+    def test_transport_filter(self):
+        packs = generate_packs({'adults': 1, 'hasDisabled': True, 'transportType': 'walking'})
+        self.assertEqual(self.names(packs['Adult pack']), [('First Aid', ['Bandages']), ('Water', ['Water bottle'])])
+
+    def test_one_item_query_and_shared_packs_for_a_large_family(self):
+        assessment = {'adults': 10, 'children': 10, 'transportType': 'car'}
+        with self.assertNumQueries(1):
+            engine = PackEngine.load()
+            packs = engine.generate(assessment)
+        self.assertEqual(list(packs), ['Adult pack × 10', 'Child pack × 10'])
+        rules = [rule for _, rule in engine.rules(assessment)]
+        self.assertIs(engine.pack(rules[0]), engine.pack(rules[9]))
+        self.assertIs(engine.pack(rules[0]), packs['Adult pack × 10'])
+
+    def test_go_bag_and_extended_kits(self):
+        self.bottle.go_bag = False
+        self.bottle.save()
+        radio = create_item('Radio', self.water, go_bag=False, seventy_two_hr_bag=False)
+        stove_category = Category.objects.create(
+            name='Cooking', description='', importance='optional', order=2, go_bag=False
+        )
+        create_item('Camp stove', stove_category)
+
+        go_bag = generate_packs({'adults': 1, 'transportType': 'car'})
+        self.assertEqual(self.names(go_bag['Adult pack']), [('First Aid', ['Bandages'])])
+
+        extended = generate_packs({'adults': 1, 'transportType': 'car'}, extended=True)
+        self.assertEqual(self.names(extended['Adult pack']), [
+            ('First Aid', ['Bandages']), ('Water', ['Water bottle']), ('Cooking', ['Camp stove']),
+        ])
+        self.assertNotIn(radio.name, str(self.names(extended['Adult pack'])))
+
+    def test_species_packs_and_identical_packs_are_merged(self):
+        packs = generate_packs({'adults': 1, 'hasPets': True, 'petTypes': ['dog', 'cat'], 'transportType': 'car'})
+        self.assertEqual(list(packs), ['Adult pack', 'Dog pack / Cat pack'])
+
+        create_item('Dog food', self.water, for_adults=False, for_dogs=True)
+        create_item('Cat litter', self.water, for_adults=False, for_pets=True, for_cats=True)
+        invalidate_pack_catalog()
+        packs = generate_packs({'adults': 1, 'hasPets': True, 'petTypes': ['dog', 'cat'], 'transportType': 'car'})
+        self.assertEqual(self.names(packs['Dog pack']), [('Water', ['Dog food', 'Leash'])])
+        self.assertEqual(self.names(packs['Cat pack']), [('Water', ['Cat litter', 'Leash'])])
+
+    def test_engine_matches_rules_bitwise(self):
+        engine = PackEngine.load()
+        self.assertEqual(len(engine), 6)
+        rules = dict(engine.rules({'adults': 1, 'hasElderly': True, 'transportType': 'bicycle'}))
+        self.assertEqual(
+            [item.name for item in engine.matching(rules['Adult pack'])],
+            ['Bandages', 'Folding cane', 'Water bottle']
+        )
+
+
+class PackCatalogTest(TestCase):
+    def setUp(self):
+        invalidate_pack_catalog()
+        self.water = Category.objects.create(name='Water', description='', importance='critical')
+        self.bottle = create_item('Water bottle', self.water, special_considerations='Fill before leaving')
+        self.filter = create_item('Water filter', self.water, importance='recommended')
+        self.bottle.alternatives.add(self.filter)
+
+    def pack_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [query['sql'] for query in queries if 'pack_planner_' in query['sql']]
+
+    def test_steady_state_pages_skip_the_pack_tables(self):
+        session = self.client.session
+        session['pack_assessment'] = {'adults': 2, 'children': 1, 'transportType': 'walking'}
+        session.save()
+        get_catalog()
+
+        self.assertEqual(self.pack_queries(reverse('pack_assessment_results')), [])
+        self.assertEqual(self.pack_queries(reverse('pack_browse') + '?q=filter'), [])
+        self.assertEqual(self.pack_queries(reverse('item_detail', args=[self.bottle.pk])), [])
+
+        response = self.client.get(reverse('item_detail', args=[self.bottle.pk]))
+        self.assertContains(response, 'Water filter')
+        self.assertEqual(self.client.get(reverse('item_detail', args=[999999])).status_code, 404)
+
+    def test_browse_and_checklist_filters(self):
+        catalog = get_catalog()
+        self.assertEqual(catalog.browse('FILTER'), [self.filter])
+        self.assertEqual(catalog.browse(importance='critical'), [self.bottle])
+        self.assertEqual(catalog.browse(category_id=str(self.water.pk), special_need='fill'), [self.bottle])
+        self.assertEqual(catalog.checklist(), [self.bottle])
+
+    def test_results_page_and_products_follow_the_pack_type(self):
+        self.bottle.go_bag = False
+        self.bottle.save()
+        Product.objects.create(name='Steel flask', description='', item=self.filter, seventy_two_hr_bag=False)
+        Product.objects.create(name='Gravity filter', description='', item=self.filter, go_bag=False)
+        invalidate_pack_catalog()
+        session = self.client.session
+        session['pack_assessment'] = {'adults': 1, 'transportType': 'walking'}
+        session.save()
+
+        response = self.client.get(reverse('pack_assessment_results'))
+        self.assertNotContains(response, 'Water bottle')
+        response = self.client.get(reverse('pack_assessment_results') + '?show_extended=true')
+        self.assertContains(response, 'Water bottle')
+
+        url = reverse('item_detail', args=[self.filter.pk])
+        self.assertContains(self.client.get(url), 'Gravity filter')
+        self.assertNotContains(self.client.get(url + '?show_extended=false'), 'Gravity filter')
+        self.assertContains(self.client.get(url + '?show_extended=true'), 'Gravity filter')
+
+
+class PackCatalogInvalidationTest(TransactionTestCase):
+    """Commits for real, so on_commit invalidation runs as it does in production"""
+    def setUp(self):
+        self.water = Category.objects.create(name='Water', description='', importance='critical')
+        self.filter = create_item('Water filter', self.water)
+        invalidate_pack_catalog()
+
+    def test_snapshot_is_swapped_when_changes_commit(self):
+        catalog = get_catalog()
+        self.assertIs(get_catalog(), catalog)
+
+        DataProcessor('update').process_data({'items': [{
+            'name': 'Water tablets', 'description': '', 'category': 'Water', 'importance': 'optional',
+        }]})
+        refreshed = get_catalog()
+        self.assertIsNot(refreshed, catalog)
+        self.assertIn('Water tablets', [item.name for item in refreshed.items])
+        # The old snapshot is left as it was for requests still using it
+        self.assertNotIn('Water tablets', [item.name for item in catalog.items])
+
+        self.filter.delete()
+        self.assertNotIn(self.filter.name, [item.name for item in get_catalog().items])
+
+
+def upload(items=(), categories=None, products=()):
+    return {
+        'categories': categories if categories is not None else [
+            {'name': 'Water', 'description': 'Drinking water', 'importance': 'critical'},
+        ],
+        'items': list(items),
+        'products': list(products),
+    }
+
+
+def upload_item(name, **fields):
+    return {'name': name, 'description': f'{name} description', 'category': 'Water', 'importance': 'critical', **fields}
+
+
+class DataProcessorTest(TestCase):
+    def test_forward_referenced_alternatives(self):
+        stats = DataProcessor('update').process_data(upload([
+            upload_item('Water bottle', alternatives=['Water bladder', 'Canteen']),
+            upload_item('Water bladder'),
+            upload_item('Canteen', alternatives=['Water bottle']),
+        ]))
+        self.assertEqual((stats['categories'], stats['items'], stats['alternatives']), (1, 3, 2))
+        bottle = Item.objects.get(name='Water bottle')
+        self.assertEqual(sorted(bottle.alternatives.values_list('name', flat=True)), ['Canteen', 'Water bladder'])
+        self.assertEqual(list(Item.objects.get(name='Water bladder').alternatives.values_list('name', flat=True)),
+                         ['Water bottle'])
+
+        DataProcessor('update').process_data(upload([upload_item('Water bottle', alternatives=['Canteen'])]))
+        self.assertEqual(list(bottle.alternatives.values_list('name', flat=True)), ['Canteen'])
+        self.assertFalse(Item.objects.get(name='Water bladder').alternatives.exists())
+
+    def test_invalid_rows_are_reported_and_skipped(self):
+        stats = DataProcessor('update').process_data(upload([
+            upload_item('Water bottle', alternatives=['Missing item']),
+            upload_item('Stove', category='Cooking'),
+            upload_item('Radio', for_adults='yes'),
+            upload_item('x' * 201),
+            {'name': 'No description', 'category': 'Water', 'importance': 'critical'},
+            upload_item('Lamp', importance='urgent'),
+        ], products=[
+            {'name': 'Steel bottle', 'description': '', 'item': 'Water bottle'},
+            {'name': 'Gas can', 'description': '', 'item': 'Stove'},
+        ]))
+        self.assertEqual(list(Item.objects.values_list('name', flat=True)), ['Water bottle'])
+        self.assertEqual(list(Product.objects.values_list('name', flat=True)), ['Steel bottle'])
+        self.assertEqual(
+            [(error['section'], error['index'], error['error']) for error in stats['errors']],
+            [
+                ('items', 2, 'for_adults must be a boolean value'),
+                ('items', 3, 'name is longer than 200 characters'),
+                ('items', 4, 'Missing description'),
+                ('items', 5, 'importance must be one of critical, recommended, optional'),
+                ('items', 1, 'Category not found: Cooking'),
+                ('items', 0, 'Alternative not found: Missing item'),
+                ('products', 1, 'Item not found: Stove'),
+            ]
+        )
+        self.assertEqual(stats['error_count'], 7)
+
+    def test_only_the_first_errors_are_kept(self):
+        stats = DataProcessor('update').process_data(upload([
+            upload_item(f'Lamp {i}', importance='urgent') for i in range(MAX_ERRORS + 5)
+        ]))
+        self.assertEqual(len(stats['errors']), MAX_ERRORS)
+        self.assertEqual(stats['errors'][-1]['name'], f'Lamp {MAX_ERRORS - 1}')
+        self.assertEqual(stats['error_count'], MAX_ERRORS + 5)
+
+    def test_only_new_and_changed_rows_are_written(self):
+        data = upload(
+            [upload_item(f'Item {i}') for i in range(5)],
+            products=[{'name': 'Bottle', 'description': '', 'item': 'Item 0'}],
+        )
+        DataProcessor('update').process_data(data)
+
+        data['items'][1]['weight_note'] = 'Heavy'
+        data['items'].append(upload_item('Item 5'))
+        with self.assertNumQueries(5):
+            stats = DataProcessor('update').process_data(data)
+        self.assertEqual((stats['categories'], stats['items'], stats['products']), (0, 1, 0))
+        self.assertEqual(stats['updated'], {'categories': 0, 'items': 1, 'products': 0})
+        self.assertEqual(Item.objects.get(name='Item 1').weight_note, 'Heavy')
+
+    def test_query_count_does_not_grow_with_the_upload(self):
+        def queries(size):
+            Item.objects.all().delete()
+            data = upload([upload_item(f'Item {i}', alternatives=[f'Item {i + 1}']) for i in range(size)])
+            with CaptureQueriesContext(connection) as captured:
+                DataProcessor('update').process_data(data)
+            return len(captured)
+
+        # The first upload also creates the category
+        queries(10)
+        self.assertEqual(queries(10), queries(200))
+
+    def test_full_replace_invalidates_the_catalog_once(self):
+        # Bulk created, so no signal has scheduled an invalidation yet
+        category, = Category.objects.bulk_create([Category(name='Old', description='', importance='optional')])
+        Item.objects.bulk_create([
+            Item(name=f'Old {i}', description='', uses='', category=category, importance='optional')
+            for i in range(20)
+        ])
+        invalidate_pack_catalog()
+        version = pack_catalog.shared_version.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            # Also deletes the old rows one by one, each sending a signal
+            DataProcessor('full').process_data(upload([upload_item('Water bottle')]))
+        self.assertEqual(pack_catalog.shared_version.get(), version + 1)
+        self.assertEqual(list(Item.objects.values_list('name', flat=True)), ['Water bottle'])
+
+
+class StreamedUploadTest(TransactionTestCase):
+    def test_sections_may_come_in_any_order(self):
+        data = upload([
+            upload_item('Water bottle', alternatives=['Canteen']),
+            upload_item('Canteen'),
+            upload_item('Stove', category='Cooking'),
+        ], products=[{'name': 'Steel bottle', 'description': '', 'item': 'Water bottle'}])
+        text = json.dumps({'products': data['products'], 'items': data['items'], 'categories': data['categories']},
+                          indent=2)
+        job = enqueue('pack_planner.data_upload', payload={'upload_type': 'update'}, upload=ContentFile(text.encode(), name='packs.json'))
+
+        [job] = run_pending()
+        self.assertEqual(job.status, 'succeeded')
+        self.assertEqual((job.processed, job.total), (5, 5))
+        self.assertEqual(job.errors, ['items[2] (line 25) "Stove": Category not found: Cooking'])
+        self.assertEqual(Product.objects.get().item.name, 'Water bottle')
+        self.assertEqual(list(Item.objects.get(name='Canteen').alternatives.values_list('name', flat=True)),
+                         ['Water bottle'])
+
+    def test_malformed_files_are_located(self):
+        text = json.dumps(upload([upload_item('Water bottle')]), indent=2).replace('"critical"', 'critical', 1)
+        form = DataUploadForm(data={'upload_type': 'update'},
+                              files={'file': SimpleUploadedFile('packs.json', text.encode())})
+        self.assertEqual(form.errors['file'],
+                         ['Invalid JSON file: Expecting value: line 6 column 21 (char 108)'])
+
+        job = enqueue('pack_planner.data_upload', payload={'upload_type': 'update'}, upload=ContentFile(text.encode(), name='packs.json'))
+        [job] = run_pending()
+        self.assertEqual(job.status, 'failed')
+        self.assertIn('Expecting value: line 6 column 21', job.last_error)
+        self.assertFalse(Category.objects.exists())
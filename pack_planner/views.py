@@ -1,20 +1,18 @@
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required, permission_required
 from django.contrib.auth.mixins import PermissionRequiredMixin
-from django.db import transaction
-from django.db.models import Q
-from django.http import JsonResponse
-from django.shortcuts import render, redirect, get_object_or_404
+from django.http import Http404, JsonResponse
+from django.shortcuts import render, redirect
 from django.urls import reverse_lazy
 from django.views.decorators.csrf import csrf_exempt, ensure_csrf_cookie
 from django.views.decorators.http import require_http_methods
 from django.views.generic.edit import FormView
 
-import json
-
 from pack_planner.forms import AssessmentForm, DataUploadForm
-from pack_planner.models import Category, Item, Product
-from pack_planner.services.data_processor import DataProcessor, generate_packs
+from pack_planner.models import Category, Product
+from pack_planner.services.catalog import get_catalog
+from pack_planner.services.data_processor import generate_packs
+from jobs.registry import enqueue
 
 @login_required
 @permission_required('pack_planner.pack_planner_data_upload_permission', raise_exception=True)
@@ -23,24 +21,17 @@ def data_upload(request):
     if request.method == 'POST':
         form = DataUploadForm(request.POST, request.FILES)
         if form.is_valid():
-            try:
-                file = form.cleaned_data['file']
-                upload_type = form.cleaned_data['upload_type']
-                data = json.load(file)
-                
-                with transaction.atomic():
-                    processor = DataProcessor(upload_type)
-                    result = processor.process_data(data)
-                    
-                    messages.success(
-                        request,
-                        f'Successfully processed data: {result["categories"]} categories, '
-                        f'{result["items"]} items, {result["products"]} products'
-                    )
-                    
-                return redirect('pack_upload')
-            except Exception as e:
-                messages.error(request, f'Error processing file: {str(e)}')
+            file = form.cleaned_data['file']
+            # Processed by a background worker; the form has already validated the JSON
+            job = enqueue(
+                'pack_planner.data_upload',
+                payload={'upload_type': form.cleaned_data['upload_type']},
+                upload=file,
+                user=request.user,
+                description=f'Pack planner upload {file.name}',
+            )
+            messages.success(request, 'Upload queued for processing.')
+            return redirect('jobs:job_status', pk=job.pk)
     else:
         form = DataUploadForm()
     
@@ -50,16 +41,20 @@ def data_upload(request):
 
 def item_detail(request, pk):
     """Detailed view of an item with alternatives and products"""
-    item = get_object_or_404(
-        Item.objects.prefetch_related(
-            'alternatives',
-            'recommended_products'
-        ),
-        pk=pk
-    )
+    # Alternatives and products come prefetched with the catalog snapshot
+    catalog = get_catalog()
+    item = catalog.item(pk)
+    if item is None:
+        raise Http404('No Item matches the given query.')
+
+    # Linked from a go-bag or 72-hour kit: only the products for that pack type
+    show_extended = request.GET.get('show_extended')
+    extended = None if show_extended is None else show_extended.lower() == 'true'
     
     context = {
         'item': item,
+        'products': catalog.products(item, extended),
+        'show_extended': extended,
     }
     return render(request, 'pack_planner/item_detail.html', context)
 
@@ -104,11 +99,11 @@ def pack_assessment_results(request):
         messages.error(request, 'Please complete the pack assessment first.')
         return redirect('pack_assessment')
 
-    # Generate recommendations
-    recommendations = generate_packs(assessment_data)
-
     # Get pack type from query parameter, default to go-bag only
     show_extended = request.GET.get('show_extended', 'false').lower() == 'true'
+
+    # Generate recommendations for that pack type
+    recommendations = generate_packs(assessment_data, extended=show_extended)
     
     context = {
         'assessment': assessment_data,
@@ -126,28 +121,12 @@ def pack_browse(request):
     importance = request.GET.get('importance')
     special_need = request.GET.get('special_need')
     
-    # Start with all items
-    items = Item.objects.all()
-    
-    # Apply filters
-    if query:
-        items = items.filter(
-            Q(name__icontains=query) |
-            Q(description__icontains=query) |
-            Q(uses__icontains=query)
-        )
-    
-    if category_id:
-        items = items.filter(category_id=category_id)
-    
-    if importance:
-        items = items.filter(importance=importance)
-    
-    if special_need:
-        items = items.filter(special_considerations__icontains=special_need)
+    # Filtered in memory from the catalog snapshot
+    catalog = get_catalog()
+    items = catalog.browse(query, category_id, importance, special_need)
     
     # Get categories for filter dropdown
-    categories = Category.objects.all()
+    categories = catalog.categories
     
     context = {
         'items': items,
@@ -166,22 +145,8 @@ def print_checklist(request):
     assessment_data = request.session.get('pack_assessment')
     checklist = request.session.get('pack_checklist', {})
     
-    items = Item.objects.filter(importance='critical')
-    
-    # Add additional items based on assessment
-    if assessment_data:
-        if assessment_data.get('children'):
-            items = items.union(
-                Item.objects.filter(special_considerations__icontains='children')
-            )
-        if assessment_data.get('has_elderly'):
-            items = items.union(
-                Item.objects.filter(special_considerations__icontains='elderly')
-            )
-        if assessment_data.get('has_pets'):
-            items = items.union(
-                Item.objects.filter(special_considerations__icontains='pets')
-            )
+    # Critical items, plus any matching the assessment, from the catalog snapshot
+    items = get_catalog().checklist(assessment_data)
     
     context = {
         'items': items,